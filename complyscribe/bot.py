@@ -5,7 +5,8 @@
 """This module implements functions for the complyscribe bot."""
 
 import logging
-from typing import List, Optional
+import os
+from typing import Dict, List, Optional, Tuple
 
 from git import GitCommandError
 from git.objects.commit import Commit
@@ -13,11 +14,20 @@ from git.repo import Repo
 from git.util import Actor
 
 from complyscribe.provider import GitProvider, GitProviderException
-from complyscribe.reporter import BotResults
+from complyscribe.reporter import BotResults, FileChange
 from complyscribe.tasks.base_task import TaskBase, TaskException
+from complyscribe.tasks.journal import WriteJournal
 
 logger = logging.getLogger(__name__)
 
+_CHANGE_TYPES: Dict[str, str] = {
+    "A": "added",
+    "C": "added",
+    "D": "deleted",
+    "M": "modified",
+    "R": "renamed",
+}
+
 
 class RepoException(Exception):
     """An error requiring the user to perform a manual action in the
@@ -107,13 +117,14 @@ class ComplyScribe:
         remote_url: str,
         pull_request_title: str,
     ) -> int:
-        """Creates a pull request in the remote repository"""
+        """Creates or updates the pull request in the remote repository"""
 
         # Parse remote url to get repository information for pull request
         namespace, repo_name = git_provider.parse_repository(remote_url)
         logger.debug(f"Detected namespace {namespace} and {repo_name}")
 
-        pr_number = git_provider.create_pull_request(
+        # Scheduled runs push to the same branch, so its pull request may be open
+        pr_number = git_provider.upsert_pull_request(
             ns=namespace,
             repo_name=repo_name,
             head_branch=self.branch,
@@ -136,35 +147,199 @@ class ComplyScribe:
         except GitCommandError as e:
             raise RepoException(f"Git checkout failed: {e}") from e
 
-    def _run_tasks(self, tasks: List[TaskBase]) -> None:
-        """Run tasks"""
+    def _run_tasks(self, tasks: List[TaskBase]) -> WriteJournal:
+        """Run tasks and return the journal of the paths they wrote"""
+        journal = WriteJournal()
         for task in tasks:
+            task.journal = journal
+            if not task.records_writes:
+                journal.mark_incomplete(f"{type(task).__name__} does not record writes")
             try:
                 task.execute()
             except TaskException as e:
                 raise RepoException(f"Bot pre-tasks failed: {e}")
+        return journal
 
-    def _get_committed_files(self, commit: Commit) -> List[str]:
-        """Get the list of committed files in the commit."""
-        changes: List[str] = []
-        if commit.parents:
-            diffs = {diff.a_path: diff for diff in commit.parents[0].diff(commit)}
-            for path in commit.stats.files.keys():
-                diff = diffs.get(path, None)
-                if diff:
-                    if diff.change_type == "A":
-                        changes.append(f"{path} [added]")
-                    elif diff.change_type == "M":
-                        changes.append(f"{path} [modified]")
-                    elif diff.change_type == "D":
-                        changes.append(f"{path} [deleted]")
-                    elif diff.change_type == "R":
-                        changes.append(f"{path} [renamed]")
-        else:
-            for path in commit.stats.files.keys():
-                changes.append(f"{path} [added]")
+    def _get_journaled_paths(
+        self, journal: Optional[WriteJournal], patterns: List[str]
+    ) -> Optional[List[str]]:
+        """
+        Get the repository paths to stage from the journal.
+
+        Returns None if the whole working tree has to be checked, because
+        the journal is missing or incomplete, or only some patterns are staged.
+        """
+        if journal is None or not journal.is_complete or "." not in patterns:
+            return None
+        working_dir = os.path.abspath(self.working_dir)
+        paths: List[str] = []
+        for path in journal.paths:
+            relative_path = os.path.relpath(path, working_dir)
+            if relative_path == os.pardir or relative_path.startswith(
+                os.pardir + os.sep
+            ):
+                logger.debug(f"Ignoring journaled path outside the repository {path}")
+                continue
+            paths.append(relative_path)
+        return paths
+
+    @staticmethod
+    def _get_committed_files(gitwd: Repo, commit: Commit) -> List[FileChange]:
+        """
+        Get the files changed by the commit, with their line counts.
+
+        The change types and line counts are read from a single diff of the
+        commit against its first parent, with rename detection. Line counts
+        of binary files are 0.
+        """
+        output: str = gitwd.git.diff_tree(
+            "-r",
+            "-M",
+            "--root",
+            "--no-commit-id",
+            "--raw",
+            "--numstat",
+            "-z",
+            commit.hexsha,
+        )
+        change_types: Dict[str, str] = {}
+        line_counts: Dict[str, Tuple[int, int]] = {}
+        fields = iter(output.split("\0"))
+        for field in fields:
+            if field.startswith(":"):
+                # raw entry, the status is followed by the path(s)
+                status = field.split()[-1][0]
+                path = next(fields)
+                if status in ("R", "C"):
+                    path = next(fields)
+                change_types[path] = _CHANGE_TYPES.get(status, "modified")
+            elif field:
+                # numstat entry, renames and copies have an empty path
+                # followed by the original and new paths
+                insertions, deletions, path = field.split("\t", 2)
+                if not path:
+                    next(fields)
+                    path = next(fields)
+                line_counts[path] = (
+                    int(insertions) if insertions.isdigit() else 0,
+                    int(deletions) if deletions.isdigit() else 0,
+                )
+        return [
+            FileChange(path, change_type, *line_counts.get(path, (0, 0)))
+            for path, change_type in change_types.items()
+        ]
+
+    @staticmethod
+    def _get_status(gitwd: Repo, pathspecs: List[str]) -> List[Tuple[str, str]]:
+        """Get the changed paths and their change type from the working tree status"""
+        status: str = gitwd.git.status(
+            "--porcelain", "-z", "--untracked-files=all", "--", *pathspecs
+        )
+        changes: List[Tuple[str, str]] = []
+        entries = iter(status.split("\0"))
+        for entry in entries:
+            if not entry:
+                continue
+            code, path = entry[:2], entry[3:]
+            if "R" in code or "C" in code:
+                # the original path of a staged rename or copy follows
+                next(entries, None)
+            if code == "??":
+                changes.append((path, "added"))
+            elif "D" in code:
+                if "A" not in code:
+                    changes.append((path, "deleted"))
+            elif "A" in code or "C" in code:
+                changes.append((path, "added"))
+            elif "R" in code:
+                changes.append((path, "renamed"))
+            else:
+                changes.append((path, "modified"))
         return changes
 
+    @staticmethod
+    def _get_changed_files(gitwd: Repo, patterns: List[str]) -> List[str]:
+        """
+        Get the list of files that staging the patterns would commit.
+
+        The changes are read from the working tree status, so the index
+        and the branch are left untouched.
+        """
+        if not patterns:
+            return []
+        pathspecs: List[str] = [] if "." in patterns else patterns
+        return sorted(
+            f"{path} [{change}]"
+            for path, change in ComplyScribe._get_status(gitwd, pathspecs)
+        )
+
+    def _commit_and_push(
+        self,
+        repo: Repo,
+        git_provider: Optional[GitProvider],
+        commit_message: str,
+        pull_request_title: str,
+    ) -> BotResults:
+        """Commit the staged changes, push them and create a pull request"""
+        results: BotResults = BotResults([], "", 0)
+        commit: Commit = self._local_commit(
+            repo,
+            commit_message,
+        )
+        results.commit_sha = commit.hexsha
+        results.summary = self._get_committed_files(repo, commit)
+
+        try:
+            remote_url = self._push_to_remote(repo)
+
+            # Only create a pull request if a GitProvider is configured and
+            # a target branch is set.
+            if git_provider and self.target_branch:
+                logger.info(
+                    f"Git provider detected, submitting pull request to {self.target_branch}"
+                )
+                results.pr_number = self._create_pull_request(
+                    git_provider, remote_url, pull_request_title
+                )
+            return results
+
+        except GitCommandError as e:
+            raise RepoException(f"Git push to {self.branch} failed: {e}")
+        except GitProviderException as e:
+            raise RepoException(f"Git pull request to {self.target_branch} failed: {e}")
+
+    def _commit_journaled_paths(
+        self,
+        repo: Repo,
+        paths: List[str],
+        git_provider: Optional[GitProvider],
+        commit_message: str,
+        pull_request_title: str,
+        dry_run: bool,
+    ) -> BotResults:
+        """Stage and commit the changes of the paths written by the pre-tasks"""
+        changes: List[Tuple[str, str]] = []
+        if paths:
+            # Journaled paths are file names, not patterns
+            with repo.git.custom_environment(GIT_LITERAL_PATHSPECS="1"):
+                changes = self._get_status(repo, paths)
+        if not changes:
+            logger.info("Nothing to commit")
+            return BotResults([], "", 0)
+
+        if dry_run:
+            logger.info("Dry run mode is enabled, no changes will be committed")
+            return BotResults(
+                sorted(f"{path} [{change}]" for path, change in changes), "", 0
+            )
+
+        logger.info(f"Staging {len(changes)} files written by the bot pre-tasks")
+        with repo.git.custom_environment(GIT_LITERAL_PATHSPECS="1"):
+            repo.git.add("--all", "--", *[path for path, _ in changes])
+        return self._commit_and_push(
+            repo, git_provider, commit_message, pull_request_title
+        )
+
     def run(
         self,
         patterns: List[str],
@@ -183,13 +358,15 @@ class ComplyScribe:
                 pre_tasks: Optional workspace task list to execute before staging files
                 commit_message: Optional commit message for local commit
                 pull_request_title: Optional customized pull request title
-                dry_run: Only complete pre-tasks and return changes without pushing
+                dry_run: Only complete pre-tasks and return changes without staging,
+                committing or pushing them
 
         Returns:
             BotResults with changes, commit_sha, and pull request number.
             The commit_sha defaults to "" if there was no updates and the
             pull request number default to 0 if not submitted. The changes list is
-            only populated if dry_run is enabled.
+            only populated if dry_run is enabled and the summary of the committed
+            files only if a commit is created.
         """
         results: BotResults = BotResults([], "", 0)
 
@@ -198,47 +375,40 @@ class ComplyScribe:
         self._checkout_branch(repo)
 
         # Execute bot pre-tasks before committing repository updates
+        journal: Optional[WriteJournal] = None
         if pre_tasks:
-            self._run_tasks(pre_tasks)
+            journal = self._run_tasks(pre_tasks)
+
+        # Only check and stage the paths written by the tasks when all of them
+        # are known, instead of the whole working tree
+        journaled_paths = self._get_journaled_paths(journal, patterns)
+        if journaled_paths is not None:
+            return self._commit_journaled_paths(
+                repo,
+                journaled_paths,
+                git_provider,
+                commit_message,
+                pull_request_title,
+                dry_run,
+            )
 
         # Check if there are any unstaged files
         if repo.is_dirty(untracked_files=True):
 
+            # Report the changes without staging or committing them
+            if dry_run:
+                logger.info("Dry run mode is enabled, no changes will be committed")
+                changes = self._get_changed_files(repo, patterns)
+                if not changes:
+                    logger.info("Nothing to commit")
+                return BotResults(changes, "", 0)
+
             self._stage_files(repo, patterns)
 
             if repo.is_dirty():
-
-                commit: Commit = self._local_commit(
-                    repo,
-                    commit_message,
+                return self._commit_and_push(
+                    repo, git_provider, commit_message, pull_request_title
                 )
-                results.commit_sha = commit.hexsha
-
-                # Do not return the commit sha if dry run is enabled
-                if dry_run:
-                    logger.info("Dry run mode is enabled, no changes will be pushed")
-                    return BotResults(self._get_committed_files(commit), "", 0)
-
-                try:
-                    remote_url = self._push_to_remote(repo)
-
-                    # Only create a pull request if a GitProvider is configured and
-                    # a target branch is set.
-                    if git_provider and self.target_branch:
-                        logger.info(
-                            f"Git provider detected, submitting pull request to {self.target_branch}"
-                        )
-                        results.pr_number = self._create_pull_request(
-                            git_provider, remote_url, pull_request_title
-                        )
-                    return results
-
-                except GitCommandError as e:
-                    raise RepoException(f"Git push to {self.branch} failed: {e}")
-                except GitProviderException as e:
-                    raise RepoException(
-                        f"Git pull request to {self.target_branch} failed: {e}"
-                    )
             else:
                 logger.info("Nothing to commit")
                 return results
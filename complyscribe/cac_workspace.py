@@ -0,0 +1,113 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+"""In-memory workspace for CaC content yaml files."""
+
+import difflib
+import logging
+import pathlib
+from typing import Any, Dict, List
+
+from complyscribe.utils import dump_cac_yaml_ordered, parse_cac_yaml_ordered
+
+logger = logging.getLogger(__name__)
+
+
+class CacWorkspace:
+    """
+    Transactional view over the yaml files of a CaC content repo.
+
+    Each profile, control or var file is read from disk at most once.
+    Callers mutate the returned data in memory and all changed files are
+    written back with a single call to flush.
+
+    Args:
+        cac_content_root: Root of the CaC content project.
+        dry_run: Report the changes as diffs without writing any file.
+    """
+
+    def __init__(self, cac_content_root: pathlib.Path, dry_run: bool = False):
+        self.cac_content_root = cac_content_root
+        self.dry_run = dry_run
+        self._original: Dict[pathlib.Path, str] = {}
+        self._data: Dict[pathlib.Path, Any] = {}
+
+    @staticmethod
+    def _key(file_path: pathlib.Path) -> pathlib.Path:
+        return pathlib.Path(file_path).resolve()
+
+    def load(self, file_path: pathlib.Path) -> Any:
+        """
+        Return the ordered yaml data of a file, reading it on first access.
+
+        The same object is returned on every call, so in-place mutations
+        are visible to later callers and are picked up by flush.
+        """
+        key = self._key(file_path)
+        if key not in self._data:
+            content = key.read_text(encoding="utf-8")
+            # parse before recording, so a file that fails to parse is not tracked
+            data = parse_cac_yaml_ordered(content)
+            self._original[key] = content
+            self._data[key] = data
+        return self._data[key]
+
+    def is_loaded(self, file_path: pathlib.Path) -> bool:
+        """Check if a file has already been loaded into the workspace."""
+        return self._key(file_path) in self._data
+
+    def replace(self, file_path: pathlib.Path, content: str) -> None:
+        """
+        Replace the data of a file with yaml text produced elsewhere,
+        e.g. by a worker process. The file on disk stays the diff baseline.
+        """
+        key = self._key(file_path)
+        data = parse_cac_yaml_ordered(content)
+        if key not in self._original:
+            self._original[key] = key.read_text(encoding="utf-8")
+        self._data[key] = data
+
+    def changes(self) -> Dict[pathlib.Path, str]:
+        """Serialize all loaded files and return the content of those that changed."""
+        changed: Dict[pathlib.Path, str] = {}
+        for key, data in self._data.items():
+            content = dump_cac_yaml_ordered(data)
+            if content != self._original[key]:
+                changed[key] = content
+        return changed
+
+    def diff(self) -> Dict[pathlib.Path, str]:
+        """Return a unified diff of every changed file, keyed by file path."""
+        diffs: Dict[pathlib.Path, str] = {}
+        for key, content in self.changes().items():
+            diffs[key] = "".join(
+                difflib.unified_diff(
+                    self._original[key].splitlines(keepends=True),
+                    content.splitlines(keepends=True),
+                    fromfile=f"a/{key}",
+                    tofile=f"b/{key}",
+                )
+            )
+        return diffs
+
+    def flush(self) -> List[pathlib.Path]:
+        """
+        Write every changed file back to disk.
+
+        In dry run mode the diffs are logged instead and nothing is written.
+        Returns the list of files that were (or would have been) written.
+        """
+        if self.dry_run:
+            diffs = self.diff()
+            for key, file_diff in diffs.items():
+                logger.info(f"Dry run, changes for {key}:\n{file_diff}")
+            return list(diffs.keys())
+
+        written: List[pathlib.Path] = []
+        for key, content in self.changes().items():
+            key.write_text(content, encoding="utf-8")
+            # the written content is the new baseline for later flushes
+            self._original[key] = content
+            written.append(key)
+            logger.debug(f"Wrote {key}")
+        return written
@@ -4,19 +4,33 @@
 """Autosync command"""
 
 import logging
+import pathlib
 import sys
 import traceback
-from typing import Any, List
+from typing import Any, Dict, List
 
 import click
 
-from complyscribe.cli.options.common import common_options, git_options
+from complyscribe.cli.options.common import (
+    changed_since_option,
+    common_options,
+    git_options,
+    jobs_option,
+)
 from complyscribe.cli.utils import comma_sep_to_list, run_bot
 from complyscribe.const import ERROR_EXIT_CODE
 from complyscribe.tasks.assemble_task import AssembleTask
 from complyscribe.tasks.authored import types
 from complyscribe.tasks.authored.base_authored import AuthoredObjectBase
+from complyscribe.tasks.autosync_state import (
+    ASSEMBLE,
+    REGENERATE,
+    AutosyncState,
+    ChangedModelFilter,
+    RecordAutosyncStateTask,
+)
 from complyscribe.tasks.base_task import ModelFilter, TaskBase
+from complyscribe.tasks.changed_models import ChangedModels, get_changed_files
 from complyscribe.tasks.regenerate_task import RegenerateTask
 
 logger = logging.getLogger(__name__)
@@ -69,6 +83,15 @@ logger = logging.getLogger(__name__)
     type=str,
     required=False,
 )
+@click.option(
+    "--full",
+    help="Process all models, not only the ones changed since the last autosync.",
+    is_flag=True,
+    default=False,
+    show_default=True,
+)
+@changed_since_option
+@jobs_option
 def autosync_cmd(ctx: click.Context, **kwargs: Any) -> None:
     """Command to autosync catalog, profile, compdef and ssp."""
 
@@ -87,8 +110,9 @@ def autosync_cmd(ctx: click.Context, **kwargs: Any) -> None:
         kwargs.update({"patterns": comma_sep_to_list(kwargs["file_patterns"])})
 
     try:
+        skip_patterns = comma_sep_to_list(kwargs.get("skip_items", ""))
         model_filter: ModelFilter = ModelFilter(
-            skip_patterns=comma_sep_to_list(kwargs.get("skip_items", "")),
+            skip_patterns=skip_patterns,
             include_patterns=["*"],
         )
         authored_object: AuthoredObjectBase = types.get_authored_object(
@@ -96,6 +120,35 @@ def autosync_cmd(ctx: click.Context, **kwargs: Any) -> None:
             working_dir,
             kwargs.get("ssp_index_file", ""),
         )
+        state = AutosyncState(
+            working_dir,
+            oscal_model,
+            markdown_dir,
+            kwargs.get("ssp_index_file") or "",
+        )
+        model_dir = types.get_trestle_model_dir(authored_object)
+        selected_filter: ModelFilter = model_filter
+        if kwargs.get("changed_since"):
+            changes = ChangedModels(
+                working_dir, get_changed_files(working_dir, kwargs["changed_since"])
+            )
+            changes.add_from_dir(markdown_dir, model_dir)
+            changes.add_dependents(kwargs.get("ssp_index_file") or "")
+            selected_filter = changes.select(
+                model_filter,
+                {
+                    pathlib.Path(working_dir, markdown_dir): model_dir,
+                    pathlib.Path(working_dir, model_dir): model_dir,
+                },
+            )
+        # Models are only processed when their inputs changed since the
+        # last successful autosync, unless a full run is requested.
+        assemble_filter: ModelFilter = selected_filter
+        regenerate_filter: ModelFilter = selected_filter
+        if not kwargs.get("full"):
+            assemble_filter = ChangedModelFilter(selected_filter, state, ASSEMBLE)
+            regenerate_filter = ChangedModelFilter(selected_filter, state, REGENERATE)
+        search_paths: Dict[str, pathlib.Path] = {}
 
         # Assuming an edit has occurred assemble would be run before regenerate.
         if not kwargs.get("skip_assemble"):
@@ -103,9 +156,11 @@ def autosync_cmd(ctx: click.Context, **kwargs: Any) -> None:
                 authored_object=authored_object,
                 markdown_dir=markdown_dir,
                 version=kwargs.get("version", ""),
-                model_filter=model_filter,
+                model_filter=assemble_filter,
+                jobs=kwargs.get("jobs", 1),
             )
             pre_tasks.append(assemble_task)
+            search_paths[ASSEMBLE] = pathlib.Path(working_dir, markdown_dir)
         else:
             logger.info("Assemble task skipped.")
 
@@ -113,12 +168,26 @@ def autosync_cmd(ctx: click.Context, **kwargs: Any) -> None:
             regenerate_task: RegenerateTask = RegenerateTask(
                 authored_object=authored_object,
                 markdown_dir=markdown_dir,
-                model_filter=model_filter,
+                model_filter=regenerate_filter,
+                jobs=kwargs.get("jobs", 1),
             )
             pre_tasks.append(regenerate_task)
+            search_paths[REGENERATE] = pathlib.Path(working_dir, model_dir)
         else:
             logger.info("Regeneration task skipped.")
 
+        if search_paths:
+            # Only the selected models were processed, others keep their state
+            pre_tasks.append(
+                RecordAutosyncStateTask(
+                    state,
+                    search_paths,
+                    working_dir,
+                    selected_filter,
+                    dry_run=kwargs.get("dry_run", False),
+                )
+            )
+
         results = run_bot(pre_tasks, kwargs)
         logger.debug(f"complyscribe results: {results}")
     except Exception as e:
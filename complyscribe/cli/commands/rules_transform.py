@@ -4,20 +4,26 @@
 """Module for rules-transform command"""
 
 import logging
+import pathlib
 from typing import Any, List
 
 import click
+from trestle.common.const import MODEL_DIR_COMPDEF
 
 from complyscribe.cli.options.common import (
+    changed_since_option,
     common_options,
     git_options,
     handle_exceptions,
+    jobs_option,
 )
 from complyscribe.cli.utils import comma_sep_to_list, run_bot
 from complyscribe.const import RULES_VIEW_DIR
 from complyscribe.tasks.authored.compdef import AuthoredComponentDefinition
 from complyscribe.tasks.base_task import ModelFilter, TaskBase
+from complyscribe.tasks.changed_models import ChangedModels, get_changed_files
 from complyscribe.tasks.regenerate_task import RegenerateTask
+from complyscribe.tasks.rule_cache import RuleCache
 from complyscribe.tasks.rule_transform_task import RuleTransformTask
 from complyscribe.transformers.yaml_transformer import ToRulesYAMLTransformer
 
@@ -47,6 +53,22 @@ logger = logging.getLogger(__name__)
     type=str,
     help="Comma-separated list of glob patterns for directories to skip when running tasks.",
 )
+@click.option(
+    "--csv-compatibility",
+    help="Build component definitions through an intermediate CSV file.",
+    is_flag=True,
+    default=False,
+    show_default=True,
+)
+@click.option(
+    "--full",
+    help="Transform all rules, not only the ones changed since the last run.",
+    is_flag=True,
+    default=False,
+    show_default=True,
+)
+@changed_since_option
+@jobs_option
 @handle_exceptions
 def rules_transform_cmd(ctx: click.Context, **kwargs: Any) -> None:
     """Run the rule transform operation."""
@@ -55,6 +77,20 @@ def rules_transform_cmd(ctx: click.Context, **kwargs: Any) -> None:
         skip_patterns=comma_sep_to_list(kwargs.get("skip_items", "")),
         include_patterns=["*"],
     )
+    if kwargs.get("changed_since"):
+        working_dir = str(kwargs["repo_path"].resolve())
+        changes = ChangedModels(
+            working_dir, get_changed_files(working_dir, kwargs["changed_since"])
+        )
+        changes.add_from_dir(kwargs["rules_view_dir"], MODEL_DIR_COMPDEF)
+        changes.add_dependents()
+        model_filter = changes.select(
+            model_filter,
+            {
+                pathlib.Path(working_dir, kwargs["rules_view_dir"]): MODEL_DIR_COMPDEF,
+                pathlib.Path(working_dir, MODEL_DIR_COMPDEF): MODEL_DIR_COMPDEF,
+            },
+        )
 
     transformer = ToRulesYAMLTransformer()
     rule_transform_task: RuleTransformTask = RuleTransformTask(
@@ -62,6 +98,9 @@ def rules_transform_cmd(ctx: click.Context, **kwargs: Any) -> None:
         rules_view_dir=kwargs["rules_view_dir"],
         rule_transformer=transformer,
         model_filter=model_filter,
+        csv_compatibility=kwargs["csv_compatibility"],
+        jobs=kwargs.get("jobs", 1),
+        rule_cache=None if kwargs["full"] else RuleCache(kwargs["repo_path"]),
     )
     regenerate_task: RegenerateTask = RegenerateTask(
         markdown_dir=kwargs["markdown_dir"],
@@ -13,6 +13,7 @@ from complyscribe.cli.options.common import (
     common_options,
     git_options,
     handle_exceptions,
+    jobs_option,
 )
 from complyscribe.cli.utils import run_bot
 from complyscribe.tasks.base_task import TaskBase
@@ -59,11 +60,13 @@ def sync_oscal_content_cmd(ctx: click.Context) -> None:
     help="Name of the profile in trestle workspace",
     required=True,
 )
+@jobs_option
 def sync_oscal_cd_to_cac_content_cmd(
     ctx: click.Context,
     cac_content_root: pathlib.Path,
     product: str,
     oscal_profile: str,
+    jobs: int,
     **kwargs: Any,
 ) -> None:
     """Sync OSCAL component definition to cac content"""
@@ -74,6 +77,8 @@ def sync_oscal_cd_to_cac_content_cmd(
         working_dir=working_dir,
         product=product,
         oscal_profile=oscal_profile,
+        dry_run=kwargs.get("dry_run", False),
+        jobs=jobs,
     )
     pre_tasks.append(sync_cac_content_task)
     # change working_dir to CaC content repo, since this task changing
@@ -14,6 +14,7 @@ from complyscribe.cli.options.common import (
     common_options,
     git_options,
     handle_exceptions,
+    jobs_option,
 )
 from complyscribe.cli.utils import comma_sep_to_list
 from complyscribe.const import ERROR_EXIT_CODE
@@ -85,8 +86,19 @@ def load_value_from_ctx(
     envvar="COMPLYSCRIBE_UPSTREAMS_SKIP_VALIDATION",
     callback=load_value_from_ctx,
 )
+@click.option(
+    "--cache-dir",
+    type=str,
+    help="Directory of the git mirror cache of the upstream repositories. \
+        Upstream repositories are mirrored into the cache on first use, \
+        later runs only fetch their new objects. POSIX platforms only.",
+    required=False,
+    envvar="COMPLYSCRIBE_UPSTREAMS_CACHE_DIR",
+    callback=load_value_from_ctx,
+)
 @common_options
 @git_options
+@jobs_option
 @handle_exceptions
 def sync_upstreams_cmd(ctx: click.Context, **kwargs: Any) -> None:
     """Add new upstream sources to workspace."""
@@ -109,6 +121,8 @@ def sync_upstreams_cmd(ctx: click.Context, **kwargs: Any) -> None:
         git_sources=comma_sep_to_list(kwargs["sources"]),
         model_filter=model_filter,
         validate=validate,
+        cache_dir=kwargs.get("cache_dir"),
+        jobs=kwargs.get("jobs", 1),
     )
 
     pre_tasks: List[TaskBase] = [sync_upstreams_task]
@@ -49,6 +49,7 @@ class UpstreamsConfig(BaseModel):
     include_models: List[str] = ["*"]
     exclude_models: List[str] = []
     skip_validation: bool = False
+    cache_dir: Optional[str] = None
 
 
 class ComplyScribeConfig(BaseModel):
@@ -99,6 +100,8 @@ class ComplyScribeConfig(BaseModel):
             }
             if self.upstreams.exclude_models:
                 upstreams["exclude_models"] = self.upstreams.exclude_models
+            if self.upstreams.cache_dir:
+                upstreams["cache_dir"] = self.upstreams.cache_dir
 
             config_dict.update({"upstreams": upstreams})
 
@@ -184,3 +184,33 @@ def git_options(f: F) -> F:
     )(f)
 
     return f
+
+
+def jobs_option(f: F) -> F:
+    """
+    Configure the option to process independent items in parallel.
+    """
+    f = click.option(
+        "--jobs",
+        help="Number of parallel workers. Defaults to 1 (sequential).",
+        type=click.IntRange(min=1),
+        envvar="COMPLYSCRIBE_JOBS",
+        default=1,
+    )(f)
+
+    return f
+
+
+def changed_since_option(f: F) -> F:
+    """
+    Configure the option to only process models changed since a git reference.
+    """
+    f = click.option(
+        "--changed-since",
+        help="Only process models affected by files changed since this git reference "
+        "(e.g. a commit SHA or origin/main).",
+        type=str,
+        required=False,
+    )(f)
+
+    return f
@@ -8,13 +8,15 @@ from __future__ import annotations
 
 import os
 import re
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 import github3
 from github3.exceptions import AuthenticationFailed
 from github3.repos.repo import Repository
+from github3.session import GitHubSession
 
 from complyscribe import const
+from complyscribe.http_session import mount_retries
 from complyscribe.provider import GitProvider, GitProviderException
 from complyscribe.reporter import BotResults, ResultsReporter
 
@@ -29,10 +31,12 @@ class GitHub(GitProvider):
         Args:
             access_token: Access token to make authenticated API requests.
         """
-        session: github3.GitHub = github3.GitHub()
+        # Reuse connections and retry rate limited and transient failed requests
+        session: github3.GitHub = github3.GitHub(session=mount_retries(GitHubSession()))
         session.login(token=access_token)
 
         self._session = session
+        self._repositories: Dict[Tuple[str, str], Repository] = {}
 
         # For repo URL input validation
         pattern = r"^(?:https?://)?github\.com/([^/]+)/([^/.]+)"
@@ -64,6 +68,20 @@ class GitHub(GitProvider):
         repo = match.group(2)
         return (owner, repo)
 
+    def _get_repository(self, ns: str, repo_name: str) -> Repository:
+        """Get a repository, fetching it once per GitHub object"""
+        key = (ns, repo_name)
+        if key not in self._repositories:
+            repository: Optional[Repository] = self._session.repository(
+                owner=ns, repository=repo_name
+            )
+            if repository is None:
+                raise GitProviderException(
+                    f"Repository for {ns}/{repo_name} cannot be None"
+                )
+            self._repositories[key] = repository
+        return self._repositories[key]
+
     def create_pull_request(
         self,
         ns: str,
@@ -88,14 +106,7 @@ class GitHub(GitProvider):
             Pull request number
         """
         try:
-            repository: Optional[Repository] = self._session.repository(
-                owner=ns, repository=repo_name
-            )
-            if repository is None:
-                raise GitProviderException(
-                    f"Repository for {ns}/{repo_name} cannot be None"
-                )
-
+            repository = self._get_repository(ns, repo_name)
             pull_request = repository.create_pull(
                 title=title, body=body, base=base_branch, head=head_branch
             )
@@ -114,6 +125,60 @@ class GitHub(GitProvider):
                 f"Authentication error during pull request creation in {ns}/{repo_name}: {e}"
             )
 
+    def upsert_pull_request(
+        self,
+        ns: str,
+        repo_name: str,
+        base_branch: str,
+        head_branch: str,
+        title: str,
+        body: str,
+    ) -> int:
+        """
+        Update the open pull request for a branch or create one
+
+        Args:
+            ns: Namespace or owner of the repository
+            repo_name: Name of the repository
+            base_branch: Branch that changes need to be merged into
+            head_branch: Branch with changes
+            title: Text for the title of the pull_request
+            body: Text for the body of the pull request
+
+        Returns:
+            Pull request number
+        """
+        try:
+            repository = self._get_repository(ns, repo_name)
+            # The head branch is in the repository, so it is owned by ns
+            pull_requests = list(
+                repository.pull_requests(
+                    state="open",
+                    head=f"{ns}:{head_branch}",
+                    base=base_branch,
+                    number=1,
+                )
+            )
+            if not pull_requests:
+                return self.create_pull_request(
+                    ns, repo_name, base_branch, head_branch, title, body
+                )
+
+            pull_request = pull_requests[0]
+            if pull_request.title != title or pull_request.body != body:
+                if not pull_request.update(title=title, body=body):
+                    raise GitProviderException(
+                        (
+                            f"Failed to update pull request {pull_request.number} "
+                            f"in {ns}/{repo_name}"
+                        )
+                    )
+            return pull_request.number
+        except AuthenticationFailed as e:
+            raise GitProviderException(
+                f"Authentication error during pull request update in {ns}/{repo_name}: {e}"
+            )
+
 
 class GitHubActionsResultsReporter(ResultsReporter):
     """Report bot results to the console in GitHub Actions"""
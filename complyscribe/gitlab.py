@@ -9,11 +9,14 @@ from __future__ import annotations
 import os
 import re
 import time
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 from urllib.parse import ParseResult, urlparse
 
 import gitlab
+import requests
+from gitlab.v4.objects import Project
 
+from complyscribe.http_session import mount_retries
 from complyscribe.provider import GitProvider, GitProviderException
 from complyscribe.reporter import BotResults, ResultsReporter
 
@@ -22,7 +25,13 @@ class GitLab(GitProvider):
     def __init__(self, api_token: str, server_url: str = "https://gitlab.com"):
         """Create GitLab object to interact with the GitLab API"""
 
-        self._gitlab_client = gitlab.Gitlab(server_url, private_token=api_token)
+        # Reuse connections and retry rate limited and transient failed requests
+        self._gitlab_client = gitlab.Gitlab(
+            server_url,
+            private_token=api_token,
+            session=mount_retries(requests.Session()),
+        )
+        self._projects: Dict[str, Project] = {}
 
         # For repo URL input validation
         parsed_url: ParseResult = urlparse(server_url)
@@ -57,6 +66,13 @@ class GitLab(GitProvider):
         repo = match.group(2)
         return (owner, repo)
 
+    def _get_project(self, ns: str, repo_name: str) -> Project:
+        """Get a project, fetching it once per GitLab object"""
+        path = f"{ns}/{repo_name}"
+        if path not in self._projects:
+            self._projects[path] = self._gitlab_client.projects.get(path)
+        return self._projects[path]
+
     def create_pull_request(
         self,
         ns: str,
@@ -82,7 +98,7 @@ class GitLab(GitProvider):
         """
 
         try:
-            project = self._gitlab_client.projects.get(f"{ns}/{repo_name}")
+            project = self._get_project(ns, repo_name)
             merge_request = project.mergerequests.create(
                 {
                     "source_branch": head_branch,
@@ -103,6 +119,66 @@ class GitLab(GitProvider):
                 f"Authentication error during merge request creation in {ns}/{repo_name}: {e}"
             )
 
+    def upsert_pull_request(
+        self,
+        ns: str,
+        repo_name: str,
+        base_branch: str,
+        head_branch: str,
+        title: str,
+        body: str,
+    ) -> int:
+        """
+        Update the open merge request for a branch or create one
+
+        Args:
+            ns: Namespace or owner of the repository
+            repo_name: Name of the repository
+            base_branch: Branch that changes need to be merged into
+            head_branch: Branch with changes
+            title: Text for the title of the pull_request
+            body: Text for the body of the pull request
+
+        Returns:
+            Pull/Merge request number
+        """
+
+        try:
+            project = self._get_project(ns, repo_name)
+            merge_requests = project.mergerequests.list(
+                state="opened",
+                source_branch=head_branch,
+                target_branch=base_branch,
+                per_page=1,
+                get_all=False,
+            )
+            if not merge_requests:
+                return self.create_pull_request(
+                    ns, repo_name, base_branch, head_branch, title, body
+                )
+
+            merge_request = merge_requests[0]
+            # Only changed attributes are sent, nothing is sent if none changed
+            if merge_request.title != title:
+                merge_request.title = title
+            if merge_request.description != body:
+                merge_request.description = body
+            merge_request.save()
+
+            return merge_request.id
+
+        except (
+            gitlab.exceptions.GitlabListError,
+            gitlab.exceptions.GitlabUpdateError,
+        ) as e:
+            raise GitProviderException(
+                f"Failed to update merge request in {ns}/{repo_name}: {e}"
+            )
+        except gitlab.exceptions.GitlabAuthenticationError as e:
+            raise GitProviderException(
+                f"Authentication error during merge request update in {ns}/{repo_name}: {e}"
+            )
+
 
 class GitLabCIResultsReporter(ResultsReporter):
     """Report bot results to the console in GitLabCI"""
@@ -0,0 +1,27 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Content hashes of workspace files shared by the change detection caches"""
+
+import hashlib
+import pathlib
+
+
+def hash_tree(path: pathlib.Path) -> str:
+    """
+    Hash the content of a file or of all files under a directory.
+
+    Relative file paths are part of the hash, so renamed or removed
+    files change it.
+    """
+    digest = hashlib.sha256()
+    if path.is_file():
+        digest.update(path.read_bytes())
+        return digest.hexdigest()
+    for file_path in sorted(p for p in path.rglob("*") if p.is_file()):
+        digest.update(file_path.relative_to(path).as_posix().encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(file_path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()
@@ -0,0 +1,167 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Shared HTTP session layer for the Git provider API clients."""
+
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional, TypeVar
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRIES = 5
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_MAX_DELAY = 60.0
+DEFAULT_POOL_SIZE = 10
+
+# Transient server errors, only retried for idempotent methods
+TRANSIENT_STATUSES = frozenset({500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Rate limit reset headers of GitHub and GitLab, as epoch seconds
+_RESET_HEADERS = ("X-RateLimit-Reset", "RateLimit-Reset")
+_REMAINING_HEADERS = ("X-RateLimit-Remaining", "RateLimit-Remaining")
+
+SessionT = TypeVar("SessionT", bound=requests.Session)
+
+
+def _is_rate_limited(response: requests.Response) -> bool:
+    """Check if the request was rejected by a rate limit."""
+    if response.status_code == 429:
+        return True
+    if response.status_code != 403:
+        return False
+    # GitHub rejects requests over the rate limit with a 403
+    return "Retry-After" in response.headers or any(
+        response.headers.get(header) == "0" for header in _REMAINING_HEADERS
+    )
+
+
+def _header_delay(response: requests.Response) -> Optional[float]:
+    """Return the delay requested by the rate limit headers of a response."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            try:
+                return max(
+                    parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0
+                )
+            except (TypeError, ValueError):
+                return None
+    for header in _RESET_HEADERS:
+        reset = response.headers.get(header)
+        if reset:
+            try:
+                return max(float(reset) - time.time(), 0.0)
+            except ValueError:
+                return None
+    return None
+
+
+class RetryingHTTPAdapter(HTTPAdapter):
+    """
+    HTTP adapter retrying rate limited and transient failed requests.
+
+    Rate limited requests are retried for any method after the delay
+    requested by the Retry-After or rate limit reset headers. Transient
+    server errors are only retried for idempotent methods, with exponential
+    backoff. Requests are not retried if the requested delay exceeds
+    max_delay. Connection errors are retried by urllib3.
+    """
+
+    def __init__(
+        self,
+        retries: int = DEFAULT_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        pool_size: int = DEFAULT_POOL_SIZE,
+    ) -> None:
+        self._retries = retries
+        self._backoff_factor = backoff_factor
+        self._max_delay = max_delay
+        super().__init__(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=None,
+                connect=retries,
+                read=0,
+                redirect=False,
+                status=0,
+                other=0,
+                backoff_factor=backoff_factor,
+            ),
+        )
+
+    def _retry_delay(
+        self,
+        request: requests.PreparedRequest,
+        response: requests.Response,
+        attempt: int,
+    ) -> Optional[float]:
+        """Return the delay before retrying the request, or None to not retry."""
+        if attempt >= self._retries:
+            return None
+        if _is_rate_limited(response):
+            delay = _header_delay(response)
+        elif (
+            response.status_code in TRANSIENT_STATUSES
+            and request.method in IDEMPOTENT_METHODS
+        ):
+            delay = _header_delay(response)
+        else:
+            return None
+        if delay is None:
+            delay = self._backoff_factor * (2**attempt)
+        if delay > self._max_delay:
+            logger.warning(
+                f"Not retrying {request.method} {request.url}, "
+                f"the requested delay of {delay:.0f}s is too long"
+            )
+            return None
+        return delay
+
+    def send(  # type: ignore[override]
+        self, request: requests.PreparedRequest, **kwargs: Any
+    ) -> requests.Response:
+        """Send the request, retrying it while the response allows it."""
+        attempt = 0
+        while True:
+            response = super().send(request, **kwargs)
+            delay = self._retry_delay(request, response, attempt)
+            if delay is None:
+                return response
+            logger.info(
+                f"Retrying {request.method} {request.url} in {delay:.1f}s "
+                f"after status {response.status_code}"
+            )
+            # Consume the body, so the connection is released to the pool
+            response.content
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+
+def mount_retries(session: SessionT, **kwargs: Any) -> SessionT:
+    """
+    Mount a retrying, connection pooling adapter on a session.
+
+    Args:
+        session: Session of an API client
+        kwargs: Arguments of the RetryingHTTPAdapter
+
+    Returns:
+        The session
+    """
+    adapter = RetryingHTTPAdapter(**kwargs)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
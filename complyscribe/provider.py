@@ -53,3 +53,21 @@ class GitProvider(ABC):
         body: str,
     ) -> int:
         """Create a pull request for a specified branch and return the request number"""
+
+    @abstractmethod
+    def upsert_pull_request(
+        self,
+        ns: str,
+        repo_name: str,
+        base_branch: str,
+        head_branch: str,
+        title: str,
+        body: str,
+    ) -> int:
+        """
+        Update the open pull request for a specified branch or create one.
+
+        The open pull request from head_branch to base_branch is looked up
+        with a single API call. If it exists, its title and body are updated,
+        otherwise a pull request is created. Returns the request number.
+        """
@@ -3,8 +3,28 @@
 
 """Results reporting for the ComplyScribe."""
 
-from dataclasses import dataclass
-from typing import List
+import posixpath
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+@dataclass
+class FileChange:
+    """A file changed by the bot commit"""
+
+    path: str
+    change_type: str
+    insertions: int = 0
+    deletions: int = 0
+
+
+@dataclass
+class ChangeRollup:
+    """The changes of the files under a directory"""
+
+    files: int = 0
+    insertions: int = 0
+    deletions: int = 0
 
 
 @dataclass
@@ -14,6 +34,7 @@ class BotResults:
     changes: List[str]
     commit_sha: str
     pr_number: int
+    summary: List[FileChange] = field(default_factory=list)
 
 
 class ResultsReporter:
@@ -52,3 +73,27 @@ class ResultsReporter:
         The goal is consistent representation.
         """
         return "\n".join(changes)
+
+    @staticmethod
+    def get_directory_rollup(
+        summary: List[FileChange], depth: int = 1
+    ) -> Dict[str, ChangeRollup]:
+        """
+        Return the changes of a commit summary rolled up by directory.
+
+        Args:
+            summary: Changed files of the commit
+            depth: Number of leading path components of the directories
+
+        Returns:
+            Rollup of each directory, sorted by directory. Files at the
+            top of the repository are rolled up under ".".
+        """
+        rollups: Dict[str, ChangeRollup] = {}
+        for change in summary:
+            directory = "/".join(posixpath.dirname(change.path).split("/")[:depth])
+            rollup = rollups.setdefault(directory or ".", ChangeRollup())
+            rollup.files += 1
+            rollup.insertions += change.insertions
+            rollup.deletions += change.deletions
+        return dict(sorted(rollups.items()))
@@ -7,29 +7,43 @@
 import logging
 import os
 import pathlib
-from typing import Optional
+from functools import partial
+from typing import List, Optional
 
 from complyscribe import const
+from complyscribe.tasks.authored import types
 from complyscribe.tasks.authored.base_authored import (
     AuthoredObjectBase,
     AuthoredObjectException,
 )
 from complyscribe.tasks.base_task import ModelFilter, TaskBase, TaskException
+from complyscribe.tasks.parallel import format_failures, run_for_models
 
 logger = logging.getLogger(__name__)
 
 
+def _assemble_model(
+    authored_object: AuthoredObjectBase, version: str, model_path: str
+) -> None:
+    """Assemble a single markdown model into JSON"""
+    logger.info(f"Assembling model {model_path}")
+    authored_object.assemble(markdown_path=model_path, version_tag=version)
+
+
 class AssembleTask(TaskBase):
     """
     Assemble Markdown into OSCAL content
     """
 
+    records_writes = True
+
     def __init__(
         self,
         authored_object: AuthoredObjectBase,
         markdown_dir: str,
         version: str = "",
         model_filter: Optional[ModelFilter] = None,
+        jobs: int = 1,
     ) -> None:
         """
         Initialize assemble task.
@@ -39,11 +53,13 @@ class AssembleTask(TaskBase):
             markdown_dir: Location of directory to write Markdown in
             model_filter: Optional filter to apply to the task to include or exclude models
             from processing
+            jobs: Number of worker processes to assemble models with
         """
 
         self._authored_object = authored_object
         self._markdown_dir = markdown_dir
         self._version = version
+        self._jobs = jobs
         working_dir = self._authored_object.get_trestle_root()
         super().__init__(working_dir, model_filter)
 
@@ -62,17 +78,33 @@ class AssembleTask(TaskBase):
         if not os.path.exists(search_path):
             raise TaskException(f"Markdown directory {search_path} does not exist")
 
-        for model in self.iterate_models(pathlib.Path(search_path)):
-            # Construct model path from markdown path. AuthoredObject already has
-            # the working dir data as part of object construction.
-            logger.info(f"Assembling model {model}")
-            model_base_name = os.path.basename(model)
-            model_path = os.path.join(self._markdown_dir, model_base_name)
-            try:
-                self._authored_object.assemble(
-                    markdown_path=model_path, version_tag=self._version
-                )
-            except AuthoredObjectException as e:
-                raise TaskException(f"Assemble task failed for model {model_path}: {e}")
+        # Construct model path from markdown path. AuthoredObject already has
+        # the working dir data as part of object construction.
+        model_paths = [
+            os.path.join(self._markdown_dir, os.path.basename(model))
+            for model in self.iterate_models(pathlib.Path(search_path))
+        ]
+        self._record_model_writes(model_paths)
+        results = run_for_models(
+            partial(_assemble_model, self._authored_object, self._version),
+            model_paths,
+            self._jobs,
+            (AuthoredObjectException,),
+        )
+        failures = format_failures(results)
+        if failures:
+            raise TaskException(f"Assemble task failed for models:\n{failures}")
 
         return const.SUCCESS_EXIT_CODE
+
+    def _record_model_writes(self, model_paths: List[str]) -> None:
+        """Record the JSON model directories written by assembly"""
+        try:
+            model_dir = types.get_trestle_model_dir(self._authored_object)
+        except AuthoredObjectException:
+            self.record_unknown_writes(
+                f"unknown model directory for {type(self._authored_object).__name__}"
+            )
+            return
+        for model_path in model_paths:
+            self.record_write(os.path.join(model_dir, os.path.basename(model_path)))
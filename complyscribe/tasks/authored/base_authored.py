@@ -4,9 +4,11 @@
 
 """ComplyScribe base authored object"""
 
+import contextlib
 import os
 import pathlib
 from abc import ABC, abstractmethod
+from typing import ContextManager
 
 from trestle.common.file_utils import is_valid_project_root
 
@@ -43,3 +45,12 @@ class AuthoredObjectBase(ABC):
     @abstractmethod
     def regenerate(self, model_path: str, markdown_path: str) -> None:
         """Execute regeneration for model path"""
+
+    def regeneration_session(self) -> ContextManager[None]:
+        """
+        Return a context to regenerate several models in.
+
+        Objects can reuse content loaded for one model with the following
+        models regenerated within the context. No content is shared by default.
+        """
+        return contextlib.nullcontext()
@@ -7,7 +7,9 @@
 import logging
 import os
 import pathlib
-from typing import Callable, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
 
 import trestle.common.const as const
 import trestle.oscal.profile as prof
@@ -162,6 +164,14 @@ class AuthoredComponentDefinition(AuthoredObjectBase):
         rules_view_builder.write_to_yaml(rule_dir)
 
 
+@dataclass
+class RulesWriteResult:
+    """Outcome of writing rules to the rules view"""
+
+    written: int = 0
+    skipped: int = 0
+
+
 class RulesViewBuilder:
     """Write TrestleRule objects to YAML files in rules view."""
 
@@ -212,11 +222,50 @@ class RulesViewBuilder:
         """Add a rule to the builder."""
         self._rules.append(rule)
 
-    def write_to_yaml(self, compdef_path: pathlib.Path) -> None:
-        """Write the rules to YAML files in the rules view."""
-        for rule in self._rules:
-            rule_path: pathlib.Path = compdef_path.joinpath(
-                rule.component.name, rule.name + YAML_EXTENSION
-            )
-            rule_path.parent.mkdir(parents=True, exist_ok=True)
-            self._yaml_transformer.write_to_file(rule, rule_path)
+    def write_to_yaml(
+        self, compdef_path: pathlib.Path, jobs: Optional[int] = None
+    ) -> RulesWriteResult:
+        """
+        Write the rules to YAML files in the rules view.
+
+        Directories are created once and files are written by a thread pool.
+        Files that already have the content of their rule are not written.
+
+        Args:
+            compdef_path: Directory of the component definition in the rules view
+            jobs: Number of writer threads, defaults to the thread pool default
+
+        Returns:
+            The number of written and skipped rule files.
+        """
+        # the last rule for a path wins, as when writing sequentially
+        rule_files: Dict[pathlib.Path, TrestleRule] = {
+            compdef_path.joinpath(rule.component.name, rule.name + YAML_EXTENSION): rule
+            for rule in self._rules
+        }
+        for directory in {rule_path.parent for rule_path in rule_files}:
+            directory.mkdir(parents=True, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            written = list(executor.map(self._write_rule, rule_files.items()))
+
+        result = RulesWriteResult(
+            written=sum(written), skipped=len(written) - sum(written)
+        )
+        logger.info(
+            f"Wrote {result.written} rule files to {compdef_path}, "
+            f"skipped {result.skipped} unchanged"
+        )
+        return result
+
+    def _write_rule(self, rule_file: Tuple[pathlib.Path, TrestleRule]) -> bool:
+        """Write a rule file unless its content is unchanged."""
+        rule_path, rule = rule_file
+        content = self._yaml_transformer.transform(rule)
+        try:
+            if rule_path.read_text(encoding="utf-8") == content:
+                return False
+        except FileNotFoundError:
+            pass
+        rule_path.write_text(content, encoding="utf-8")
+        return True
@@ -8,7 +8,9 @@ import json
 import logging
 import os
 import pathlib
-from typing import Any, Dict, List, Optional
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
 
 from trestle.common.const import SSP_MAIN_COMP_NAME
 from trestle.common.err import TrestleError
@@ -29,6 +31,11 @@ from complyscribe.tasks.authored.base_authored import (
     AuthoredObjectBase,
     AuthoredObjectException,
 )
+from complyscribe.tasks.authored.ssp_session import (
+    COMPDEF_LOADING,
+    PROFILE_RESOLUTION,
+    SSPRegenerationSession,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -171,8 +178,24 @@ class AuthoredSSP(AuthoredObjectBase):
         Initialize authored ssps object.
         """
         self.ssp_index = ssp_index
+        self._session: Optional[SSPRegenerationSession] = None
         super().__init__(trestle_root)
 
+    @contextmanager
+    def regeneration_session(self) -> Iterator[None]:
+        """
+        Regenerate SSPs sharing resolved profiles and component definitions.
+
+        Each resolved profile catalog and component definition is loaded
+        once for all SSPs regenerated within the context.
+        """
+        with SSPRegenerationSession().activate() as session:
+            self._session = session
+            try:
+                yield
+            finally:
+                self._session = None
+
     def assemble(self, markdown_path: str, version_tag: str = "") -> None:
         """Run assemble actions for ssp type at the provided path"""
         ssp = os.path.basename(markdown_path)
@@ -214,6 +237,8 @@ class AuthoredSSP(AuthoredObjectBase):
         trestle_root = pathlib.Path(self.get_trestle_root())
         authoring = AgileAuthoring(trestle_root)
 
+        start = time.perf_counter()
+        timings_before = dict(self._session.timings) if self._session else {}
         try:
             success = authoring.generate_ssp_markdown(
                 output=os.path.join(markdown_path, ssp),
@@ -231,6 +256,26 @@ class AuthoredSSP(AuthoredObjectBase):
                 )
         except TrestleError as e:
             raise AuthoredObjectException(f"Trestle generate failed for {ssp}: {e}")
+        self._log_timings(ssp, time.perf_counter() - start, timings_before)
+
+    def _log_timings(
+        self, ssp: str, total: float, timings_before: Dict[str, float]
+    ) -> None:
+        """Log the time spent regenerating an SSP"""
+        if self._session is None:
+            logger.debug(f"Regenerated SSP {ssp} in {total:.2f}s")
+            return
+        spent = {
+            operation: self._session.timings[operation] - timings_before[operation]
+            for operation in (PROFILE_RESOLUTION, COMPDEF_LOADING)
+        }
+        markdown = total - sum(spent.values())
+        logger.info(
+            f"Regenerated SSP {ssp} in {total:.2f}s: "
+            f"{PROFILE_RESOLUTION} {spent[PROFILE_RESOLUTION]:.2f}s, "
+            f"{COMPDEF_LOADING} {spent[COMPDEF_LOADING]:.2f}s, "
+            f"markdown writing {markdown:.2f}s"
+        )
 
     def create_new_default(
         self,
@@ -0,0 +1,111 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Share loaded content across the regeneration of several SSPs"""
+
+import copy
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Tuple
+
+from trestle.common.model_utils import ModelUtils
+from trestle.core.profile_resolver import ProfileResolver
+from trestle.oscal.catalog import Catalog
+from trestle.oscal.component import ComponentDefinition
+
+logger = logging.getLogger(__name__)
+
+PROFILE_RESOLUTION = "profile resolution"
+COMPDEF_LOADING = "compdef loading"
+
+
+def _arguments_key(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Tuple[Any, ...]:
+    return tuple(str(arg) for arg in args) + tuple(
+        sorted((name, str(value)) for name, value in kwargs.items())
+    )
+
+
+class SSPRegenerationSession:
+    """
+    Cache of resolved profile catalogs and component definitions.
+
+    While active, trestle profile resolution and component definition loading
+    are served from memory, so SSPs sharing a profile or component definitions
+    only resolve or load them once. Callers get a copy of the cached models
+    and may modify them.
+
+    Notes:
+        The workspace models must not be modified while the session is active.
+    """
+
+    def __init__(self) -> None:
+        self._catalogs: Dict[Tuple[Any, ...], Catalog] = {}
+        self._compdefs: Dict[Tuple[Any, ...], Tuple[ComponentDefinition, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        # Time spent in each operation, including cache hits
+        self.timings: Dict[str, float] = {PROFILE_RESOLUTION: 0.0, COMPDEF_LOADING: 0.0}
+
+    def _timed(self, operation: str, start: float) -> None:
+        self.timings[operation] += time.perf_counter() - start
+
+    @contextmanager
+    def activate(self) -> Iterator["SSPRegenerationSession"]:
+        """Serve profile resolution and compdef loading from the session"""
+        resolve = ProfileResolver.get_resolved_profile_catalog
+        load_model = ModelUtils.load_model_for_class
+
+        def cached_resolve(*args: Any, **kwargs: Any) -> Catalog:
+            start = time.perf_counter()
+            key = _arguments_key(args, kwargs)
+            if key in self._catalogs:
+                self.hits += 1
+            else:
+                self.misses += 1
+                self._catalogs[key] = resolve(*args, **kwargs)
+            catalog = copy.deepcopy(self._catalogs[key])
+            self._timed(PROFILE_RESOLUTION, start)
+            return catalog
+
+        def cached_load(
+            trestle_root: Any,
+            model_name: str,
+            model_class: Any,
+            *args: Any,
+            **kwargs: Any,
+        ) -> Any:
+            if model_class is not ComponentDefinition:
+                return load_model(
+                    trestle_root, model_name, model_class, *args, **kwargs
+                )
+            start = time.perf_counter()
+            key = (str(trestle_root), model_name) + _arguments_key(args, kwargs)
+            if key in self._compdefs:
+                self.hits += 1
+            else:
+                self.misses += 1
+                self._compdefs[key] = load_model(
+                    trestle_root, model_name, model_class, *args, **kwargs
+                )
+            compdef, path = self._compdefs[key]
+            result = copy.deepcopy(compdef), path
+            self._timed(COMPDEF_LOADING, start)
+            return result
+
+        ProfileResolver.get_resolved_profile_catalog = staticmethod(  # type: ignore
+            cached_resolve
+        )
+        ModelUtils.load_model_for_class = staticmethod(cached_load)  # type: ignore
+        try:
+            yield self
+        finally:
+            ProfileResolver.get_resolved_profile_catalog = staticmethod(  # type: ignore
+                resolve
+            )
+            ModelUtils.load_model_for_class = staticmethod(load_model)  # type: ignore
+            logger.debug(
+                f"SSP regeneration session: {self.hits} cache hits, "
+                f"{self.misses} misses"
+            )
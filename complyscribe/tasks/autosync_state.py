@@ -0,0 +1,324 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Content-hash change detection for autosync"""
+
+import hashlib
+import json
+import logging
+import os
+import pathlib
+from typing import Collection, Dict, List, Optional, Set, Tuple
+
+from trestle.common import const as trestle_const
+
+from complyscribe import const
+from complyscribe.hashing import hash_tree
+from complyscribe.tasks.authored.types import AuthoredType
+from complyscribe.tasks.base_task import ModelFilter, TaskBase
+
+logger = logging.getLogger(__name__)
+
+AUTOSYNC_STATE_FILE = "autosync-state.json"
+STATE_VERSION = 1
+
+ASSEMBLE = "assemble"
+REGENERATE = "regenerate"
+
+# Workspace model directories each authored type depends on. Profiles
+# depend on their imports instead, so a profile does not depend on itself
+# or on unrelated profiles.
+_UPSTREAM_MODEL_DIRS: Dict[str, List[str]] = {
+    AuthoredType.CATALOG.value: [],
+    AuthoredType.PROFILE.value: [],
+    AuthoredType.COMPDEF.value: [
+        trestle_const.MODEL_DIR_CATALOG,
+        trestle_const.MODEL_DIR_PROFILE,
+    ],
+    AuthoredType.SSP.value: [
+        trestle_const.MODEL_DIR_CATALOG,
+        trestle_const.MODEL_DIR_PROFILE,
+        trestle_const.MODEL_DIR_COMPDEF,
+    ],
+}
+
+
+def _import_hrefs(profile_path: pathlib.Path) -> Optional[List[str]]:
+    """Return the import hrefs of a profile JSON, or None if it cannot be read."""
+    try:
+        with open(profile_path, "r") as file:
+            data = json.load(file)
+        imports = data[trestle_const.MODEL_TYPE_PROFILE].get("imports", [])
+        return [str(profile_import["href"]) for profile_import in imports]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+class AutosyncState:
+    """
+    Content hashes of the inputs of each model at the last successful autosync.
+
+    The state is stored in the complyscribe config directory of the workspace
+    and is scoped by model type and markdown directory. The inputs of a model
+    are its markdown tree for assembly or its JSON for regeneration, plus the
+    workspace models it may depend on.
+    """
+
+    def __init__(
+        self,
+        working_dir: str,
+        oscal_model: str,
+        markdown_dir: str,
+        ssp_index_file: str = "",
+    ) -> None:
+        self._working_dir = pathlib.Path(working_dir)
+        self._oscal_model = oscal_model
+        self._scope = f"{oscal_model}:{markdown_dir}"
+        self._ssp_index_file = ssp_index_file
+        self._state_path = self._working_dir.joinpath(
+            const.COMPLYSCRIBE_CONFIG_DIR, AUTOSYNC_STATE_FILE
+        )
+        self._data = self._load()
+        # upstream hashes are computed once per task, since tasks
+        # run in order and may update the upstream models.
+        self._upstream: Dict[Tuple[str, str], str] = {}
+
+    @property
+    def state_path(self) -> pathlib.Path:
+        """Return the path of the state file"""
+        return self._state_path
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, str]]]:
+        if not self._state_path.exists():
+            return {}
+        try:
+            with open(self._state_path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable autosync state: {e}")
+            return {}
+        if data.get("version") != STATE_VERSION:
+            logger.info("Ignoring autosync state of another version")
+            return {}
+        return data.get("models", {})
+
+    def _profile_path(self, name: str) -> pathlib.Path:
+        return self._working_dir.joinpath(
+            trestle_const.MODEL_DIR_PROFILE,
+            name,
+            f"{trestle_const.MODEL_TYPE_PROFILE}.json",
+        )
+
+    def _imports_hash(self, name: str) -> str:
+        """
+        Hash the models imported by a profile, following imported profiles.
+
+        Imports outside of the workspace are hashed by their href. If a
+        profile JSON cannot be read, all catalogs and other profiles are
+        hashed instead.
+        """
+        digest = hashlib.sha256()
+        profile_dir = self._working_dir / trestle_const.MODEL_DIR_PROFILE
+        pending = [self._profile_path(name)]
+        visited: Set[str] = set()
+        while pending:
+            hrefs = _import_hrefs(pending.pop())
+            if hrefs is None:
+                return self._fallback_imports_hash(name)
+            for href in hrefs:
+                if href in visited:
+                    continue
+                visited.add(href)
+                digest.update(href.encode("utf-8"))
+                if not href.startswith(trestle_const.TRESTLE_HREF_HEADING):
+                    continue
+                path = self._working_dir / href.replace(
+                    trestle_const.TRESTLE_HREF_HEADING, "", 1
+                )
+                if path.is_file():
+                    digest.update(hash_tree(path).encode("utf-8"))
+                    if path.parent.parent == profile_dir:
+                        pending.append(path)
+        return digest.hexdigest()
+
+    def _fallback_imports_hash(self, name: str) -> str:
+        digest = hashlib.sha256()
+        catalog_dir = self._working_dir / trestle_const.MODEL_DIR_CATALOG
+        if catalog_dir.exists():
+            digest.update(hash_tree(catalog_dir).encode("utf-8"))
+        profile_dir = self._working_dir / trestle_const.MODEL_DIR_PROFILE
+        if profile_dir.exists():
+            for path in sorted(profile_dir.iterdir()):
+                if path.name != name:
+                    digest.update(path.name.encode("utf-8"))
+                    digest.update(hash_tree(path).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _upstream_hash(self, section: str, name: str) -> str:
+        if self._oscal_model == AuthoredType.PROFILE.value:
+            key = (section, name)
+        else:
+            # The upstream models are the same for all models of other types
+            key = (section, "")
+        if key not in self._upstream:
+            digest = hashlib.sha256()
+            for model_dir in _UPSTREAM_MODEL_DIRS.get(self._oscal_model, []):
+                path = self._working_dir / model_dir
+                if path.exists():
+                    digest.update(hash_tree(path).encode("utf-8"))
+            if self._oscal_model == AuthoredType.PROFILE.value:
+                digest.update(self._imports_hash(name).encode("utf-8"))
+            if self._ssp_index_file:
+                ssp_index = self._working_dir / self._ssp_index_file
+                if ssp_index.exists():
+                    digest.update(hash_tree(ssp_index).encode("utf-8"))
+            self._upstream[key] = digest.hexdigest()
+        return self._upstream[key]
+
+    def model_hash(self, section: str, model_path: pathlib.Path) -> str:
+        """Return the hash of the inputs of a model for a task section"""
+        digest = hashlib.sha256()
+        digest.update(hash_tree(model_path).encode("utf-8"))
+        digest.update(self._upstream_hash(section, model_path.name).encode("utf-8"))
+        return digest.hexdigest()
+
+    def has_changed(self, section: str, model_path: pathlib.Path) -> bool:
+        """Check if the inputs of a model changed since the last recorded run"""
+        recorded = self._data.get(self._scope, {}).get(section, {})
+        previous: Optional[str] = recorded.get(model_path.name)
+        return previous != self.model_hash(section, model_path)
+
+    def record(
+        self,
+        section: str,
+        model_paths: List[pathlib.Path],
+        known_models: Optional[Collection[str]] = None,
+    ) -> None:
+        """
+        Record the current inputs of the models for a task section.
+
+        Args:
+            section: Task section the models were processed by
+            model_paths: Paths of the processed models
+            known_models: Names of all models of the section. Models that were
+            not processed keep their recorded inputs, unless they are not known.
+        """
+        for key in [key for key in self._upstream if key[0] == section]:
+            del self._upstream[key]
+        recorded = self._data.setdefault(self._scope, {}).setdefault(section, {})
+        if known_models is not None:
+            for name in set(recorded) - set(known_models):
+                del recorded[name]
+        recorded.update(
+            {path.name: self.model_hash(section, path) for path in model_paths}
+        )
+
+    def write(self) -> None:
+        """Write the state file"""
+        self._state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._state_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as file:
+            json.dump(
+                {"version": STATE_VERSION, "models": self._data},
+                file,
+                indent=2,
+                sort_keys=True,
+            )
+            file.write("\n")
+        os.replace(tmp_path, self._state_path)
+
+
+class ChangedModelFilter(ModelFilter):
+    """
+    Filter models with another filter and skip models with unchanged inputs.
+
+    Args:
+        model_filter: Filter applied first.
+        state: State of the last successful autosync.
+        section: Task section of the state the models are checked against.
+    """
+
+    def __init__(
+        self,
+        model_filter: ModelFilter,
+        state: AutosyncState,
+        section: str,
+    ):
+        super().__init__(
+            [
+                pattern
+                for pattern in model_filter._skip_model_list
+                if pattern != trestle_const.TRESTLE_KEEP_FILE
+            ],
+            model_filter._include_model_list,
+        )
+        self._model_filter = model_filter
+        self._state = state
+        self._section = section
+
+    def is_skipped(self, model_path: pathlib.Path) -> bool:
+        """Check if the model is skipped by the filter or has not changed."""
+        if self._model_filter.is_skipped(model_path):
+            return True
+        if not self._state.has_changed(self._section, model_path):
+            logger.info(f"Skipping unchanged model {model_path.name} ({self._section})")
+            return True
+        return False
+
+
+class RecordAutosyncStateTask(TaskBase):
+    """
+    Record the autosync state once the preceding tasks succeeded.
+
+    The state file is written in the workspace so it is committed with
+    the autosync changes. It is not written by a dry run, since the
+    changes of the preceding tasks are not committed.
+    """
+
+    records_writes = True
+
+    def __init__(
+        self,
+        state: AutosyncState,
+        search_paths: Dict[str, pathlib.Path],
+        working_dir: str,
+        model_filter: Optional[ModelFilter] = None,
+        dry_run: bool = False,
+    ) -> None:
+        """
+        Initialize record autosync state task.
+
+        Args:
+            state: State to update and write
+            search_paths: Directory with the models of each task section that ran
+            working_dir: Working directory of the workspace
+            model_filter: Optional filter of the models processed by the
+            preceding tasks, other models keep their recorded state
+            dry_run: Do not write the state file
+        """
+        self._state = state
+        self._search_paths = search_paths
+        self._dry_run = dry_run
+        super().__init__(working_dir, model_filter)
+
+    def execute(self) -> int:
+        """Execute task"""
+        for section, search_path in self._search_paths.items():
+            model_paths: List[pathlib.Path] = []
+            known_models: List[str] = []
+            if search_path.exists():
+                model_paths = [
+                    path for path in self.iterate_models(search_path) if path.is_dir()
+                ]
+                known_models = [
+                    path.name for path in search_path.iterdir() if path.is_dir()
+                ]
+            self._state.record(section, model_paths, known_models)
+        if self._dry_run:
+            logger.info("Dry run, autosync state not written")
+            return const.SUCCESS_EXIT_CODE
+        self._state.write()
+        self.record_write(str(self._state.state_path))
+        logger.debug(f"Autosync state written to {self._state.state_path}")
+        return const.SUCCESS_EXIT_CODE
@@ -12,6 +12,8 @@ from typing import Callable, Iterable, List, Optional
 from trestle.common import const
 from trestle.common.file_utils import is_hidden
 
+from complyscribe.tasks.journal import WriteJournal
+
 
 class TaskException(Exception):
     """An error during task execution"""
@@ -52,8 +54,14 @@ class ModelFilter:
 class TaskBase(ABC):
     """
     Abstract base class for tasks with a work directory.
+
+    Tasks that record every path they write in the journal set records_writes,
+    so the bot only checks and stages those paths.
     """
 
+    records_writes: bool = False
+    journal: Optional[WriteJournal] = None
+
     def __init__(self, working_dir: str, model_filter: Optional[ModelFilter]) -> None:
         """
         Initialize base task.
@@ -70,6 +78,16 @@ class TaskBase(ABC):
         """Return the working directory"""
         return self._working_dir
 
+    def record_write(self, path: str) -> None:
+        """Record a path the task creates, modifies or deletes in the journal"""
+        if self.journal is not None:
+            self.journal.record(self.working_dir, path)
+
+    def record_unknown_writes(self, reason: str) -> None:
+        """Record that the task writes paths it cannot list"""
+        if self.journal is not None:
+            self.journal.mark_incomplete(reason)
+
     def iterate_models(self, directory_path: pathlib.Path) -> Iterable[pathlib.Path]:
         """Iterate over the models in the working directory"""
         filtered_paths: Iterable[pathlib.Path]
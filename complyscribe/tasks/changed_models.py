@@ -0,0 +1,238 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Select the models affected by the files changed since a git reference"""
+
+import json
+import logging
+import pathlib
+import re
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from git import Git
+from git.exc import GitCommandError, NoSuchPathError
+from trestle.common import const as trestle_const
+
+from complyscribe.tasks.authored.ssp import SSPIndex
+from complyscribe.tasks.base_task import ModelFilter, TaskException
+
+logger = logging.getLogger(__name__)
+
+_MODEL_DIRS = (
+    trestle_const.MODEL_DIR_CATALOG,
+    trestle_const.MODEL_DIR_PROFILE,
+    trestle_const.MODEL_DIR_COMPDEF,
+    trestle_const.MODEL_DIR_SSP,
+)
+
+# Reference to a workspace catalog or profile in an import or source href
+_MODEL_HREF = re.compile(
+    rf"(?:^|/)({trestle_const.MODEL_DIR_CATALOG}|{trestle_const.MODEL_DIR_PROFILE})/([^/]+)/"
+)
+
+ModelRef = Tuple[str, str]
+
+
+def get_changed_files(repo_path: str, ref: str) -> List[str]:
+    """
+    List the files changed since a git reference.
+
+    Committed, uncommitted and untracked changes are included. Paths are
+    relative to repo_path and files outside of it are left out.
+    """
+    try:
+        git = Git(repo_path)
+        diff = git.diff("--name-only", "--relative", ref, "--")
+        untracked = git.ls_files("--others", "--exclude-standard")
+    except (GitCommandError, NoSuchPathError) as e:
+        raise TaskException(f"Failed to list files changed since {ref}: {e}")
+    return sorted({line for line in (diff + "\n" + untracked).splitlines() if line})
+
+
+def _model_ref(href: str) -> Optional[ModelRef]:
+    match = _MODEL_HREF.search(href)
+    if match is None:
+        return None
+    return match.group(1), match.group(2)
+
+
+def _profile_hrefs(data: Dict[str, Any]) -> List[str]:
+    profile = data.get("profile", {})
+    return [item.get("href", "") for item in profile.get("imports", [])]
+
+
+def _compdef_hrefs(data: Dict[str, Any]) -> List[str]:
+    compdef = data.get("component-definition", {})
+    return [
+        implementation.get("source", "")
+        for component in compdef.get("components", [])
+        for implementation in component.get("control-implementations", [])
+    ]
+
+
+class ChangedModels:
+    """
+    Models affected by a set of changed files in a trestle workspace.
+
+    Changed files are mapped to models by their top-level directory under
+    the JSON model directories, the markdown directories and the rules view.
+    Models that depend on a changed model are added with `add_dependents`.
+    """
+
+    def __init__(self, working_dir: str, changed_files: List[str]) -> None:
+        self._working_dir = pathlib.Path(working_dir)
+        self._changed_files = [pathlib.PurePosixPath(file) for file in changed_files]
+        self._models: Dict[str, Set[str]] = {
+            model_dir: set() for model_dir in _MODEL_DIRS
+        }
+        for model_dir in _MODEL_DIRS:
+            self.add_from_dir(model_dir, model_dir)
+
+    def models(self, model_dir: str) -> Set[str]:
+        """Return the names of the affected models of a model directory"""
+        return self._models.get(model_dir, set())
+
+    def add_from_dir(self, directory: str, model_dir: str) -> None:
+        """
+        Add the models with changed files under a directory.
+
+        Args:
+            directory: Directory with a sub-directory per model, e.g. a markdown
+            directory or the rules view
+            model_dir: JSON model directory of the models in directory
+        """
+        prefix = pathlib.PurePosixPath(directory).parts
+        for file in self._changed_files:
+            if len(file.parts) > len(prefix) and file.parts[: len(prefix)] == prefix:
+                self._models.setdefault(model_dir, set()).add(file.parts[len(prefix)])
+
+    def _load_refs(
+        self,
+        model_dir: str,
+        file_name: str,
+        get_hrefs: Callable[[Dict[str, Any]], List[str]],
+    ) -> Dict[str, Set[ModelRef]]:
+        """Collect the catalogs and profiles referenced by each model of a type"""
+        refs: Dict[str, Set[ModelRef]] = {}
+        for model_path in sorted(self._working_dir.joinpath(model_dir).glob("*")):
+            json_path = model_path / file_name
+            if not json_path.is_file():
+                continue
+            with open(json_path, "r", encoding="utf-8") as file:
+                hrefs = get_hrefs(json.load(file))
+            refs[model_path.name] = {
+                ref for ref in map(_model_ref, hrefs) if ref is not None
+            }
+        return refs
+
+    def _is_changed(self, path: pathlib.Path) -> bool:
+        try:
+            relative = path.resolve().relative_to(self._working_dir.resolve())
+        except ValueError:
+            return False
+        return pathlib.PurePosixPath(relative.as_posix()) in self._changed_files
+
+    def add_dependents(self, ssp_index_file: str = "") -> None:
+        """
+        Add the models that depend on an affected model.
+
+        Profiles importing affected catalogs or profiles, component definitions
+        sourcing affected profiles and SSPs using affected profiles or component
+        definitions are added. All SSPs of the index are added when the
+        index file changed.
+        """
+        profile_refs = self._load_refs(
+            trestle_const.MODEL_DIR_PROFILE, "profile.json", _profile_hrefs
+        )
+        compdef_refs = self._load_refs(
+            trestle_const.MODEL_DIR_COMPDEF, "component-definition.json", _compdef_hrefs
+        )
+
+        profiles = self._models[trestle_const.MODEL_DIR_PROFILE]
+        changed = True
+        while changed:
+            changed = False
+            affected = {
+                (model_dir, name)
+                for model_dir in (
+                    trestle_const.MODEL_DIR_CATALOG,
+                    trestle_const.MODEL_DIR_PROFILE,
+                )
+                for name in self._models[model_dir]
+            }
+            for profile, refs in profile_refs.items():
+                if profile not in profiles and refs & affected:
+                    profiles.add(profile)
+                    changed = True
+
+        compdefs = self._models[trestle_const.MODEL_DIR_COMPDEF]
+        for compdef, refs in compdef_refs.items():
+            if refs & affected:
+                compdefs.add(compdef)
+
+        index_path = self._working_dir / ssp_index_file
+        if ssp_index_file and index_path.is_file():
+            ssp_index = SSPIndex(str(index_path))
+            index_changed = self._is_changed(index_path)
+            ssps = self._models[trestle_const.MODEL_DIR_SSP]
+            for ssp, profile in ssp_index.profile_by_ssp.items():
+                if (
+                    index_changed
+                    or profile in profiles
+                    or compdefs.intersection(ssp_index.comps_by_ssp.get(ssp, []))
+                ):
+                    ssps.add(ssp)
+
+    def select(
+        self, model_filter: ModelFilter, search_paths: Dict[pathlib.Path, str]
+    ) -> "SelectedModelFilter":
+        """
+        Build a filter selecting the affected models.
+
+        Args:
+            model_filter: Filter applied first
+            search_paths: JSON model directory of the models under each search path
+        """
+        selected = {
+            search_path: self.models(model_dir)
+            for search_path, model_dir in search_paths.items()
+        }
+        for search_path, names in selected.items():
+            logger.info(
+                f"Models changed under {search_path.name}: "
+                f"{', '.join(sorted(names)) or 'none'}"
+            )
+        return SelectedModelFilter(model_filter, selected)
+
+
+class SelectedModelFilter(ModelFilter):
+    """
+    Filter models with another filter and only keep selected models.
+
+    Args:
+        model_filter: Filter applied first.
+        selected: Names of the selected models under each search path. Paths
+        that are not directly under one of the search paths are not restricted.
+    """
+
+    def __init__(
+        self, model_filter: ModelFilter, selected: Dict[pathlib.Path, Set[str]]
+    ):
+        super().__init__(
+            [
+                pattern
+                for pattern in model_filter._skip_model_list
+                if pattern != trestle_const.TRESTLE_KEEP_FILE
+            ],
+            model_filter._include_model_list,
+        )
+        self._model_filter = model_filter
+        self._selected = {path.resolve(): names for path, names in selected.items()}
+
+    def is_skipped(self, model_path: pathlib.Path) -> bool:
+        """Check if the model is skipped by the filter or is not selected."""
+        if self._model_filter.is_skipped(model_path):
+            return True
+        names = self._selected.get(model_path.parent.resolve())
+        return names is not None and model_path.name not in names
@@ -0,0 +1,45 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Journal of the paths written by the bot pre-tasks"""
+
+import logging
+import os
+from typing import List, Set
+
+logger = logging.getLogger(__name__)
+
+
+class WriteJournal:
+    """
+    Paths created, modified or deleted by the tasks of a bot run.
+
+    A recorded directory covers every file under it. The journal is
+    incomplete when a task may have written paths it did not record,
+    in which case the whole working tree has to be checked for changes.
+    """
+
+    def __init__(self) -> None:
+        self._paths: Set[str] = set()
+        self._complete = True
+
+    @property
+    def is_complete(self) -> bool:
+        """Return whether all written paths are recorded"""
+        return self._complete
+
+    @property
+    def paths(self) -> List[str]:
+        """Return the recorded absolute paths, sorted"""
+        return sorted(self._paths)
+
+    def record(self, working_dir: str, path: str) -> None:
+        """Record a path, relative to working_dir or absolute"""
+        self._paths.add(os.path.abspath(os.path.join(working_dir, path)))
+
+    def mark_incomplete(self, reason: str) -> None:
+        """Mark the journal as missing paths written by a task"""
+        if self._complete:
+            logger.debug(f"Write journal is incomplete: {reason}")
+        self._complete = False
@@ -0,0 +1,135 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Cache of bare git mirrors of the upstream repositories"""
+
+import hashlib
+import logging
+import pathlib
+import re
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator
+
+from git import GitCommandError, Repo
+
+from complyscribe.tasks.base_task import TaskException
+
+logger = logging.getLogger(__name__)
+
+
+def _mirror_name(repo_url: str) -> str:
+    """Return a readable and unique directory name for a repository URL"""
+    digest = hashlib.sha256(repo_url.encode("utf-8")).hexdigest()[:16]
+    name = re.sub(r"[^A-Za-z0-9._-]", "_", repo_url.rstrip("/").split("/")[-1])
+    return f"{name}-{digest}"
+
+
+class MirrorCache:
+    """
+    Bare mirrors of upstream repositories, keyed by repository URL.
+
+    The first use of a repository clones a mirror into the cache directory,
+    later uses only fetch the new objects. The requested ref is checked out
+    in a worktree of the mirror. A file lock per mirror serializes fetches
+    and worktree changes, so several jobs can share the cache directory.
+
+    Notes:
+        The cache uses POSIX file locks, it is not supported on Windows.
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        if sys.platform == "win32":
+            raise TaskException(
+                "The upstream mirror cache is only supported on POSIX platforms"
+            )
+        self._cache_dir = pathlib.Path(cache_dir)
+
+    @property
+    def cache_dir(self) -> pathlib.Path:
+        """Return the cache directory"""
+        return self._cache_dir
+
+    def mirror_path(self, repo_url: str) -> pathlib.Path:
+        """Return the path of the mirror of a repository"""
+        return self._cache_dir.joinpath(f"{_mirror_name(repo_url)}.git")
+
+    @contextmanager
+    def _lock(self, repo_url: str) -> Iterator[None]:
+        # Imported when the cache is used, so the module imports on any platform
+        import fcntl
+
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        lock_path = self.mirror_path(repo_url).with_suffix(".lock")
+        with open(lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _update_mirror(self, repo_url: str) -> Repo:
+        """Clone the mirror of a repository or fetch its new objects"""
+        mirror_path = self.mirror_path(repo_url)
+        if mirror_path.exists():
+            mirror = Repo(mirror_path)
+            try:
+                logger.debug(f"Fetching {repo_url} into mirror {mirror_path}")
+                mirror.git.fetch("--prune", "origin")
+                return mirror
+            except GitCommandError as e:
+                # A broken mirror is cloned again, a network error
+                # is raised again by the clone
+                logger.warning(f"Recreating mirror of {repo_url}: {e}")
+                mirror.close()
+                shutil.rmtree(mirror_path)
+
+        logger.debug(f"Cloning mirror of {repo_url} into {mirror_path}")
+        # Clone next to the mirror and rename it, so an interrupted clone
+        # is not mistaken for a mirror
+        with tempfile.TemporaryDirectory(dir=self._cache_dir) as tmp_dir:
+            tmp_path = pathlib.Path(tmp_dir, mirror_path.name)
+            Repo.clone_from(repo_url, tmp_path, mirror=True).close()
+            tmp_path.rename(mirror_path)
+        mirror = Repo(mirror_path)
+        # Objects of a worktree must not be pruned while it is checked out
+        mirror.git.config("gc.auto", "0")
+        return mirror
+
+    @contextmanager
+    def checkout(
+        self, repo_url: str, ref: str, worktree_path: pathlib.Path
+    ) -> Iterator[pathlib.Path]:
+        """
+        Check out a ref of a repository from its mirror.
+
+        Args:
+            repo_url: URL of the upstream repository
+            ref: Git ref, such as a tag, branch or commit sha, to check out
+            worktree_path: Path of the worktree, it must not exist or be empty
+
+        Yields:
+            The path of the worktree, which is removed on exit
+        """
+        with self._lock(repo_url):
+            mirror = self._update_mirror(repo_url)
+            try:
+                mirror.git.worktree("add", "--detach", str(worktree_path), ref)
+            except GitCommandError:
+                mirror.close()
+                raise
+        try:
+            yield worktree_path
+        finally:
+            with self._lock(repo_url):
+                try:
+                    mirror.git.worktree("remove", "--force", str(worktree_path))
+                except GitCommandError as e:
+                    logger.debug(f"Pruning worktree {worktree_path}: {e}")
+                    shutil.rmtree(worktree_path, ignore_errors=True)
+                    mirror.git.worktree("prune")
+                finally:
+                    mirror.close()
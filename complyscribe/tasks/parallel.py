@@ -0,0 +1,137 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Run independent per-model work in a process pool"""
+
+import logging
+import logging.handlers
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+# Loggers whose records are captured in workers and replayed by the parent
+_CAPTURED_LOGGERS = ("complyscribe", "trestle")
+
+
+@dataclass
+class ModelResult:
+    """Outcome of the work done for one model"""
+
+    model: str
+    error: Optional[str] = None
+    records: List[logging.LogRecord] = field(default_factory=list)
+
+
+class _RecordCollector(logging.handlers.BufferingHandler):
+    """Keep log records of a worker so the parent can replay them per model."""
+
+    def __init__(self) -> None:
+        super().__init__(capacity=0)
+
+    def shouldFlush(self, record: logging.LogRecord) -> bool:  # noqa: N802
+        return False
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # make the record picklable, the same way QueueHandler does
+        message = self.format(record)
+        record = logging.makeLogRecord(record.__dict__)
+        record.message = message
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        self.buffer.append(record)
+
+
+def _run_captured(
+    func: Callable[[str], None],
+    handled_errors: Tuple[Type[Exception], ...],
+    log_levels: Dict[str, int],
+    model: str,
+) -> ModelResult:
+    """Run func for a model in a worker, capturing its log records"""
+    collector = _RecordCollector()
+    saved: Dict[str, Tuple[List[logging.Handler], int, bool]] = {}
+    for name in _CAPTURED_LOGGERS:
+        captured = logging.getLogger(name)
+        saved[name] = (captured.handlers, captured.level, captured.propagate)
+        captured.handlers = [collector]
+        captured.setLevel(log_levels[name])
+        captured.propagate = False
+
+    result = ModelResult(model)
+    try:
+        func(model)
+    except handled_errors as e:
+        result.error = str(e)
+    finally:
+        for name, (handlers, level, propagate) in saved.items():
+            captured = logging.getLogger(name)
+            captured.handlers = handlers
+            captured.setLevel(level)
+            captured.propagate = propagate
+        result.records = collector.buffer
+    return result
+
+
+def run_for_models(
+    func: Callable[[str], None],
+    models: List[str],
+    jobs: int,
+    handled_errors: Tuple[Type[Exception], ...],
+) -> List[ModelResult]:
+    """
+    Run func for every model and collect the handled errors instead of stopping.
+
+    Args:
+        func: Picklable callable doing the work for one model
+        models: Models to process
+        jobs: Number of worker processes, 1 runs in the current process
+        handled_errors: Exception types recorded as a model failure,
+        any other exception is raised
+
+    Returns:
+        A result for each model, in the order of the models.
+
+    Notes:
+        With more than one job, the log records of each model are collected in the
+        worker and replayed once the model is done, so the logs of a model are not
+        interleaved with the logs of other models.
+    """
+    results: List[ModelResult] = []
+    if jobs <= 1 or len(models) <= 1:
+        for model in models:
+            result = ModelResult(model)
+            try:
+                func(model)
+            except handled_errors as e:
+                result.error = str(e)
+            results.append(result)
+        return results
+
+    log_levels = {
+        name: logging.getLogger(name).getEffectiveLevel() for name in _CAPTURED_LOGGERS
+    }
+    max_workers = min(jobs, len(models))
+    logger.debug(f"Processing {len(models)} models with {max_workers} workers")
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_run_captured, func, handled_errors, log_levels, model)
+            for model in models
+        ]
+        for future in futures:
+            result = future.result()
+            for record in result.records:
+                logging.getLogger(record.name).handle(record)
+            results.append(result)
+    return results
+
+
+def format_failures(results: List[ModelResult]) -> str:
+    """Format the failed models of the results, one per line"""
+    return "\n".join(
+        f"{result.model}: {result.error}" for result in results if result.error
+    )
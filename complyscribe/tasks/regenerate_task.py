@@ -4,9 +4,12 @@
 
 """ComplyScribe Regenerate Tasks"""
 
+import contextlib
 import logging
 import os
 import pathlib
+import tempfile
+from functools import partial
 from typing import Optional
 
 from complyscribe import const
@@ -16,20 +19,40 @@ from complyscribe.tasks.authored.base_authored import (
     AuthoredObjectException,
 )
 from complyscribe.tasks.base_task import ModelFilter, TaskBase, TaskException
+from complyscribe.tasks.parallel import format_failures, run_for_models
+from complyscribe.tasks.resolution_cache import ResolvedProfileCache
 
 logger = logging.getLogger(__name__)
 
 
+def _regenerate_model(
+    authored_object: AuthoredObjectBase,
+    markdown_dir: str,
+    cache_dir: Optional[str],
+    model_path: str,
+) -> None:
+    """Regenerate markdown for a single JSON model"""
+    logger.info(f"Regenerating model {model_path}")
+    if cache_dir is None:
+        authored_object.regenerate(model_path=model_path, markdown_path=markdown_dir)
+        return
+    with ResolvedProfileCache(pathlib.Path(cache_dir)).activate():
+        authored_object.regenerate(model_path=model_path, markdown_path=markdown_dir)
+
+
 class RegenerateTask(TaskBase):
     """
     Regenerate Trestle Markdown from OSCAL JSON content changes
     """
 
+    records_writes = True
+
     def __init__(
         self,
         authored_object: AuthoredObjectBase,
         markdown_dir: str,
         model_filter: Optional[ModelFilter] = None,
+        jobs: int = 1,
     ) -> None:
         """
         Initialize regenerate task.
@@ -39,10 +62,13 @@ class RegenerateTask(TaskBase):
             markdown_dir: Location of directory to write Markdown in
             model_filter: Optional filter to apply to the task to include or exclude models
             from processing.
+            jobs: Number of worker processes to regenerate models with. Workers
+            share the resolved profile catalogs through an on-disk cache.
         """
 
         self._authored_object = authored_object
         self._markdown_dir = markdown_dir
+        self._jobs = jobs
         working_dir = self._authored_object.get_trestle_root()
         super().__init__(working_dir, model_filter)
 
@@ -60,16 +86,41 @@ class RegenerateTask(TaskBase):
         model_dir = types.get_trestle_model_dir(self._authored_object)
 
         search_path = os.path.join(self.working_dir, model_dir)
-        for model in self.iterate_models(pathlib.Path(search_path)):
-            logger.info(f"Regenerating model {model}")
-            model_base_name = os.path.basename(model)
-            model_path = os.path.join(model_dir, model_base_name)
-
-            try:
-                self._authored_object.regenerate(
-                    model_path=model_path, markdown_path=self._markdown_dir
+        model_paths = [
+            os.path.join(model_dir, os.path.basename(model))
+            for model in self.iterate_models(pathlib.Path(search_path))
+        ]
+        for model_path in model_paths:
+            self.record_write(
+                os.path.join(self._markdown_dir, os.path.basename(model_path))
+            )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Only workers share the cache, a single process resolves
+            # each profile as it did before.
+            parallel = self._jobs > 1 and len(model_paths) > 1
+            cache_dir = tmp_dir if parallel else None
+            # Workers regenerate one model per call, content loaded for a
+            # model is only shared when regenerating in this process.
+            session = (
+                contextlib.nullcontext()
+                if parallel
+                else self._authored_object.regeneration_session()
+            )
+            with session:
+                results = run_for_models(
+                    partial(
+                        _regenerate_model,
+                        self._authored_object,
+                        self._markdown_dir,
+                        cache_dir,
+                    ),
+                    model_paths,
+                    self._jobs,
+                    (AuthoredObjectException,),
                 )
-            except AuthoredObjectException as e:
-                raise TaskException(f"Regenerate task failed for model {model}: {e}")
+        failures = format_failures(results)
+        if failures:
+            raise TaskException(f"Regenerate task failed for models:\n{failures}")
 
         return const.SUCCESS_EXIT_CODE
@@ -0,0 +1,124 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Resolved profile catalog cache shared across processes"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pathlib
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from trestle.core.profile_resolver import ProfileResolver
+from trestle.oscal.catalog import Catalog
+
+logger = logging.getLogger(__name__)
+
+ResolvedProfile = Tuple[Catalog, Optional[Dict[str, Any]]]
+
+# Time to wait for another process resolving the same profile
+_LOCK_TIMEOUT = 600.0
+_LOCK_POLL_INTERVAL = 0.05
+
+
+class ResolvedProfileCache:
+    """
+    On-disk cache of resolved profile catalogs.
+
+    While active, profile resolution done by trestle is served from the cache
+    directory. The directory can be shared by several processes working on the
+    same trestle workspace, a profile is then resolved by a single process
+    and read back by the others.
+
+    Args:
+        cache_dir: Directory to store resolved catalogs in. Entries are not
+        invalidated, so the directory should only live as long as the workspace
+        profiles and catalogs are not modified.
+    """
+
+    def __init__(self, cache_dir: pathlib.Path) -> None:
+        self._cache_dir = cache_dir
+        self._resolve = ProfileResolver.get_resolved_profile_catalog_and_inherited_props
+        self._signature = inspect.signature(self._resolve)
+
+    def _key(self, *args: Any, **kwargs: Any) -> str:
+        """Build the cache key from all arguments of the resolution"""
+        bound = self._signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = {name: str(value) for name, value in bound.arguments.items()}
+        return hashlib.sha256(
+            json.dumps(arguments, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def _read(self, key: str) -> ResolvedProfile:
+        catalog = Catalog.oscal_read(self._cache_dir / f"{key}.json")
+        if catalog is None:
+            raise FileNotFoundError(f"Cached catalog {key} is missing")
+        with open(self._cache_dir / f"{key}.props.json", "r") as file:
+            inherited_props = json.load(file)
+        return catalog, inherited_props  # type: ignore[return-value]
+
+    def _write(self, key: str, resolved: ResolvedProfile) -> None:
+        catalog, inherited_props = resolved
+        # write to temporary files first, the props file marks a complete entry
+        catalog_tmp = self._cache_dir / f"{key}.tmp.json"
+        catalog.oscal_write(catalog_tmp)
+        os.replace(catalog_tmp, self._cache_dir / f"{key}.json")
+        props_tmp = self._cache_dir / f"{key}.props.tmp"
+        with open(props_tmp, "w") as file:
+            json.dump(inherited_props, file)
+        os.replace(props_tmp, self._cache_dir / f"{key}.props.json")
+
+    def get_or_resolve(
+        self, key: str, resolve: Callable[[], ResolvedProfile]
+    ) -> ResolvedProfile:
+        """Return the cached entry for key, resolving and storing it if missing"""
+        props_file = self._cache_dir / f"{key}.props.json"
+        lock_file = self._cache_dir / f"{key}.lock"
+        deadline = time.monotonic() + _LOCK_TIMEOUT
+        while not props_file.exists():
+            try:
+                fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                # another process is resolving this profile
+                if time.monotonic() > deadline:
+                    logger.warning(f"Timed out waiting for cache entry {key}")
+                    return resolve()
+                time.sleep(_LOCK_POLL_INTERVAL)
+                continue
+            os.close(fd)
+            try:
+                resolved = resolve()
+                self._write(key, resolved)
+                return resolved
+            finally:
+                lock_file.unlink(missing_ok=True)
+
+        logger.debug(f"Using cached resolved profile catalog {key}")
+        return self._read(key)
+
+    @contextmanager
+    def activate(self) -> Iterator[None]:
+        """Serve trestle profile resolution from the cache within the context"""
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        resolve = self._resolve
+
+        def cached_resolve(*args: Any, **kwargs: Any) -> ResolvedProfile:
+            return self.get_or_resolve(
+                self._key(*args, **kwargs), lambda: resolve(*args, **kwargs)
+            )
+
+        ProfileResolver.get_resolved_profile_catalog_and_inherited_props = (  # type: ignore
+            staticmethod(cached_resolve)
+        )
+        try:
+            yield
+        finally:
+            ProfileResolver.get_resolved_profile_catalog_and_inherited_props = (  # type: ignore
+                staticmethod(resolve)
+            )
@@ -0,0 +1,202 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Persistent cache of validated rules for rules-transform"""
+
+import hashlib
+import importlib.metadata
+import json
+import logging
+import os
+import pathlib
+import threading
+from typing import Any, Dict, Optional
+
+from complyscribe import const
+from complyscribe.hashing import hash_tree
+from complyscribe.transformers.trestle_rule import (
+    Check,
+    ComponentInfo,
+    Control,
+    Parameter,
+    Profile,
+    TrestleRule,
+)
+
+logger = logging.getLogger(__name__)
+
+RULE_CACHE_DIR = "cache"
+RULE_CACHE_FILE = "rules-transform.json"
+CACHE_VERSION = 2
+
+
+def _complyscribe_version() -> str:
+    try:
+        return importlib.metadata.version("complyscribe")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def content_hash(content: str) -> str:
+    """Hash the content of a rule file"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _construct_rule(data: Dict[str, Any]) -> TrestleRule:
+    """Rebuild a rule validated by an earlier transform, without validation."""
+    profile = data["profile"]
+    check = data.get("check")
+    parameter = data.get("parameter")
+    return TrestleRule.model_construct(
+        name=data["name"],
+        description=data["description"],
+        component=ComponentInfo.model_construct(**data["component"]),
+        profile=Profile.model_construct(
+            description=profile["description"],
+            href=profile["href"],
+            include_controls=[
+                Control.model_construct(**control)
+                for control in profile["include_controls"]
+            ],
+        ),
+        check=Check.model_construct(**check) if check is not None else None,
+        parameter=(
+            Parameter.model_construct(**parameter) if parameter is not None else None
+        ),
+    )
+
+
+class RuleCache:
+    """
+    Validated rules and component definition outputs of the last rules-transform.
+
+    Rules are keyed by the path of their file relative to the workspace and the
+    hash of its content, so only new or changed rule files are parsed again.
+    The cache is discarded when the complyscribe version changes. It is stored
+    in the complyscribe config directory of the workspace and is ignored by git.
+
+    Notes:
+        Cached rules were validated when their file was parsed and are rebuilt
+        without validation. Malformed cache entries are treated as a miss.
+    """
+
+    def __init__(self, working_dir: str) -> None:
+        self._working_dir = pathlib.Path(working_dir)
+        self._cache_path = self._working_dir.joinpath(
+            const.COMPLYSCRIBE_CONFIG_DIR, RULE_CACHE_DIR, RULE_CACHE_FILE
+        )
+        self._version = _complyscribe_version()
+        self._rules: Dict[str, Dict[str, Any]] = {}
+        self._compdefs: Dict[str, Dict[str, str]] = {}
+        # component definitions may be transformed in several threads
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def cache_path(self) -> pathlib.Path:
+        """Return the path of the cache file"""
+        return self._cache_path
+
+    def _load(self) -> None:
+        if not self._cache_path.exists():
+            return
+        try:
+            with open(self._cache_path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable rule cache: {e}")
+            return
+        if (
+            data.get("version") != CACHE_VERSION
+            or data.get("complyscribe") != self._version
+        ):
+            logger.info("Ignoring rule cache of another version")
+            return
+        self._rules = data.get("rules", {})
+        self._compdefs = data.get("compdefs", {})
+
+    def _key(self, rule_path: pathlib.Path) -> str:
+        return pathlib.Path(os.path.relpath(rule_path, self._working_dir)).as_posix()
+
+    def get(self, rule_path: pathlib.Path, rule_hash: str) -> Optional[TrestleRule]:
+        """Return the cached rule of a rule file if its content did not change"""
+        entry = self._rules.get(self._key(rule_path))
+        if entry is None or entry.get("hash") != rule_hash:
+            return None
+        try:
+            return _construct_rule(entry["rule"])
+        except (KeyError, TypeError):
+            return None
+
+    def put(self, rule_path: pathlib.Path, rule_hash: str, rule: TrestleRule) -> None:
+        """Cache the rule of a rule file"""
+        entry = {"hash": rule_hash, "rule": rule.model_dump()}
+        with self._lock:
+            self._rules[self._key(rule_path)] = entry
+
+    def _rules_digest(self, rule_hashes: Dict[pathlib.Path, str]) -> str:
+        digest = hashlib.sha256()
+        for path, rule_hash in sorted(
+            (self._key(path), rule_hash) for path, rule_hash in rule_hashes.items()
+        ):
+            digest.update(f"{path}\0{rule_hash}\0".encode("utf-8"))
+        return digest.hexdigest()
+
+    def is_compdef_unchanged(
+        self, name: str, rule_hashes: Dict[pathlib.Path, str], output_path: pathlib.Path
+    ) -> bool:
+        """
+        Check if a component definition is up to date with its rule files.
+
+        Args:
+            name: Name of the component definition
+            rule_hashes: Content hash of each rule file of the component definition
+            output_path: Path of the component definition JSON
+
+        Returns:
+            True if the rule files did not change and the component definition
+            JSON is the one written by the last transform.
+        """
+        recorded = self._compdefs.get(name)
+        if recorded is None or not output_path.is_file():
+            return False
+        return recorded.get("rules") == self._rules_digest(
+            rule_hashes
+        ) and recorded.get("output") == hash_tree(output_path)
+
+    def record_compdef(
+        self, name: str, rule_hashes: Dict[pathlib.Path, str], output_path: pathlib.Path
+    ) -> None:
+        """Record the rule files and the written JSON of a component definition"""
+        entry = {
+            "rules": self._rules_digest(rule_hashes),
+            "output": hash_tree(output_path),
+        }
+        with self._lock:
+            self._compdefs[name] = entry
+
+    def write(self) -> None:
+        """Write the cache file, dropping the rules of removed files"""
+        with self._lock:
+            self._rules = {
+                path: entry
+                for path, entry in self._rules.items()
+                if self._working_dir.joinpath(path).is_file()
+            }
+        self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+        gitignore = self._cache_path.parent / ".gitignore"
+        if not gitignore.exists():
+            gitignore.write_text("*\n")
+        tmp_path = self._cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as file:
+            json.dump(
+                {
+                    "version": CACHE_VERSION,
+                    "complyscribe": self._version,
+                    "rules": self._rules,
+                    "compdefs": self._compdefs,
+                },
+                file,
+            )
+        os.replace(tmp_path, self._cache_path)
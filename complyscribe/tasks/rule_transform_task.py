@@ -5,10 +5,12 @@
 """ComplyScribe Rule Transform Tasks"""
 
 import configparser
+import contextlib
+import functools
 import logging
-import os
 import pathlib
-from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import trestle.common.const as trestle_const
 from trestle.tasks.base_task import TaskOutcome
@@ -16,24 +18,53 @@ from trestle.tasks.csv_to_oscal_cd import CsvToOscalComponentDefinition
 
 import complyscribe.const as const
 from complyscribe.tasks.base_task import ModelFilter, TaskBase, TaskException
+from complyscribe.tasks.rule_cache import RuleCache, content_hash
 from complyscribe.transformers.base_transformer import RulesTransformerException
+from complyscribe.transformers.compdef_builder import ComponentDefinitionBuilder
 from complyscribe.transformers.csv_transformer import CSVBuilder
+from complyscribe.transformers.trestle_rule import TrestleRule
 from complyscribe.transformers.yaml_transformer import ToRulesYAMLTransformer
 
 logger = logging.getLogger(__name__)
 
+# Rule files sent to a worker at once, rule files are small
+_RULES_PER_CHUNK = 32
+
+RuleFile = Tuple[pathlib.Path, str]
+RuleResult = Tuple[Optional[TrestleRule], str]
+MapRules = Callable[
+    [Callable[[RuleFile], RuleResult], Iterable[RuleFile]],
+    Iterator[RuleResult],
+]
+
+
+def _load_rule(
+    rule_transformer: ToRulesYAMLTransformer, rule_file: RuleFile
+) -> RuleResult:
+    """Validate the content of a rule file, returning the rule or the error."""
+    _, content = rule_file
+    try:
+        return rule_transformer.transform(content), ""
+    except RulesTransformerException as e:
+        return None, str(e)
+
 
 class RuleTransformTask(TaskBase):
     """
     Transform rules into OSCAL content.
     """
 
+    records_writes = True
+
     def __init__(
         self,
         working_dir: str,
         rules_view_dir: str,
         rule_transformer: ToRulesYAMLTransformer,
         model_filter: Optional[ModelFilter] = None,
+        csv_compatibility: bool = False,
+        jobs: int = 1,
+        rule_cache: Optional[RuleCache] = None,
     ) -> None:
         """
         Initialize transform task.
@@ -44,6 +75,12 @@ class RuleTransformTask(TaskBase):
             rule_transformer: Transformer to use for rule transformation to TrestleRule
             model_filter: Optional filter to apply to the task to include or exclude models
             from processing.
+            csv_compatibility: Build the component definitions through a CSV file
+            and the trestle csv-to-oscal-cd task instead of in memory.
+            jobs: Number of worker processes validating rule files
+            rule_cache: Optional cache of the validated rules. Only changed rule
+            files are validated and component definitions with unchanged rule
+            files are skipped.
 
         Notes:
             The rule_view_dir is expected to be a directory containing directories of
@@ -54,6 +91,9 @@ class RuleTransformTask(TaskBase):
 
         self._rule_view_dir = rules_view_dir
         self._rule_transformer: ToRulesYAMLTransformer = rule_transformer
+        self._csv_compatibility = csv_compatibility
+        self._jobs = jobs
+        self._rule_cache = rule_cache
         super().__init__(working_dir, model_filter)
 
     def execute(self) -> int:
@@ -70,66 +110,217 @@ class RuleTransformTask(TaskBase):
         working_path: pathlib.Path = pathlib.Path(self.working_dir)
         search_path: pathlib.Path = working_path.joinpath(self._rule_view_dir)
 
-        for compdef in self.iterate_models(search_path):
-            self._transform_components(compdef)
+        with contextlib.ExitStack() as stack:
+            map_rules: MapRules = map
+            if self._jobs > 1:
+                executor = stack.enter_context(
+                    ProcessPoolExecutor(max_workers=self._jobs)
+                )
+                map_rules = functools.partial(executor.map, chunksize=_RULES_PER_CHUNK)
+            try:
+                self._transform_compdefs(
+                    list(self.iterate_models(search_path)), map_rules
+                )
+            finally:
+                if self._rule_cache is not None:
+                    self._rule_cache.write()
 
         return const.SUCCESS_EXIT_CODE
 
-    def _transform_components(self, component_definition_path: pathlib.Path) -> None:
+    def _transform_compdefs(
+        self, compdef_paths: List[pathlib.Path], map_rules: MapRules
+    ) -> None:
+        """
+        Transform each component definition, concurrently with more than one job.
+
+        Component definitions are independent, so they are transformed in a thread
+        pool sharing the rule validation workers. All failures are reported
+        at once.
+        """
+        if self._jobs <= 1 or len(compdef_paths) <= 1:
+            for compdef in compdef_paths:
+                self._transform_components(compdef, map_rules)
+            return
+
+        failures: List[str] = []
+        with ThreadPoolExecutor(
+            max_workers=min(self._jobs, len(compdef_paths))
+        ) as executor:
+            futures = [
+                executor.submit(self._transform_components, compdef, map_rules)
+                for compdef in compdef_paths
+            ]
+            for compdef, future in zip(compdef_paths, futures):
+                try:
+                    future.result()
+                except TaskException as e:
+                    failures.append(f"{compdef.name}: {e}")
+        if failures:
+            failure_str = "\n".join(failures)
+            raise TaskException(
+                f"Rule transform failed for component definitions:\n{failure_str}"
+            )
+
+    def _transform_components(
+        self, component_definition_path: pathlib.Path, map_rules: MapRules = map
+    ) -> None:
         """Transform components into an OSCAL component definition."""
-        csv_builder: CSVBuilder = CSVBuilder()
-        logger.info(
-            f"Transforming rules for component definition {component_definition_path.name}"
+        component_def_name = component_definition_path.name
+        rule_files: List[RuleFile] = []
+        for component in self.iterate_models(component_definition_path):
+            rule_files.extend(
+                (rule_path, rule_path.read_text())
+                for rule_path in self.iterate_models(component)
+            )
+        rule_hashes: Dict[pathlib.Path, str] = {
+            rule_path: content_hash(content) for rule_path, content in rule_files
+        }
+        output_path: pathlib.Path = pathlib.Path(self.working_dir).joinpath(
+            trestle_const.MODEL_DIR_COMPDEF,
+            component_def_name,
+            "component-definition.json",
+        )
+        if self._rule_cache is not None and self._rule_cache.is_compdef_unchanged(
+            component_def_name, rule_hashes, output_path
+        ):
+            logger.info(
+                f"Skipping component definition {component_def_name} with unchanged rules"
+            )
+            return
+
+        logger.info(f"Transforming rules for component definition {component_def_name}")
+        self.record_write(str(output_path))
+        if self._csv_compatibility:
+            self._transform_with_csv(
+                component_definition_path, rule_files, rule_hashes, map_rules
+            )
+        else:
+            builder: ComponentDefinitionBuilder = ComponentDefinitionBuilder()
+            self._add_rules(
+                component_definition_path,
+                rule_files,
+                rule_hashes,
+                builder.add_rule,
+                map_rules,
+            )
+            if builder.rule_count == 0:
+                raise TaskException(
+                    f"No rules found for component definition {component_def_name}"
+                )
+
+            try:
+                component_definition = builder.build(
+                    title=f"Component definition for {component_def_name}",
+                    version="1.0",
+                )
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                component_definition.oscal_write(output_path)
+            except Exception as e:
+                raise TaskException(f"Transform failed for {component_def_name}: {e}")
+
+        if self._rule_cache is not None:
+            self._rule_cache.record_compdef(
+                component_def_name, rule_hashes, output_path
+            )
+
+    def _add_rules(
+        self,
+        component_definition_path: pathlib.Path,
+        rule_files: List[RuleFile],
+        rule_hashes: Dict[pathlib.Path, str],
+        add_rule: Callable[[TrestleRule], None],
+        map_rules: MapRules = map,
+    ) -> None:
+        """
+        Transform the rule files and add the rules with add_rule.
+
+        Rule files are validated with map_rules, which may run in worker
+        processes, unless their rule is cached. Rules are added in the order
+        of the rule files.
+        """
+        cached: Dict[pathlib.Path, TrestleRule] = {}
+        if self._rule_cache is not None:
+            for rule_path, _ in rule_files:
+                cached_rule = self._rule_cache.get(rule_path, rule_hashes[rule_path])
+                if cached_rule is not None:
+                    cached[rule_path] = cached_rule
+            logger.debug(f"{len(cached)} of {len(rule_files)} rules are cached")
+
+        load_rule = functools.partial(_load_rule, self._rule_transformer)
+        loaded = map_rules(
+            load_rule,
+            [rule_file for rule_file in rule_files if rule_file[0] not in cached],
         )
 
         # To report all rule errors at once, we collect them in a list and
         # pretty print them in a raised exception
         transformation_errors: List[str] = []
-        for component in self.iterate_models(component_definition_path):
-            logger.debug(f"Transforming rules for component {component.name}")
-            for rule_path in self.iterate_models(component):
-                # Load the rule into memory as a stream to process
-                rule_stream = rule_path.read_text()
-
-                try:
-                    rule = self._rule_transformer.transform(rule_stream)
-                    csv_builder.add_row(rule)
-                except RulesTransformerException as e:
-                    transformation_errors.append(f"{rule_path.as_posix()}: {e}")
+        for rule_path, _ in rule_files:
+            if rule_path in cached:
+                rule: Optional[TrestleRule] = cached[rule_path]
+            else:
+                rule, error = next(loaded)
+                if rule is not None and self._rule_cache is not None:
+                    self._rule_cache.put(rule_path, rule_hashes[rule_path], rule)
+            try:
+                if rule is None:
+                    raise RulesTransformerException(error)
+                add_rule(rule)
+            except RulesTransformerException as e:
+                transformation_errors.append(f"{rule_path.as_posix()}: {e}")
 
         if len(transformation_errors) > 0:
-            transformation_error_str = "\n".join(transformation_errors)
+            transformation_error_str = "\n".join(sorted(transformation_errors))
             raise TaskException(
                 f"Failed to transform rules for component definition {component_definition_path.name}: \
                     {transformation_error_str}"
             )
+
+    def _transform_with_csv(
+        self,
+        component_definition_path: pathlib.Path,
+        rule_files: List[RuleFile],
+        rule_hashes: Dict[pathlib.Path, str],
+        map_rules: MapRules = map,
+    ) -> None:
+        """Transform components through a CSV and the trestle csv-to-oscal-cd task."""
+        csv_builder: CSVBuilder = CSVBuilder()
+        self._add_rules(
+            component_definition_path,
+            rule_files,
+            rule_hashes,
+            csv_builder.add_row,
+            map_rules,
+        )
         if csv_builder.row_count == 0:
             raise TaskException(
                 f"No rules found for component definition {component_definition_path.name}"
             )
-
         # Write the CSV to disk
         working_path: pathlib.Path = pathlib.Path(self.working_dir)
         csv_file_name: str = f"{component_definition_path.name}.csv"
         csv_path: pathlib.Path = working_path.joinpath(csv_file_name)
+        self.record_write(str(csv_path))
         csv_builder.write_to_file(csv_path)
 
-        # Build config for CSV to OSCAL task
+        # Build config for CSV to OSCAL task, with absolute paths so the
+        # task does not depend on the process working directory
         config = configparser.ConfigParser()
 
         section_name = "task.csv-to-oscal-cd"
-        component_def_name = os.path.basename(component_definition_path)
+        component_def_name = component_definition_path.name
+        output_dir = working_path.joinpath(
+            trestle_const.MODEL_DIR_COMPDEF, component_def_name
+        )
         config[section_name] = {
             "title": f"Component definition for {component_def_name}",
             "version": "1.0",
-            "csv-file": f"{csv_file_name}",
-            "output-dir": f"{trestle_const.MODEL_DIR_COMPDEF}/{component_def_name}",
+            "csv-file": str(csv_path.resolve()),
+            "output-dir": str(output_dir.resolve()),
             "output-overwrite": "true",
         }
 
-        original_directory = os.getcwd()
         try:
-            os.chdir(self.working_dir)
             section_proxy: configparser.SectionProxy = config[section_name]
             csv_to_oscal_task = CsvToOscalComponentDefinition(section_proxy)
             task_outcome = csv_to_oscal_task.execute()
@@ -139,6 +330,3 @@ class RuleTransformTask(TaskBase):
                 )
         except Exception as e:
             raise TaskException(f"Transform failed for {component_def_name}: {e}")
-
-        finally:
-            os.chdir(original_directory)
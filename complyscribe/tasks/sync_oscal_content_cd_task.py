@@ -7,7 +7,10 @@ import logging
 import os.path
 import pathlib
 import re
-from typing import Dict, List, Optional, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from ruamel.yaml.comments import CommentedMap, CommentedOrderedMap
 from ruamel.yaml.scanner import ScannerError
@@ -36,6 +39,7 @@ from trestle.oscal.component import (
     SetParameter,
 )
 
+from complyscribe.cac_workspace import CacWorkspace
 from complyscribe.const import FRAMEWORK_SHORT_NAME, SUCCESS_EXIT_CODE
 from complyscribe.tasks.authored.profile import CatalogControlResolver
 from complyscribe.tasks.base_task import TaskBase
@@ -45,9 +49,7 @@ from complyscribe.utils import (
     get_oscal_profiles,
     load_all_controls,
     populate_if_dict_field_not_exist,
-    read_cac_yaml_ordered,
     to_literal_scalar_string,
-    write_cac_yaml_ordered,
 )
 
 logger = logging.getLogger(__name__)
@@ -77,11 +79,16 @@ class ParameterDiffInfo:
         cac_content_root: pathlib.Path,
         profile_variables: Dict[str, str],
         oscal_parameters: List[SetParameter],
+        workspace: Optional[CacWorkspace] = None,
     ):
         """
-        Deal with parameter difference when init
+        Deal with parameter difference when init,
+        var file changes are staged in workspace and written when it is flushed
         """
         self.cac_content_root = cac_content_root
+        self.workspace = (
+            workspace if workspace is not None else CacWorkspace(cac_content_root)
+        )
         self._parameters_add: List[SetParameter] = []
         self._parameters_update: Dict[str, List[str]] = {}
         self._parameters_remove: List[str] = [
@@ -114,9 +121,8 @@ class ParameterDiffInfo:
         for v_file in get_variable_files(self.cac_content_root):
             if f"{var_id}.var" in v_file:
                 try:
-                    data = read_cac_yaml_ordered(pathlib.Path(v_file))
+                    data = self.workspace.load(pathlib.Path(v_file))
                     data["options"].update({var_value: var_value})
-                    write_cac_yaml_ordered(pathlib.Path(v_file), data)
                     logger.info(
                         f"Added new option {var_value}: {var_value} to {v_file}"
                     )
@@ -164,6 +170,49 @@ class ParameterDiffInfo:
             f" Parameters removed: {self.parameters_remove}"
         )
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # the workspace holds files parsed by this process, a worker process
+        # only needs the computed parameter differences
+        state = self.__dict__.copy()
+        del state["workspace"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.workspace = CacWorkspace(self.cac_content_root)
+
+
+@dataclass
+class ControlFileUpdate:
+    """Changes from one control implementation to apply to a control file"""
+
+    implemented_requirement_dict: Dict[str, ImplementedRequirement]
+    parameter_diff_info: ParameterDiffInfo
+    unselected_rules: List[str]
+
+
+@dataclass
+class PolicySyncJob:
+    """All control file changes of a single cac policy, in control implementation order"""
+
+    policy_id: str
+    updates: List[ControlFileUpdate] = field(default_factory=list)
+
+
+def _run_policy_sync_job(
+    task_kwargs: Dict[str, Any],
+    all_rule_ids_from_cac: List[str],
+    job: PolicySyncJob,
+) -> Dict[pathlib.Path, str]:
+    """
+    Sync a single policy control file in a worker process.
+    return: changed file content by file path, to be applied by the parent process
+    """
+    task = SyncOscalCdTask(**task_kwargs)
+    task.all_rule_ids_from_cac = all_rule_ids_from_cac
+    task.sync_policy(job)
+    return task.workspace.changes()
+
 
 class SyncOscalCdTask(TaskBase):
     """Sync OSCAL component definition to cac content task."""
@@ -174,18 +223,35 @@ class SyncOscalCdTask(TaskBase):
         working_dir: str,
         product: str,
         oscal_profile: str,
+        dry_run: bool = False,
+        jobs: int = 1,
     ) -> None:
-        """Initialize task."""
+        """
+        Initialize task.
+
+        Args:
+            cac_content_root: Root of the CaC content project.
+            working_dir: Trestle workspace to read the component definition from.
+            product: Component title of the product to sync.
+            oscal_profile: Name of the profile in trestle workspace.
+            dry_run: Only log the CaC content changes as diffs, do not write them.
+            jobs: Number of worker processes used to sync policy control files.
+        """
         super().__init__(working_dir, None)
         self.cac_content_root = cac_content_root
         self.product = product
         self.oscal_profile = oscal_profile
         self.control_dir = os.path.join(self.cac_content_root, "controls")
+        self.dry_run = dry_run
+        self.jobs = jobs
+        self.workspace = CacWorkspace(self.cac_content_root, dry_run=dry_run)
         self.parameter_diff_info: ParameterDiffInfo = ParameterDiffInfo(
-            self.cac_content_root, {}, []
+            self.cac_content_root, {}, [], self.workspace
         )
         self.implemented_requirement_dict: Dict[str, ImplementedRequirement] = {}
         self.catalog_helper: CatalogControlResolver = CatalogControlResolver()
+        # resolved OSCAL controls of each policy, shared by all control implementations
+        self._policy_catalog_helpers: Dict[str, CatalogControlResolver] = {}
         self.all_rule_ids_from_cac: List[str] = list()
         self.rule_ids_from_oscal: Set[str] = set()
         self.unselected_rules: List[str] = []
@@ -467,16 +533,78 @@ class SyncOscalCdTask(TaskBase):
 
     def sync_to_control_file(self, control_file_path: pathlib.Path) -> None:
         """
-        Sync component definition data to control file
+        Sync component definition data to control file in the workspace
         """
-        control_file_data = read_cac_yaml_ordered(control_file_path)
+        control_file_data = self.workspace.load(control_file_path)
         controls = control_file_data.get("controls", [])
         self._handle_controls_field(controls)
-        write_cac_yaml_ordered(control_file_path, control_file_data)
 
-    def sync(self, profile_id: str) -> None:
+    def get_policy_catalog_helper(self, policy_id: str) -> CatalogControlResolver:
         """
-        Sync OSCAL component definition data start from a cac content profile.
+        Get the CatalogControlResolver of a policy, resolving its OSCAL profiles
+        only the first time the policy is seen
+        """
+        if policy_id not in self._policy_catalog_helpers:
+            oscal_profiles = get_oscal_profiles(
+                pathlib.Path(self.working_dir),
+                self.product,
+                policy_id,
+            )
+            self._policy_catalog_helpers[policy_id] = load_all_controls(
+                oscal_profiles, pathlib.Path(self.working_dir)
+            )
+        return self._policy_catalog_helpers[policy_id]
+
+    def sync_policy(self, job: PolicySyncJob) -> None:
+        """
+        Sync component definition data to the control file of a policy,
+        applying the changes of each control implementation in order
+        """
+        # use CatalogControlResolver to get control id map between cac and OSCAL
+        self.catalog_helper = self.get_policy_catalog_helper(job.policy_id)
+        control_file_path = pathlib.Path(
+            os.path.join(self.control_dir, f"{job.policy_id}.yml")
+        )
+        for update in job.updates:
+            self.implemented_requirement_dict = update.implemented_requirement_dict
+            self.parameter_diff_info = update.parameter_diff_info
+            self.unselected_rules = update.unselected_rules
+            self.sync_to_control_file(control_file_path)
+
+    def sync_policies(self, jobs: List[PolicySyncJob]) -> None:
+        """
+        Sync the control files of all policies.
+
+        Policies are independent of each other, so with more than one job
+        configured they are processed in a process pool. Results are applied
+        to the workspace in job order, which keeps the output deterministic.
+        """
+        if self.jobs <= 1 or len(jobs) <= 1:
+            for job in jobs:
+                self.sync_policy(job)
+            return
+
+        worker = partial(
+            _run_policy_sync_job,
+            {
+                "cac_content_root": self.cac_content_root,
+                "working_dir": self.working_dir,
+                "product": self.product,
+                "oscal_profile": self.oscal_profile,
+            },
+            self.all_rule_ids_from_cac,
+        )
+        max_workers = min(self.jobs, len(jobs))
+        logger.debug(f"Syncing {len(jobs)} policies with {max_workers} workers")
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for changes in executor.map(worker, jobs):
+                for file_path, content in changes.items():
+                    self.workspace.replace(file_path, content)
+
+    def sync(self, profile_id: str) -> List[str]:
+        """
+        Sync OSCAL component definition data to a cac content profile.
+        return: ids of the policies selected by the profile
         """
         profile_path = pathlib.Path(
             os.path.join(
@@ -489,29 +617,10 @@ class SyncOscalCdTask(TaskBase):
         )
         # sync profile
         # get profile data from yaml
-        profile_data = read_cac_yaml_ordered(profile_path)
+        profile_data = self.workspace.load(profile_path)
 
         # Handle selections field, update profile file
-        policy_ids = self._update_profile_change_in_memory(profile_data, profile_id)
-
-        # save profile change
-        write_cac_yaml_ordered(profile_path, profile_data)
-
-        # sync control file
-        for policy_id in policy_ids:
-            # use CatalogControlResolver to get control id map between cac and OSCAL
-            oscal_profiles = get_oscal_profiles(
-                pathlib.Path(self.working_dir),
-                self.product,
-                policy_id,
-            )
-            self.catalog_helper = load_all_controls(
-                oscal_profiles, pathlib.Path(self.working_dir)
-            )
-            control_file_path = pathlib.Path(
-                os.path.join(self.control_dir, f"{policy_id}.yml")
-            )
-            self.sync_to_control_file(control_file_path)
+        return self._update_profile_change_in_memory(profile_data, profile_id)
 
     def make_implemented_requirements_as_dict(
         self, control_implementation: ControlImplementation
@@ -529,7 +638,7 @@ class SyncOscalCdTask(TaskBase):
     def execute(self) -> int:
         # get component definition path according to product name
         cd_json_path = ModelUtils.get_model_path_for_name_and_class(
-            self.working_dir,
+            pathlib.Path(self.working_dir),
             os.path.join(self.product, self.oscal_profile),
             ComponentDefinition,
             FileContentType.JSON,
@@ -552,6 +661,11 @@ class SyncOscalCdTask(TaskBase):
 
         self.all_rule_ids_from_cac = self.get_all_cac_rule_ids()
         self.rule_ids_from_oscal = self.get_oscal_component_rule_ids(component.props)
+        # profiles are resolved from the content as it was when the task started,
+        # all changes are staged in the workspace until the end of the task
+        profiles = get_profiles_from_products(self.cac_content_root, [self.product])
+        # control file changes are collected per policy and synced at the end
+        policy_jobs: Dict[str, PolicySyncJob] = {}
 
         # handle multiple control_implementations
         for control_implementation in component.control_implementations:
@@ -569,7 +683,6 @@ class SyncOscalCdTask(TaskBase):
             self.make_implemented_requirements_as_dict(control_implementation)
 
             # check parameters diff
-            profiles = get_profiles_from_products(self.cac_content_root, [self.product])
             profile_selection_obj: ProfileSelections
             for profile in profiles:
                 if profile.profile_id == profile_id:
@@ -585,11 +698,27 @@ class SyncOscalCdTask(TaskBase):
                 self.cac_content_root,
                 profile_selection_obj.variables,
                 [] if oscal_parameters is None else oscal_parameters,
+                self.workspace,
             )
             diff.validate_variables()
             logger.info(f"parameters diff: {diff}")
             self.parameter_diff_info = diff
-            # sync
-            self.sync(profile_id)
+            # sync profile
+            for policy_id in dict.fromkeys(self.sync(profile_id)):
+                job = policy_jobs.setdefault(policy_id, PolicySyncJob(policy_id))
+                job.updates.append(
+                    ControlFileUpdate(
+                        dict(self.implemented_requirement_dict),
+                        diff,
+                        self.unselected_rules,
+                    )
+                )
+
+        # sync control files
+        self.sync_policies(list(policy_jobs.values()))
+
+        # write all profile, control and var file changes at once
+        written = self.workspace.flush()
+        logger.info(f"Updated {len(written)} CaC content files")
 
         return SUCCESS_EXIT_CODE
@@ -1,7 +1,7 @@
 import logging
 import os
 import pathlib
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from ssg.controls import ControlsManager, Policy
 
@@ -19,6 +19,68 @@ from complyscribe.utils import (
 logger = logging.getLogger(__name__)
 
 
+class LevelMembershipMatrix:
+    """
+    OSCAL control x CaC level membership of a policy, built once as sets.
+
+    Args:
+        level_with_ancestors: Ancestors sequence of each level, ordered by level rank, desc.
+        controls_by_level: OSCAL control ids of the controls in each level,
+            including the controls inherited from lower levels.
+    """
+
+    def __init__(
+        self,
+        level_with_ancestors: Dict[str, List[str]],
+        controls_by_level: Dict[str, Set[str]],
+    ) -> None:
+        self.controls_by_level = controls_by_level
+        # the longest inheritance chain a level belongs to
+        self._chains: Dict[str, List[str]] = {}
+        for level in level_with_ancestors:
+            highest_level_chain: List[str] = []
+            for ancestors_sequence in level_with_ancestors.values():
+                if (
+                    level in ancestors_sequence
+                    and len(ancestors_sequence) > 1
+                    and len(ancestors_sequence) > len(highest_level_chain)
+                ):
+                    highest_level_chain = ancestors_sequence
+            self._chains[level] = highest_level_chain
+
+    def diff(
+        self, level: str, oscal_control_ids: Set[str]
+    ) -> Tuple[Set[str], Set[str]]:
+        """
+        Return the OSCAL control ids to add to and to remove from a level
+        """
+        level_controls = self.controls_by_level.get(level, set())
+        return (
+            oscal_control_ids.difference(level_controls),
+            level_controls.difference(oscal_control_ids),
+        )
+
+    def has_chain(self, level: str) -> bool:
+        """Check if the level inherits from or is inherited by another level"""
+        return bool(self._chains.get(level))
+
+    def higher_levels(self, level: str) -> Set[str]:
+        """Levels inheriting from the level, directly or not"""
+        chain = self._chains.get(level, [])
+        return set(chain[: chain.index(level)]) if chain else set()
+
+    def lower_levels(self, level: str) -> Set[str]:
+        """Levels the level inherits from, directly or not"""
+        chain = self._chains.get(level, [])
+        return set(chain[chain.index(level) + 1 :]) if chain else set()  # noqa: E203
+
+    def next_higher_level(self, level: str) -> Optional[str]:
+        """The level directly above the level in its inheritance chain"""
+        chain = self._chains.get(level, [])
+        i = chain.index(level) if chain else 0
+        return chain[i - 1] if i - 1 >= 0 else None
+
+
 class SyncOscalProfileTask(TaskBase):
     """Sync OSCAL profile to cac content task."""
 
@@ -39,6 +101,7 @@ class SyncOscalProfileTask(TaskBase):
         self.cac_control_map: Dict[str, Dict[str, Any]] = dict()
         self.cac_to_oscal_map: Dict[str, str] = dict()
         self.level_with_ancestors: Dict[str, List[str]] = dict()
+        self.level_matrix = LevelMembershipMatrix({}, {})
 
     def get_cac_id_control_map(self, data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
         """
@@ -80,15 +143,30 @@ class SyncOscalProfileTask(TaskBase):
 
         return level_with_ancestors
 
-    def process_level(self, level: str, add: Set[str], remove: Set[str]) -> None:
-        highest_level_chain: List[str] = []
-        for _, ancestors_sequence in self.level_with_ancestors.items():
-            if (
-                level in ancestors_sequence
-                and len(ancestors_sequence) > 1
-                and len(ancestors_sequence) > len(highest_level_chain)
+    def get_level_membership_matrix(
+        self, control_mgr: ControlsManager
+    ) -> LevelMembershipMatrix:
+        """
+        Resolve the OSCAL control ids of every level of the policy once
+        """
+        controls_by_level: Dict[str, Set[str]] = {}
+        for level in self.level_with_ancestors:
+            oscal_control_ids: Set[str] = set()
+            for control in control_mgr.get_all_controls_of_level(
+                self.cac_policy_id, level
             ):
-                highest_level_chain = ancestors_sequence
+                oscal_control_id = self.catalog_helper.get_id(control.id)
+                if oscal_control_id:
+                    oscal_control_ids.add(oscal_control_id)
+            controls_by_level[level] = oscal_control_ids
+
+        return LevelMembershipMatrix(self.level_with_ancestors, controls_by_level)
+
+    def process_level(self, level: str, add: Set[str], remove: Set[str]) -> None:
+        has_chain = self.level_matrix.has_chain(level)
+        higher_levels = self.level_matrix.higher_levels(level)
+        lower_levels = self.level_matrix.lower_levels(level)
+        next_higher_level = self.level_matrix.next_higher_level(level)
 
         # add level to CaC control
         for add_id in add:
@@ -98,17 +176,14 @@ class SyncOscalProfileTask(TaskBase):
             if level not in cac_control_levels:
                 cac_control_levels.append(level)
 
-            if not highest_level_chain:
+            if not has_chain:
                 continue
             # deal with level with inherits_from
-            i = highest_level_chain.index(level)
-            for higher_level in highest_level_chain[:i]:
-                if higher_level in cac_control_levels:
-                    cac_control_levels.remove(higher_level)
+            current_levels = set(cac_control_levels)
+            for higher_level in higher_levels.intersection(current_levels):
+                cac_control_levels.remove(higher_level)
             # if CaC control already have a lower level, remove current level
-            if set(highest_level_chain[i + 1 :]).intersection(  # noqa: E203
-                set(cac_control_levels)
-            ):
+            if lower_levels.intersection(current_levels):
                 cac_control_levels.remove(level)
 
         # remove level from CaC control
@@ -118,12 +193,14 @@ class SyncOscalProfileTask(TaskBase):
             if level in cac_control_levels:
                 cac_control_levels.remove(level)
 
-            if not highest_level_chain:
+            if not has_chain:
                 continue
             # deal with level with inherits_from
-            i = highest_level_chain.index(level)
-            if i - 1 >= 0 and highest_level_chain[i - 1] not in cac_control_levels:
-                cac_control_levels.append(highest_level_chain[i - 1])
+            if (
+                next_higher_level is not None
+                and next_higher_level not in cac_control_levels
+            ):
+                cac_control_levels.append(next_higher_level)
 
     def execute(self) -> int:
         policy_path = pathlib.Path(
@@ -153,6 +230,9 @@ class SyncOscalProfileTask(TaskBase):
         # get cac_control_id to oscal_control_id map
         self.cac_to_oscal_map = self.get_cac_to_oscal_map(control_mgr)
 
+        # resolve level membership of all controls once
+        self.level_matrix = self.get_level_membership_matrix(control_mgr)
+
         # sort profile according to level ancestors number, low level -> high level
         profiles.sort(
             key=lambda x: len(
@@ -167,20 +247,12 @@ class SyncOscalProfileTask(TaskBase):
             level = profile.metadata.title.split(self.cac_policy_id + "-")[-1]
             for import_obj in profile.imports:
                 for include_control in import_obj.include_controls:
-                    oscal_control_ids = list()
-                    for oscal_control_id in include_control.with_ids:
-                        oscal_control_ids.append(oscal_control_id.__root__)
-
-                    cac_control_ids = []
-                    for control in control_mgr.get_all_controls_of_level(
-                        self.cac_policy_id, level
-                    ):
-                        oscal_control_id = self.catalog_helper.get_id(control.id)
-                        if oscal_control_id:
-                            cac_control_ids.append(oscal_control_id)
-
-                    add = set(oscal_control_ids).difference(set(cac_control_ids))
-                    remove = set(cac_control_ids).difference(set(oscal_control_ids))
+                    oscal_control_ids = {
+                        oscal_control_id.__root__
+                        for oscal_control_id in include_control.with_ids
+                    }
+
+                    add, remove = self.level_matrix.diff(level, oscal_control_ids)
                     logger.info(f"processing {level}, add: {add}, remove: {remove}")
                     self.process_level(level, add, remove)
 
@@ -5,14 +5,27 @@
 """ComplyScribe Sync Upstreams Tasks"""
 
 import argparse
+import functools
+import hashlib
+import json
 import logging
 import pathlib
+import re
+import shutil
 import tempfile
-from typing import List, Optional
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from git import GitCommandError, Repo
+from git import Git, GitCommandError, Repo
 from trestle.common import file_utils
-from trestle.common.const import MODEL_DIR_LIST, VAL_MODE_ALL
+from trestle.common.const import (
+    MODEL_DIR_LIST,
+    MODEL_TYPE_TO_MODEL_DIR,
+    TRESTLE_CONFIG_DIR,
+    VAL_MODE_ALL,
+)
 from trestle.common.err import TrestleError
 from trestle.common.model_utils import ModelUtils
 from trestle.core.base_model import OscalBaseModel
@@ -21,10 +34,70 @@ from trestle.core.validator import Validator
 from trestle.core.validator_factory import validator_factory
 
 from complyscribe import const
+from complyscribe.hashing import hash_tree
 from complyscribe.tasks.base_task import ModelFilter, TaskBase, TaskException
+from complyscribe.tasks.mirror_cache import MirrorCache
+from complyscribe.tasks.upstream_manifest import UpstreamManifest
 
 logger = logging.getLogger(__name__)
 
+FETCH_TIMING = "fetch"
+COPY_TIMING = "copy"
+
+# Exit stack removing the checkout, the path of the checked out source, or None
+# if the source is unchanged and was not fetched, and the commit sha
+Checkout = Tuple[ExitStack, Optional[pathlib.Path], str]
+ModelResult = Tuple[Optional[OscalBaseModel], str]
+_MODEL_DIR_TO_MODEL_TYPE: Dict[str, str] = {
+    model_dir: model_type for model_type, model_dir in MODEL_TYPE_TO_MODEL_DIR.items()
+}
+MapModels = Callable[
+    [Callable[[pathlib.Path], ModelResult], Iterable[pathlib.Path]],
+    Iterator[ModelResult],
+]
+
+
+def _top_level_json(model_path: pathlib.Path) -> Optional[pathlib.Path]:
+    """Return the JSON file of a model stored as a single top-level JSON file."""
+    if not model_path.is_dir():
+        return None
+    model_type = _MODEL_DIR_TO_MODEL_TYPE.get(model_path.parent.name)
+    if model_type is None:
+        return None
+    extension = FileContentType.to_file_extension(FileContentType.JSON)
+    entries = list(model_path.iterdir())
+    if len(entries) != 1 or entries[0].name != f"{model_type}{extension}":
+        return None
+    return entries[0] if entries[0].is_file() else None
+
+
+def _load_model(
+    source_trestle_root: pathlib.Path, validate: bool, model_path: pathlib.Path
+) -> ModelResult:
+    """
+    Load and optionally validate an upstream model, returning the model or the error.
+
+    The model is not returned for a single top-level JSON file, since the
+    file is copied as-is.
+    """
+    try:
+        model: OscalBaseModel
+        _, _, model = ModelUtils.load_distributed(
+            model_path.absolute(), source_trestle_root
+        )
+    except (TrestleError, ValueError) as e:
+        return None, f"could not be loaded: {e}"
+
+    if validate:
+        logger.debug(f"Validating model {model_path}")
+        args = argparse.Namespace(mode=VAL_MODE_ALL, quiet=True)
+        validator: Validator = validator_factory.get(args)
+        if not validator.model_is_valid(model, True, source_trestle_root):
+            return None, "is not valid"
+    if _top_level_json(model_path) is not None:
+        return None, ""
+    return model, ""
+
 
 class SyncUpstreamsTask(TaskBase):
     """Sync OSCAL content from upstream git repositories."""
@@ -35,6 +108,8 @@ class SyncUpstreamsTask(TaskBase):
         git_sources: List[str],
         model_filter: Optional[ModelFilter] = None,
         validate: bool = True,
+        cache_dir: Optional[str] = None,
+        jobs: int = 1,
     ) -> None:
         """
         Initialize sync upstreams task.
@@ -47,12 +122,20 @@ class SyncUpstreamsTask(TaskBase):
             model_filter: Optional model filter to use for the task. This will filter models from
             being copied from the upstream repositories.
             validate: Optional argument to enable/disable validation of the models after they are copied
+            cache_dir: Optional directory of the git mirror cache. When set, upstream
+            repositories are cloned once into the cache and only fetched on later runs.
+            jobs: Optional number of sources fetched concurrently. The models of the
+            sources are always copied in the order of the sources.
 
         Notes: This task will fetch content from upstream repositories and copy it into the
         trestle workspace. The task WILL overwrite any existing content in the workspace with the same
         name. If it does not exist in the workspace, it will be created. Currently this only supports
         OSCAL artifacts that are stored directly in the repository. This currently does not support
-        delete operations.
+        delete operations. Without a cache directory, only the ref and the trestle model directories
+        are fetched when the remote supports shallow and partial clones. The provenance of the
+        synced models is recorded in a manifest in the workspace. Sources whose ref still resolves
+        to the synced commit and models whose upstream and workspace content did not change are
+        skipped.
         """
         if not file_utils.is_valid_project_root(pathlib.Path(working_dir)):
             raise TaskException(
@@ -60,7 +143,25 @@ class SyncUpstreamsTask(TaskBase):
             )
         self.sources = git_sources
         self.validate = validate
+        self._mirror_cache: Optional[MirrorCache] = (
+            MirrorCache(cache_dir) if cache_dir else None
+        )
+        self._jobs = jobs
+        self._manifest = UpstreamManifest(working_dir)
+        # Time spent fetching and copying each source
+        self.timings: Dict[str, Dict[str, float]] = {}
         super().__init__(working_dir, model_filter)
+        # Sources synced with other settings are synced again
+        self._settings = hashlib.sha256(
+            json.dumps(
+                {
+                    "validate": validate,
+                    "filter": vars(model_filter) if model_filter else None,
+                },
+                sort_keys=True,
+                default=str,
+            ).encode("utf-8")
+        ).hexdigest()
 
     def execute(self) -> int:
         """
@@ -69,55 +170,270 @@ class SyncUpstreamsTask(TaskBase):
             0 on success, raises an exception if not successful
         """
         logger.info(f"Syncing from {len(self.sources)} source(s) to {self.working_dir}")
-        for source in self.sources:
-            self._fetch_oscal_content(source)
+        with tempfile.TemporaryDirectory(dir=self.working_dir) as temporary_git_dir:
+            fetch_dir = pathlib.Path(temporary_git_dir)
+            checkouts = self._fetch_sources(fetch_dir)
+            with ExitStack() as stack:
+                for checkout_stack, _, _ in checkouts:
+                    stack.push(checkout_stack)
+                map_models: MapModels = map
+                if self._jobs > 1:
+                    executor = stack.enter_context(
+                        ProcessPoolExecutor(max_workers=self._jobs)
+                    )
+                    map_models = executor.map
+                # Sources are copied in order, so later sources overwrite
+                # the models of earlier sources
+                for index, (
+                    source,
+                    (_, upstream_trestle_workspace, commit),
+                ) in enumerate(zip(self.sources, checkouts)):
+                    if upstream_trestle_workspace is None:
+                        if self._manifest.are_destinations_unchanged(source):
+                            logger.info(f"Skipping {source}, unchanged at {commit}")
+                            continue
+                        # The workspace copies of the models changed since
+                        # the last sync, so the source is fetched again
+                        try:
+                            checkout_stack, upstream_trestle_workspace, commit = (
+                                self._checkout_source(
+                                    source, fetch_dir.joinpath(str(index))
+                                )
+                            )
+                        except Exception as e:
+                            raise self._source_error(source, e)
+                        stack.push(checkout_stack)
+                    self._copy_source(
+                        source, upstream_trestle_workspace, commit, map_models
+                    )
+            self._manifest.write(self.sources)
         return const.SUCCESS_EXIT_CODE
 
-    def _fetch_oscal_content(self, source: str) -> None:
-        """Fetch OSCAL content from upstream sources."""
-        repo: Optional[Repo] = None
-        logger.info(f"Syncing content from {source}")
-        try:
-            with tempfile.TemporaryDirectory(dir=self.working_dir) as temporary_git_dir:
-                self.validate_source(source)
-                repo_url, ref = source.split("@")
-                upstream_trestle_workspace: pathlib.Path = pathlib.Path(
-                    temporary_git_dir
+    def _fetch_sources(self, fetch_dir: pathlib.Path) -> List[Checkout]:
+        """
+        Fetch all sources, concurrently with more than one job.
+
+        Returns:
+            The checkout of each source, in the order of the sources. The
+            checkouts are removed when their exit stack is closed.
+        """
+        checkout_paths = [
+            fetch_dir.joinpath(str(index)) for index in range(len(self.sources))
+        ]
+        results: List[Union[Checkout, TaskException]]
+        if self._jobs <= 1 or len(self.sources) <= 1:
+            results = list(map(self._fetch_source, self.sources, checkout_paths))
+        else:
+            max_workers = min(self._jobs, len(self.sources))
+            logger.debug(
+                f"Fetching {len(self.sources)} sources with {max_workers} threads"
+            )
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(
+                    executor.map(self._fetch_source, self.sources, checkout_paths)
                 )
-                Repo.clone_from(repo_url, upstream_trestle_workspace)
-                repo = Repo(upstream_trestle_workspace)
-                repo.git.checkout(ref)
 
-                validator: Optional[Validator] = None
-                if self.validate:
-                    args = argparse.Namespace(mode=VAL_MODE_ALL, quiet=True)
-                    validator = validator_factory.get(args)
+        checkouts = [result for result in results if not isinstance(result, Exception)]
+        failures = [str(result) for result in results if isinstance(result, Exception)]
+        if failures:
+            for stack, _, _ in checkouts:
+                stack.close()
+            raise TaskException("\n".join(failures))
+        return checkouts
+
+    def _fetch_source(
+        self, source: str, checkout_path: pathlib.Path
+    ) -> Union[Checkout, TaskException]:
+        """
+        Fetch and check out a source, returning the error if it fails.
+
+        If the ref of the source still resolves to the commit it was synced
+        from, the source is not fetched and the path of the checkout is None.
+        """
+        start = time.perf_counter()
+        try:
+            self.validate_source(source)
+            repo_url, ref = source.split("@")
+            if self._manifest.has_source(source):
+                commit = self._resolve_commit(repo_url, ref)
+                if commit and self._manifest.is_source_unchanged(
+                    source, commit, self._settings
+                ):
+                    logger.info(f"Not fetching {source}, {ref} is still at {commit}")
+                    self.timings[source] = {FETCH_TIMING: time.perf_counter() - start}
+                    return ExitStack(), None, commit
+            return self._checkout_source(source, checkout_path)
+        except Exception as e:
+            return self._source_error(source, e)
+
+    def _checkout_source(
+        self, source: str, checkout_path: pathlib.Path
+    ) -> Tuple[ExitStack, pathlib.Path, str]:
+        """Fetch and check out a source, returning its checkout and commit sha."""
+        logger.info(f"Fetching content from {source}")
+        start = time.perf_counter()
+        repo_url, ref = source.split("@")
+        stack = ExitStack()
+        try:
+            checkout_path.mkdir()
+            upstream_trestle_workspace = stack.enter_context(
+                self._checkout(repo_url, ref, checkout_path)
+            )
+            repo = Repo(upstream_trestle_workspace)
+            commit = repo.head.commit.hexsha
+            repo.close()
+        except Exception:
+            stack.close()
+            raise
+        self.timings[source] = {FETCH_TIMING: time.perf_counter() - start}
+        logger.info(f"Fetched {source} in {self.timings[source][FETCH_TIMING]:.2f}s")
+        return stack, upstream_trestle_workspace, commit
+
+    @staticmethod
+    def _resolve_commit(repo_url: str, ref: str) -> Optional[str]:
+        """
+        Resolve the ref of a remote repository to a commit sha.
+
+        Returns:
+            The commit sha, or None if the ref cannot be resolved without
+            fetching, such as an abbreviated commit sha.
+        """
+        if re.fullmatch(r"[0-9a-f]{40}", ref):
+            return ref
+        try:
+            output: str = Git().ls_remote(repo_url, ref)
+        except GitCommandError as e:
+            logger.debug(f"Could not resolve {ref} in {repo_url}: {e}")
+            return None
+        refs: Dict[str, str] = {}
+        for line in output.splitlines():
+            sha, _, name = line.partition("\t")
+            refs[name] = sha
+        # Same order as git, with annotated tags peeled to their commit
+        for name in (
+            ref,
+            f"refs/{ref}",
+            f"refs/tags/{ref}^{{}}",
+            f"refs/tags/{ref}",
+            f"refs/heads/{ref}",
+        ):
+            if name in refs:
+                return refs[name]
+        return None
+
+    def _copy_source(
+        self,
+        source: str,
+        upstream_trestle_workspace: pathlib.Path,
+        commit: str,
+        map_models: MapModels = map,
+    ) -> None:
+        """
+        Validate and copy the models of a fetched source into the workspace.
 
-                for model_dir in MODEL_DIR_LIST:
+        The valid models are copied and all invalid models are reported together.
+        The models are recorded in the manifest once all of them are valid.
+        """
+        logger.info(f"Syncing content from {source}")
+        start = time.perf_counter()
+        try:
+            errors: List[str] = []
+            model_hashes: Dict[str, str] = {}
+            for model_dir in MODEL_DIR_LIST:
+                errors.extend(
                     self._copy_validate_models(
                         upstream_trestle_workspace,
                         pathlib.Path(self.working_dir),
                         model_dir,
-                        validator,
+                        map_models,
+                        source,
+                        model_hashes,
                     )
-                logger.info(f"Successfully copied from {source}")
-        except ValueError as e:
-            raise TaskException(f"Invalid source {source}: {e}")
-        except GitCommandError as e:
-            raise TaskException(
-                f"Git error occurred while fetching content from {source}: {e}"
+                )
+            if errors:
+                raise TrestleError("\n".join(errors))
+        except Exception as e:
+            raise self._source_error(source, e)
+        self._manifest.record_source(source, commit, self._settings, model_hashes)
+        self.timings[source][COPY_TIMING] = time.perf_counter() - start
+        logger.info(
+            f"Successfully copied from {source} in "
+            f"{self.timings[source][COPY_TIMING]:.2f}s"
+        )
+
+    @staticmethod
+    def _source_error(source: str, error: Exception) -> TaskException:
+        """Return the task error for an error while syncing a source."""
+        if isinstance(error, TaskException):
+            return error
+        if isinstance(error, ValueError):
+            return TaskException(f"Invalid source {source}: {error}")
+        if isinstance(error, GitCommandError):
+            return TaskException(
+                f"Git error occurred while fetching content from {source}: {error}"
             )
-        except TrestleError as e:
-            raise TaskException(
-                f"Trestle error occurred while fetching content from {source}: {e}"
+        if isinstance(error, TrestleError):
+            return TaskException(
+                f"Trestle error occurred while fetching content from {source}: {error}"
             )
-        except Exception as e:
-            raise TaskException(
-                f"Unexpected error while fetching content from {source}: {e}"
+        return TaskException(
+            f"Unexpected error while fetching content from {source}: {error}"
+        )
+
+    @contextmanager
+    def _checkout(
+        self, repo_url: str, ref: str, checkout_path: pathlib.Path
+    ) -> Iterator[pathlib.Path]:
+        """Check out the ref of an upstream repository, from the mirror cache if set."""
+        if self._mirror_cache is not None:
+            with self._mirror_cache.checkout(repo_url, ref, checkout_path) as path:
+                yield path
+            return
+
+        try:
+            repo = self._sparse_checkout(repo_url, ref, checkout_path)
+        except GitCommandError as e:
+            logger.warning(
+                f"Shallow fetch of {ref} from {repo_url} failed, "
+                f"cloning the full repository: {e}"
             )
+            shutil.rmtree(checkout_path)
+            checkout_path.mkdir()
+            repo = self._full_checkout(repo_url, ref, checkout_path)
+        try:
+            yield checkout_path
         finally:
-            if repo is not None:
-                repo.close()
+            repo.close()
+
+    @staticmethod
+    def _sparse_checkout(repo_url: str, ref: str, checkout_path: pathlib.Path) -> Repo:
+        """
+        Fetch only the ref and check out only the trestle model directories.
+
+        The ref is fetched with depth 1 and blobs are only fetched for the
+        checked out model directories, if the remote supports filters.
+        """
+        repo = Repo.init(checkout_path)
+        try:
+            repo.create_remote("origin", repo_url)
+            repo.git.sparse_checkout("set", TRESTLE_CONFIG_DIR, *MODEL_DIR_LIST)
+            repo.git.fetch("--depth=1", "--filter=blob:none", "origin", ref)
+            repo.git.checkout("--detach", "FETCH_HEAD")
+        except GitCommandError:
+            repo.close()
+            raise
+        return repo
+
+    @staticmethod
+    def _full_checkout(repo_url: str, ref: str, checkout_path: pathlib.Path) -> Repo:
+        """Clone the full repository and check out the ref."""
+        repo = Repo.clone_from(repo_url, checkout_path)
+        try:
+            repo.git.checkout(ref)
+        except GitCommandError:
+            repo.close()
+            raise
+        return repo
 
     def validate_source(self, source: str) -> None:
         """Validate the source string."""
@@ -129,28 +445,61 @@ class SyncUpstreamsTask(TaskBase):
         source_trestle_root: pathlib.Path,
         destination_trestle_root: pathlib.Path,
         model_dir: str,
-        validator: Optional[Validator] = None,
-    ) -> None:
-        """Copy models from upstream source to trestle workspace."""
+        map_models: MapModels = map,
+        source: str = "",
+        model_hashes: Optional[Dict[str, str]] = None,
+    ) -> List[str]:
+        """
+        Copy models from upstream source to trestle workspace.
+
+        Models are loaded and validated with map_models, which may run in
+        worker processes, and written in order. Invalid models are not written.
+        Models recorded in the manifest of the source with the same upstream and
+        workspace content are skipped. The content hash of each upstream model
+        is added to model_hashes.
+
+        Returns:
+            The errors of the invalid models
+        """
         model_search_path = source_trestle_root.joinpath(model_dir)
         # The model directories are created by default with trestle init, but
         # they can be deleted.
         if not model_search_path.exists():
-            return
+            return []
         logger.debug(f"Copying models from {model_search_path}")
+        model_paths: List[pathlib.Path] = []
         for model_path in self.iterate_models(model_search_path):
-            model: OscalBaseModel
-            _, _, model = ModelUtils.load_distributed(
-                model_path.absolute(), source_trestle_root.absolute()
-            )
-
-            # Validate the model
-            if validator is not None:
-                logger.debug(f"Validating model {model_path}")
-                if not validator.model_is_valid(model, True, source_trestle_root):
-                    raise TrestleError(
-                        f"Model {model_path} from {model_search_path} is not valid"
+            model_key = f"{model_dir}/{model_path.name}"
+            source_hash = hash_tree(model_path)
+            if model_hashes is not None:
+                model_hashes[model_key] = source_hash
+            if self._manifest.is_model_unchanged(
+                source, self._settings, model_key, source_hash
+            ):
+                logger.debug(f"Skipping unchanged model {model_key}")
+                continue
+            json_path = _top_level_json(model_path)
+            if json_path is not None and not self.validate:
+                self._copy_model_file(json_path, destination_trestle_root, model_dir)
+                continue
+            model_paths.append(model_path)
+        load_model = functools.partial(
+            _load_model, source_trestle_root.absolute(), self.validate
+        )
+        errors: List[str] = []
+        for model_path, (model, error) in zip(
+            model_paths, map_models(load_model, model_paths)
+        ):
+            if error:
+                errors.append(f"Model {model_path} from {model_search_path} {error}")
+                continue
+            if model is None:
+                json_path = _top_level_json(model_path)
+                if json_path is not None:
+                    self._copy_model_file(
+                        json_path, destination_trestle_root, model_dir
                     )
+                continue
 
             # Write model to disk as JSON.
             # The only format supported by the trestle authoring
@@ -159,3 +508,15 @@ class SyncUpstreamsTask(TaskBase):
             ModelUtils.save_top_level_model(
                 model, destination_trestle_root, model_name, FileContentType.JSON
             )
+        return errors
+
+    @staticmethod
+    def _copy_model_file(
+        json_path: pathlib.Path, destination_trestle_root: pathlib.Path, model_dir: str
+    ) -> None:
+        """Copy the JSON file of a top-level model into the workspace as-is."""
+        destination_dir = destination_trestle_root.joinpath(
+            model_dir, json_path.parent.name
+        )
+        destination_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(json_path, destination_dir.joinpath(json_path.name))
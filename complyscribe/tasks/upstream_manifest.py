@@ -0,0 +1,148 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Provenance manifest of the models synced from upstream sources"""
+
+import json
+import logging
+import os
+import pathlib
+from typing import Any, Dict, List
+
+from complyscribe import const
+from complyscribe.hashing import hash_tree
+
+logger = logging.getLogger(__name__)
+
+UPSTREAM_MANIFEST_FILE = "upstreams.json"
+MANIFEST_VERSION = 1
+
+
+class UpstreamManifest:
+    """
+    Provenance of the models synced from each upstream source.
+
+    For each source, the manifest holds the commit sha it was synced from,
+    the settings of the sync and the content hash of each upstream model and
+    of its copy in the workspace. The manifest is stored in the complyscribe
+    config directory of the workspace, so it is committed with the models.
+    """
+
+    def __init__(self, working_dir: str) -> None:
+        self._working_dir = pathlib.Path(working_dir)
+        self._manifest_path = self._working_dir.joinpath(
+            const.COMPLYSCRIBE_CONFIG_DIR, UPSTREAM_MANIFEST_FILE
+        )
+        self._sources: Dict[str, Dict[str, Any]] = self._load()
+
+    @property
+    def manifest_path(self) -> pathlib.Path:
+        """Return the path of the manifest file"""
+        return self._manifest_path
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self._manifest_path.exists():
+            return {}
+        try:
+            with open(self._manifest_path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable upstream manifest: {e}")
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            logger.info("Ignoring upstream manifest of another version")
+            return {}
+        return data.get("sources", {})
+
+    def _destination_hash(self, model_key: str) -> str:
+        path = self._working_dir.joinpath(model_key)
+        return hash_tree(path) if path.exists() else ""
+
+    def has_source(self, source: str) -> bool:
+        """Check if the source was synced before"""
+        return source in self._sources
+
+    def is_source_unchanged(self, source: str, commit: str, settings: str) -> bool:
+        """Check if the source was synced from the commit with the same settings"""
+        entry = self._sources.get(source, {})
+        return entry.get("commit") == commit and entry.get("settings") == settings
+
+    def are_destinations_unchanged(self, source: str) -> bool:
+        """Check if the workspace copies of the models of a source did not change"""
+        models: Dict[str, Dict[str, str]] = self._sources.get(source, {}).get(
+            "models", {}
+        )
+        return all(
+            self._destination_hash(model_key) == hashes.get("destination")
+            for model_key, hashes in models.items()
+        )
+
+    def is_model_unchanged(
+        self, source: str, settings: str, model_key: str, source_hash: str
+    ) -> bool:
+        """
+        Check if a model of a source and its workspace copy did not change.
+
+        Args:
+            source: Upstream source of the model
+            settings: Key of the sync settings
+            model_key: Path of the model relative to the trestle root
+            source_hash: Content hash of the upstream model
+        """
+        entry = self._sources.get(source, {})
+        if entry.get("settings") != settings:
+            return False
+        hashes = entry.get("models", {}).get(model_key)
+        if hashes is None or hashes.get("source") != source_hash:
+            return False
+        return self._destination_hash(model_key) == hashes.get("destination")
+
+    def record_source(
+        self, source: str, commit: str, settings: str, model_hashes: Dict[str, str]
+    ) -> None:
+        """
+        Record the models synced from a source.
+
+        Args:
+            source: Upstream source
+            commit: Commit sha the source was synced from
+            settings: Key of the sync settings
+            model_hashes: Content hash of each upstream model, by model path
+            relative to the trestle root
+        """
+        self._sources[source] = {
+            "commit": commit,
+            "settings": settings,
+            "models": {
+                model_key: {"source": source_hash}
+                for model_key, source_hash in model_hashes.items()
+            },
+        }
+
+    def write(self, sources: List[str]) -> None:
+        """
+        Write the manifest of the sources, dropping other sources.
+
+        The hashes of the workspace copies are taken when the manifest is
+        written, after all sources were synced.
+        """
+        self._sources = {
+            source: entry
+            for source, entry in self._sources.items()
+            if source in sources
+        }
+        for entry in self._sources.values():
+            for model_key, hashes in entry.get("models", {}).items():
+                hashes["destination"] = self._destination_hash(model_key)
+        self._manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as file:
+            json.dump(
+                {"version": MANIFEST_VERSION, "sources": self._sources},
+                file,
+                indent=2,
+                sort_keys=True,
+            )
+            file.write("\n")
+        os.replace(tmp_path, self._manifest_path)
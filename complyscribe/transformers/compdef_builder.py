@@ -0,0 +1,322 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Build an OSCAL component definition from rules in memory."""
+
+import datetime
+import json
+import logging
+import math
+import uuid
+from typing import Dict, List, Optional, Tuple, Union
+
+from trestle.common.const import TRESTLE_GENERIC_NS
+from trestle.oscal import OSCAL_VERSION
+from trestle.oscal.common import Metadata, Property, StringDatatype
+from trestle.oscal.component import (
+    ComponentDefinition,
+    ControlImplementation,
+    DefinedComponent,
+    DefinedComponentTypeValidValues,
+    ImplementedRequirement,
+    SetParameter,
+    Statement,
+)
+from trestle.tasks.csv_to_oscal_cd import (
+    CHECK_DESCRIPTION,
+    CHECK_ID,
+    PARAMETER_DESCRIPTION,
+    PARAMETER_ID,
+    PARAMETER_VALUE_ALTERNATIVES,
+    RULE_DESCRIPTION,
+    RULE_ID,
+    derive_control_id,
+    derive_part_id,
+)
+
+from complyscribe.transformers.base_transformer import RulesTransformerException
+from complyscribe.transformers.trestle_rule import TrestleRule
+
+logger = logging.getLogger(__name__)
+
+RULE_SET_PREFIX = "rule_set_"
+VALIDATION_TYPE = "validation"
+
+ComponentType = Union[DefinedComponentTypeValidValues, StringDatatype]
+
+
+def _is_validation(rule: TrestleRule) -> bool:
+    return rule.component.type.lower().strip() == VALIDATION_TYPE
+
+
+def _component_type(component_type: str) -> ComponentType:
+    try:
+        return DefinedComponentTypeValidValues(component_type)
+    except ValueError:
+        return StringDatatype(component_type)
+
+
+def _split_values(value: str) -> List[str]:
+    if "," in value:
+        return [item.strip() for item in value.split(",")]
+    return [value]
+
+
+class ComponentDefinitionBuilder:
+    """
+    Build an OSCAL component definition from a list of TrestleRules.
+
+    The component definition matches the one created by the trestle
+    csv-to-oscal-cd task from the CSV written by the CSVBuilder for the same
+    rules, without writing and parsing the CSV.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._rules: List[TrestleRule] = []
+        self._rule_keys: Dict[Tuple[str, ...], str] = {}
+
+    @property
+    def rule_count(self) -> int:
+        """Return the number of rules."""
+        return len(self._rules)
+
+    def add_rule(self, rule: TrestleRule) -> None:
+        """Add a rule to the component definition."""
+        if _is_validation(rule):
+            required = {
+                "rule id": rule.name,
+                "component title": rule.component.name,
+                "component description": rule.component.description,
+                "component type": rule.component.type,
+                "check id": rule.check.name if rule.check else "",
+                "check description": rule.check.description if rule.check else "",
+            }
+            key: Tuple[str, ...] = (
+                rule.component.name,
+                rule.component.type,
+                rule.name,
+                required["check id"],
+            )
+        else:
+            controls = " ".join(
+                control.id for control in rule.profile.include_controls
+            ).split()
+            if not controls:
+                logger.debug(f"Skipping rule {rule.name} without controls")
+                return
+            required = {
+                "rule id": rule.name,
+                "component title": rule.component.name,
+                "component description": rule.component.description,
+                "component type": rule.component.type,
+                "rule description": rule.description,
+                "profile href": rule.profile.href,
+                "profile description": rule.profile.description,
+            }
+            key = (rule.component.name, rule.component.type, rule.name)
+        for field, value in required.items():
+            if not value:
+                raise RulesTransformerException(
+                    f"Rule {rule.name} is missing a value for {field}"
+                )
+        if key in self._rule_keys:
+            raise RulesTransformerException(
+                f"Duplicate rule {rule.name} for component {rule.component.name}"
+            )
+        self._rule_keys[key] = rule.name
+        self._rules.append(rule)
+
+    def build(self, title: str, version: str) -> ComponentDefinition:
+        """
+        Build the component definition.
+
+        Args:
+            title: Title of the component definition
+            version: Version of the component definition
+
+        Returns:
+            The component definition with a component per component title and type
+        """
+        timestamp = (
+            datetime.datetime.now(datetime.timezone.utc)
+            .replace(microsecond=0)
+            .isoformat()
+        )
+        metadata = Metadata(
+            title=title,
+            last_modified=timestamp,
+            oscal_version=OSCAL_VERSION,
+            version=version,
+        )
+        components: Dict[Tuple[str, str], DefinedComponent] = {}
+        fill = int(math.log10(len(self._rules))) + 1 if self._rules else 1
+        for index, rule in enumerate(self._rules):
+            rule_set = f"{RULE_SET_PREFIX}{str(index).zfill(fill)}"
+            component = self._get_component(components, rule)
+            component.props = (component.props or []) + self._rule_props(rule, rule_set)
+            if not _is_validation(rule):
+                self._add_control_mappings(component, rule)
+
+        # Use model_construct to bypass validation for empty components list
+        return ComponentDefinition.model_construct(
+            uuid=str(uuid.uuid4()),
+            metadata=metadata,
+            components=list(components.values()),
+        )
+
+    @staticmethod
+    def _get_component(
+        components: Dict[Tuple[str, str], DefinedComponent], rule: TrestleRule
+    ) -> DefinedComponent:
+        """Find or create the component of a rule."""
+        key = (rule.component.name, rule.component.type)
+        if key not in components:
+            # Use model_construct, props and control implementations are added later
+            components[key] = DefinedComponent.model_construct(
+                uuid=str(uuid.uuid4()),
+                type=_component_type(rule.component.type),
+                title=rule.component.name,
+                description=rule.component.description,
+            )
+        return components[key]
+
+    @staticmethod
+    def _rule_props(rule: TrestleRule, rule_set: str) -> List[Property]:
+        """Create the props of a rule, grouped by the rule set remarks."""
+        values: List[Tuple[str, str]] = [(RULE_ID, rule.name)]
+        if not _is_validation(rule):
+            values.append((RULE_DESCRIPTION, rule.description))
+            if rule.parameter is not None:
+                values.append((PARAMETER_ID, rule.parameter.name))
+                values.append((PARAMETER_DESCRIPTION, rule.parameter.description))
+                values.append(
+                    (
+                        PARAMETER_VALUE_ALTERNATIVES,
+                        json.dumps(rule.parameter.alternative_values),
+                    )
+                )
+        if rule.check is not None:
+            values.append((CHECK_ID, rule.check.name))
+            values.append((CHECK_DESCRIPTION, rule.check.description))
+
+        props: List[Property] = []
+        for name, value in values:
+            value = value.strip()
+            if not value:
+                continue
+            try:
+                props.append(
+                    Property(
+                        name=name,
+                        value=value,
+                        ns=TRESTLE_GENERIC_NS,
+                        class_=None,
+                        remarks=rule_set,
+                    )
+                )
+            except ValueError as e:
+                raise RulesTransformerException(
+                    f"Rule {rule.name} has an invalid value for {name}: {e}"
+                )
+        return props
+
+    def _add_control_mappings(
+        self, component: DefinedComponent, rule: TrestleRule
+    ) -> None:
+        """Add the rule to the implemented requirements of its controls."""
+        control_implementation = self._get_control_implementation(component, rule)
+        if rule.parameter is not None and rule.parameter.default_value:
+            self._add_set_parameter(
+                control_implementation,
+                SetParameter(
+                    param_id=rule.parameter.name,
+                    values=_split_values(rule.parameter.default_value),
+                ),
+            )
+        controls = " ".join(
+            control.id for control in rule.profile.include_controls
+        ).split()
+        for control_mapping in controls:
+            implemented_requirement = self._get_implemented_requirement(
+                control_implementation, derive_control_id(control_mapping)
+            )
+            prop = Property(name=RULE_ID, value=rule.name, ns=TRESTLE_GENERIC_NS)
+            part_id: Optional[str] = derive_part_id(control_mapping)
+            if part_id is None:
+                implemented_requirement.props = (
+                    implemented_requirement.props or []
+                ) + [prop]
+            else:
+                self._get_statement(implemented_requirement, part_id).props.append(prop)
+
+    @staticmethod
+    def _get_control_implementation(
+        component: DefinedComponent, rule: TrestleRule
+    ) -> ControlImplementation:
+        """Find or create the control implementation of the rule profile."""
+        control_implementations = component.control_implementations or []
+        for control_implementation in control_implementations:
+            if (
+                control_implementation.source == rule.profile.href
+                and control_implementation.description == rule.profile.description
+            ):
+                return control_implementation
+        # Use model_construct to bypass validation for empty implemented_requirements list
+        control_implementation = ControlImplementation.model_construct(
+            uuid=str(uuid.uuid4()),
+            source=rule.profile.href,
+            description=rule.profile.description,
+            implemented_requirements=[],
+        )
+        control_implementations.append(control_implementation)
+        component.control_implementations = control_implementations
+        return control_implementation
+
+    @staticmethod
+    def _add_set_parameter(
+        control_implementation: ControlImplementation, set_parameter: SetParameter
+    ) -> None:
+        """Add a set parameter unless it is already set to the same values."""
+        set_parameters = control_implementation.set_parameters or []
+        for existing in set_parameters:
+            if existing.param_id == set_parameter.param_id:
+                if existing.values != set_parameter.values:
+                    raise RulesTransformerException(
+                        f"set-parameter id={existing.param_id} conflicting values"
+                    )
+                return
+        set_parameters.append(set_parameter)
+        control_implementation.set_parameters = set_parameters
+
+    @staticmethod
+    def _get_implemented_requirement(
+        control_implementation: ControlImplementation, control_id: str
+    ) -> ImplementedRequirement:
+        """Find or create the implemented requirement of a control."""
+        for implemented_requirement in control_implementation.implemented_requirements:
+            if implemented_requirement.control_id == control_id:
+                return implemented_requirement
+        implemented_requirement = ImplementedRequirement(
+            uuid=str(uuid.uuid4()), control_id=control_id, description=""
+        )
+        control_implementation.implemented_requirements.append(implemented_requirement)
+        return implemented_requirement
+
+    @staticmethod
+    def _get_statement(
+        implemented_requirement: ImplementedRequirement, part_id: str
+    ) -> Statement:
+        """Find or create the statement of a control part."""
+        statements = implemented_requirement.statements or []
+        for statement in statements:
+            if statement.statement_id == part_id:
+                return statement
+        # Use model_construct to bypass validation for empty props list
+        statement = Statement.model_construct(
+            uuid=str(uuid.uuid4()), statement_id=part_id, description="", props=[]
+        )
+        statements.append(statement)
+        implemented_requirement.statements = statements
+        return statement
@@ -6,11 +6,9 @@
 
 import logging
 import pathlib
-from io import StringIO
 from typing import Any, Dict, List, Optional
 
 from pydantic import ValidationError
-from ruamel.yaml import YAML
 
 from complyscribe import const
 from complyscribe.transformers.base_transformer import (
@@ -26,6 +24,7 @@ from complyscribe.transformers.trestle_rule import (
     TrestleRule,
     convert_errors,
 )
+from complyscribe.yaml_engine import safe_dump, safe_dump_file, safe_load
 
 logger = logging.getLogger(__name__)
 
@@ -41,8 +40,7 @@ class ToRulesYAMLTransformer(ToRulesTransformer):
         """Transform YAML data into a TrestleRule object."""
         validation_errors: List[ValidationError] = []
         try:
-            yaml = YAML(typ="safe")
-            yaml_data: Dict[str, Any] = yaml.load(blob)
+            yaml_data: Dict[str, Any] = safe_load(blob)
 
             rule_info_data = yaml_data[const.RULE_INFO_TAG]
 
@@ -115,21 +113,14 @@ class FromRulesYAMLTransformer(FromRulesTransformer):
         """
 
         rule_info: Dict[str, Any] = self._to_rule_info(rule)
-        yaml_obj = YAML(typ="safe")
-        yaml_obj.default_flow_style = False
-        yaml_stream = StringIO()
-        yaml_obj.dump(rule_info, yaml_stream)
-        yaml_str = yaml_stream.getvalue()
-        yaml_stream.close()
+        yaml_str = safe_dump(rule_info)
 
         return yaml_str
 
     def write_to_file(self, rule: TrestleRule, file_path: pathlib.Path) -> None:
         """Write TrestleRule object to YAML file."""
         rule_info: Dict[str, Any] = self._to_rule_info(rule)
-        yaml_obj = YAML(typ="safe")
-        yaml_obj.default_flow_style = False
-        yaml_obj.dump(rule_info, file_path)
+        safe_dump_file(rule_info, file_path)
 
     @staticmethod
     def _to_rule_info(rule: TrestleRule) -> Dict[str, Any]:
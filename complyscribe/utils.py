@@ -3,12 +3,13 @@
 
 """Common utility functions."""
 
+import io
 import os
 import pathlib
 import textwrap
 from typing import Any, List, Optional, Tuple
 
-from ruamel.yaml import YAML, CommentedMap, CommentToken
+from ruamel.yaml import CommentedMap, CommentToken
 from ruamel.yaml.scalarstring import LiteralScalarString
 from ssg.controls import ControlsManager, Policy
 from ssg.products import load_product_yaml, product_yaml_path
@@ -18,6 +19,7 @@ from trestle.core.profile_resolver import ProfileResolver
 from trestle.oscal.profile import Profile
 
 from complyscribe.tasks.authored.profile import CatalogControlResolver
+from complyscribe.yaml_engine import cac_round_trip_dumper, round_trip_loader
 
 
 def populate_if_dict_field_not_exist(
@@ -85,23 +87,30 @@ def read_cac_yaml_ordered(file_path: pathlib.Path) -> Any:
     """
     Read data from CaC content yaml file while preserving the order
     """
-    yaml = YAML()
-    yaml.preserve_quotes = True
-    return yaml.load(file_path)
+    return round_trip_loader().load(file_path)
+
+
+def parse_cac_yaml_ordered(content: str) -> Any:
+    """
+    Parse CaC content yaml text while preserving the order
+    """
+    return round_trip_loader().load(content)
 
 
 def write_cac_yaml_ordered(file_path: pathlib.Path, data: Any) -> None:
     """
     Serializes a Python object into a CaC content YAML stream, preserving the order.
     """
-    yaml = YAML()
-    # align with CaC content yaml file style
-    yaml.indent(mapping=4, sequence=6, offset=4)
-    yaml.explicit_start = True
-    # temp workaround to mitigate line length difference
-    # between CaC yamlfix and complyscribe ruamel.yaml
-    yaml.width = 110
-    yaml.dump(data, file_path)
+    cac_round_trip_dumper().dump(data, file_path)
+
+
+def dump_cac_yaml_ordered(data: Any) -> str:
+    """
+    Serializes a Python object into CaC content YAML text, preserving the order.
+    """
+    stream = io.StringIO()
+    cac_round_trip_dumper().dump(data, stream)
+    return stream.getvalue()
 
 
 def load_controls_manager(cac_content_root: str, product: str) -> ControlsManager:
@@ -0,0 +1,195 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+"""
+Shared YAML engines.
+
+Read-only consumers that only need plain data use the libyaml backed
+PyYAML loader when available. Plain data is dumped with the ruamel.yaml
+safe dumper, which follows YAML 1.2 and the string quoting of the files
+written so far. The ruamel.yaml round-trip engine is only used where
+comments and formatting of CaC content must be preserved. Configured
+ruamel.yaml instances are reused, one per thread, since a YAML instance
+must not be shared by concurrent loads or dumps.
+"""
+
+import io
+import pathlib
+import re
+import threading
+from collections.abc import Hashable
+from typing import IO, Any, Dict, Optional, Set, Union
+
+import yaml
+from ruamel.yaml import YAML
+from yaml.constructor import ConstructorError
+from yaml.nodes import MappingNode, ScalarNode
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover - libyaml is not available
+    from yaml import SafeLoader as _SafeLoader  # type: ignore[assignment]
+
+_BOOL_TAG = "tag:yaml.org,2002:bool"
+_INT_TAG = "tag:yaml.org,2002:int"
+_FLOAT_TAG = "tag:yaml.org,2002:float"
+_NULL_TAG = "tag:yaml.org,2002:null"
+_MERGE_TAG = "tag:yaml.org,2002:merge"
+_TIMESTAMP_TAG = "tag:yaml.org,2002:timestamp"
+
+
+class CoreSchemaSafeLoader(_SafeLoader):
+    """
+    Safe loader resolving plain scalars with the YAML 1.2 core schema.
+
+    PyYAML implements YAML 1.1 (e.g. `yes` is a bool and `010` is octal)
+    while ruamel.yaml, used for rule files so far, implements YAML 1.2.
+    The implicit resolvers below mirror the ruamel.yaml 1.2 ones so both
+    engines load the same data. Duplicate mapping keys are rejected, as
+    by ruamel.yaml, instead of the last value silently winning.
+    """
+
+    yaml_implicit_resolvers: Dict[Any, Any] = {}
+
+    def construct_mapping(self, node: Any, deep: bool = False) -> Dict[Any, Any]:
+        """Construct a mapping, raising on a duplicate key."""
+        if isinstance(node, MappingNode):
+            keys: Set[Any] = set()
+            for key_node, _ in node.value:
+                # Keys of merged mappings may be overridden
+                if key_node.tag == _MERGE_TAG:
+                    continue
+                key = self.construct_object(key_node, deep=deep)
+                if not isinstance(key, Hashable):
+                    continue
+                if key in keys:
+                    raise ConstructorError(
+                        "while constructing a mapping",
+                        node.start_mark,
+                        f"found duplicate key {key!r}",
+                        key_node.start_mark,
+                    )
+                keys.add(key)
+        return super().construct_mapping(node, deep=deep)  # type: ignore[no-any-return]
+
+
+def _construct_core_int(loader: CoreSchemaSafeLoader, node: ScalarNode) -> int:
+    """Construct a YAML 1.2 int, where a leading zero does not mean octal."""
+    value = str(loader.construct_scalar(node)).replace("_", "")
+    sign = 1
+    if value[0] in "+-":
+        sign = -1 if value[0] == "-" else 1
+        value = value[1:]
+    if value.startswith("0b"):
+        return sign * int(value[2:], 2)
+    if value.startswith("0x"):
+        return sign * int(value[2:], 16)
+    if value.startswith("0o"):
+        return sign * int(value[2:], 8)
+    return sign * int(value)
+
+
+CoreSchemaSafeLoader.add_implicit_resolver(
+    _BOOL_TAG,
+    re.compile(r"^(?:true|True|TRUE|false|False|FALSE)$"),
+    list("tTfF"),
+)
+CoreSchemaSafeLoader.add_implicit_resolver(
+    _FLOAT_TAG,
+    re.compile(
+        r"""^(?:
+         [-+]?(?:[0-9][0-9_]*)\.[0-9_]*(?:[eE][-+]?[0-9]+)?
+        |[-+]?(?:[0-9][0-9_]*)(?:[eE][-+]?[0-9]+)
+        |[-+]?\.[0-9_]+(?:[eE][-+][0-9]+)?
+        |[-+]?\.(?:inf|Inf|INF)
+        |\.(?:nan|NaN|NAN))$""",
+        re.X,
+    ),
+    list("-+0123456789."),
+)
+CoreSchemaSafeLoader.add_implicit_resolver(
+    _INT_TAG,
+    re.compile(
+        r"""^(?:[-+]?0b[0-1_]+
+        |[-+]?0o?[0-7_]+
+        |[-+]?[0-9_]+
+        |[-+]?0x[0-9a-fA-F_]+)$""",
+        re.X,
+    ),
+    list("-+0123456789"),
+)
+CoreSchemaSafeLoader.add_implicit_resolver(_MERGE_TAG, re.compile(r"^(?:<<)$"), ["<"])
+CoreSchemaSafeLoader.add_implicit_resolver(
+    _NULL_TAG,
+    re.compile(r"^(?: ~ |null|Null|NULL | )$", re.X),
+    ["~", "n", "N", ""],
+)
+CoreSchemaSafeLoader.add_implicit_resolver(
+    _TIMESTAMP_TAG,
+    re.compile(
+        r"""^(?:[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]
+        |[0-9][0-9][0-9][0-9] -[0-9][0-9]? -[0-9][0-9]?
+        (?:[Tt]|[ \t]+)[0-9][0-9]?
+        :[0-9][0-9] :[0-9][0-9] (?:\.[0-9]*)?
+        (?:[ \t]*(?:Z|[-+][0-9][0-9]?(?::[0-9][0-9])?))?)$""",
+        re.X,
+    ),
+    list("0123456789"),
+)
+CoreSchemaSafeLoader.add_constructor(_INT_TAG, _construct_core_int)
+
+
+def safe_load(stream: Union[str, bytes, IO[Any]]) -> Any:
+    """Load plain data from a YAML document, without comments or formatting."""
+    return yaml.load(stream, Loader=CoreSchemaSafeLoader)  # nosec B506
+
+
+_local = threading.local()
+
+
+def _safe_dumper() -> YAML:
+    """Return the ruamel.yaml safe dumper of the current thread."""
+    dumper: Optional[YAML] = getattr(_local, "safe_dumper", None)
+    if dumper is None:
+        dumper = YAML(typ="safe")
+        dumper.default_flow_style = False
+        _local.safe_dumper = dumper
+    return dumper
+
+
+def safe_dump(data: Any) -> str:
+    """Dump plain data to YAML text in block style with sorted keys."""
+    stream = io.StringIO()
+    _safe_dumper().dump(data, stream)
+    return stream.getvalue()
+
+
+def safe_dump_file(data: Any, file_path: pathlib.Path) -> None:
+    """Dump plain data to a YAML file in block style with sorted keys."""
+    with open(file_path, "w", encoding="utf-8") as yaml_file:
+        _safe_dumper().dump(data, yaml_file)
+
+
+def round_trip_loader() -> YAML:
+    """Return the ruamel.yaml round-trip loader of the current thread."""
+    loader: Optional[YAML] = getattr(_local, "round_trip_loader", None)
+    if loader is None:
+        loader = YAML()
+        loader.preserve_quotes = True
+        _local.round_trip_loader = loader
+    return loader
+
+
+def cac_round_trip_dumper() -> YAML:
+    """Return the ruamel.yaml dumper configured with the CaC content style."""
+    dumper: Optional[YAML] = getattr(_local, "cac_round_trip_dumper", None)
+    if dumper is None:
+        dumper = YAML()
+        # align with CaC content yaml file style
+        dumper.indent(mapping=4, sequence=6, offset=4)
+        dumper.explicit_start = True
+        # temp workaround to mitigate line length difference
+        # between CaC yamlfix and complyscribe ruamel.yaml
+        dumper.width = 110
+        _local.cac_round_trip_dumper = dumper
+    return dumper
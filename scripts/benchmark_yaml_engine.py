@@ -0,0 +1,154 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+import argparse
+import io
+import pathlib
+import sys
+import timeit
+from typing import Any, Callable, List
+
+from ruamel.yaml import YAML
+
+from complyscribe.yaml_engine import (
+    cac_round_trip_dumper,
+    round_trip_loader,
+    safe_dump,
+    safe_load,
+)
+
+"""
+Description:
+    Compare the shared YAML engines in complyscribe.yaml_engine with building a
+    new ruamel.yaml instance for every file, which is what complyscribe did before.
+
+    Rule files of a rules view are read-only consumers, they are loaded with the
+    libyaml backed safe loader. CaC control files need comments preserved, they are
+    loaded and dumped with the reused ruamel.yaml round-trip instances.
+How to use it:
+    python scripts/benchmark_yaml_engine.py --rules-dir <rules dir> --controls-dir <controls dir>
+    E.g., $python scripts/benchmark_yaml_engine.py --rules-dir rules --controls-dir ../content/controls
+"""
+
+_DEFAULT_DATA_DIR = pathlib.Path(__file__).parent.parent / "tests" / "data"
+
+
+def _print(*args: Any, **kwargs: Any) -> None:
+    """Wrap print to disable flake8 errors in one place"""
+    print(*args, **kwargs)  # noqa: T201
+
+
+def _legacy_rule_load(content: str) -> Any:
+    return YAML(typ="safe").load(content)
+
+
+def _legacy_rule_dump(data: Any) -> str:
+    yaml_obj = YAML(typ="safe")
+    yaml_obj.default_flow_style = False
+    stream = io.StringIO()
+    yaml_obj.dump(data, stream)
+    return stream.getvalue()
+
+
+def _legacy_control_round_trip(content: str) -> str:
+    loader = YAML()
+    loader.preserve_quotes = True
+    data = loader.load(content)
+    dumper = YAML()
+    dumper.indent(mapping=4, sequence=6, offset=4)
+    dumper.explicit_start = True
+    dumper.width = 110
+    stream = io.StringIO()
+    dumper.dump(data, stream)
+    return stream.getvalue()
+
+
+def _engine_control_round_trip(content: str) -> str:
+    data = round_trip_loader().load(content)
+    stream = io.StringIO()
+    cac_round_trip_dumper().dump(data, stream)
+    return stream.getvalue()
+
+
+def _read_all(directory: pathlib.Path, patterns: List[str]) -> List[str]:
+    contents = []
+    for pattern in patterns:
+        for file_path in sorted(directory.rglob(pattern)):
+            contents.append(file_path.read_text(encoding="utf-8"))
+    return contents
+
+
+def _bench(
+    name: str, func: Callable[[Any], Any], contents: List[Any], repeat: int
+) -> float:
+    timer = timeit.Timer(lambda: [func(content) for content in contents])
+    best = min(timer.repeat(repeat=repeat, number=1))
+    _print(f"{name:<40} {best * 1000:10.2f} ms")
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark complyscribe YAML engines")
+    parser.add_argument(
+        "--rules-dir",
+        type=pathlib.Path,
+        default=_DEFAULT_DATA_DIR / "yaml",
+        help="Directory with rule yaml files, searched recursively",
+    )
+    parser.add_argument(
+        "--controls-dir",
+        type=pathlib.Path,
+        default=_DEFAULT_DATA_DIR / "content_dir" / "controls",
+        help="Directory with CaC control files, searched recursively",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Number of timed rounds, best is kept"
+    )
+    args = parser.parse_args()
+
+    rules = _read_all(args.rules_dir, ["*.yaml", "*.yml"])
+    controls = _read_all(args.controls_dir, ["*.yml", "*.yaml"])
+    if not rules and not controls:
+        _print("No yaml files found")
+        return 1
+
+    if rules:
+        _print(f"Rule files: {len(rules)}")
+        rule_data = [_legacy_rule_load(content) for content in rules]
+        for data, content in zip(rule_data, rules):
+            if safe_load(content) != data:
+                _print("Loaded data differs between engines")
+                return 1
+        legacy = _bench(
+            "ruamel safe load, new instance", _legacy_rule_load, rules, args.repeat
+        )
+        engine = _bench("libyaml core schema load", safe_load, rules, args.repeat)
+        _print(f"{'speedup':<40} {legacy / engine:10.2f} x")
+        legacy = _bench(
+            "ruamel safe dump, new instance", _legacy_rule_dump, rule_data, args.repeat
+        )
+        engine = _bench(
+            "ruamel safe dump, reused instance", safe_dump, rule_data, args.repeat
+        )
+        _print(f"{'speedup':<40} {legacy / engine:10.2f} x")
+
+    if controls:
+        _print(f"Control files: {len(controls)}")
+        legacy = _bench(
+            "ruamel round trip, new instances",
+            _legacy_control_round_trip,
+            controls,
+            args.repeat,
+        )
+        engine = _bench(
+            "ruamel round trip, reused instances",
+            _engine_control_round_trip,
+            controls,
+            args.repeat,
+        )
+        _print(f"{'speedup':<40} {legacy / engine:10.2f} x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,14 +4,24 @@
 
 """Testing module for complyscribe autosync command"""
 
+import json
 import pathlib
-from typing import Tuple
+from typing import List, Tuple
+from unittest.mock import patch
 
 from click.testing import CliRunner
 from git import Repo
+from trestle.oscal.catalog import Catalog
+from trestle.oscal.profile import Profile
 
 from complyscribe.cli.commands.autosync import autosync_cmd
 from complyscribe.cli.config import ComplyScribeConfig, write_to_file
+from complyscribe.tasks.autosync_state import REGENERATE, AutosyncState
+from tests.testutils import load_from_json
+
+test_prof = "simplified_nist_profile"
+test_cat = "simplified_nist_catalog"
+test_md = "md_prof"
 
 
 def test_invalid_oscal_model(tmp_repo: Tuple[str, Repo]) -> None:
@@ -93,3 +103,50 @@ def test_missing_markdown_dir_option(tmp_repo: Tuple[str, Repo]) -> None:
     write_to_file(config_obj, filepath)
     result = runner.invoke(autosync_cmd, cmd_options)
     assert result.exit_code == 1
+
+
+def test_autosync_changed_since_then_incremental(tmp_repo: Tuple[str, Repo]) -> None:
+    """Test that models not selected by --changed-since are synced by a later run."""
+    repo_path_str, repo = tmp_repo
+    repo_path = pathlib.Path(repo_path_str)
+    load_from_json(repo_path, test_cat, test_cat, Catalog)
+    for name in ["prof_a", "prof_b"]:
+        load_from_json(repo_path, test_prof, name, Profile)
+    repo.git.add(all=True)
+    repo.index.commit("Add profiles")
+    base = repo.head.commit.hexsha
+
+    profile_path = repo_path / "profiles" / "prof_a" / "profile.json"
+    data = json.loads(profile_path.read_text())
+    data["profile"]["metadata"]["title"] = "Edited profile"
+    profile_path.write_text(json.dumps(data, indent=2))
+
+    cmd_options: List[str] = [
+        "--oscal-model",
+        "profile",
+        "--repo-path",
+        repo_path_str,
+        "--markdown-dir",
+        test_md,
+        "--skip-assemble",
+        "--branch",
+        "main",
+        "--committer-name",
+        "Test User",
+        "--committer-email",
+        "test@example.com",
+    ]
+    runner = CliRunner()
+    with patch("git.remote.Remote.push"):
+        result = runner.invoke(autosync_cmd, [*cmd_options, "--changed-since", base])
+        assert result.exit_code == 0
+        assert repo_path.joinpath(test_md, "prof_a").exists()
+        assert not repo_path.joinpath(test_md, "prof_b").exists()
+
+        # The unselected profile is not recorded as synced
+        state = AutosyncState(repo_path_str, "profile", test_md)
+        assert state.has_changed(REGENERATE, repo_path / "profiles" / "prof_b")
+
+        result = runner.invoke(autosync_cmd, cmd_options)
+        assert result.exit_code == 0
+        assert repo_path.joinpath(test_md, "prof_b").exists()
@@ -10,6 +10,7 @@ from typing import Tuple
 from click.testing import CliRunner
 from git import Repo
 
+from complyscribe.bot import ComplyScribe
 from complyscribe.cli.commands.rules_transform import rules_transform_cmd
 from tests.testutils import setup_for_compdef, setup_rules_view
 
@@ -27,6 +28,7 @@ def test_rules_transform(tmp_repo: Tuple[str, Repo]) -> None:
     setup_rules_view(repo_path, test_comp_name)
 
     assert not repo_path.joinpath(test_md).exists()
+    head = repo.head.commit.hexsha
 
     runner = CliRunner()
     result = runner.invoke(
@@ -48,5 +50,9 @@ def test_rules_transform(tmp_repo: Tuple[str, Repo]) -> None:
 
     assert result.exit_code == 0
     assert repo_path.joinpath(test_md).exists()
-    commit = next(repo.iter_commits())
-    assert len(commit.stats.files) == 9
+    # The dry run reports the changes without committing them
+    assert repo.head.commit.hexsha == head
+    changes = ComplyScribe._get_changed_files(repo, ["."])
+    # No intermediate CSV file is written
+    assert f"{test_comp_name}.csv [added]" not in changes
+    assert len(changes) == 8
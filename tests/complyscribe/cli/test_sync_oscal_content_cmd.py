@@ -4,10 +4,14 @@
 """Unit test for sync-cac-content command"""
 
 import json
+import logging
 import os.path
 import pathlib
+import re
 from typing import Tuple
+from unittest.mock import patch
 
+import pytest
 from click.testing import CliRunner
 from git import Repo
 from ruamel.yaml import YAML
@@ -22,6 +26,7 @@ from complyscribe.const import INVALID_ARGS_EXIT_CODE, SUCCESS_EXIT_CODE
 from complyscribe.utils import get_comments_from_yaml_data, to_literal_scalar_string
 from tests.testutils import (
     TEST_DATA_DIR,
+    configure_test_logger,
     setup_for_cac_content_dir,
     setup_for_catalog,
     setup_for_compdef,
@@ -67,26 +72,26 @@ def test_sync_oscal_cd_to_cac_control(
     setup_for_cac_content_dir(tmp_content_dir, test_content_dir)
 
     runner = CliRunner()
-    result = runner.invoke(
-        sync_oscal_cd_to_cac_content_cmd,
-        [
-            "--product",
-            test_product,
-            "--oscal-profile",
-            test_profile_name,
-            "--cac-content-root",
-            tmp_content_dir,
-            "--repo-path",
-            str(trestle_repo_path.resolve()),
-            "--committer-email",
-            "test@email.com",
-            "--committer-name",
-            "test name",
-            "--branch",
-            "test",
-            "--dry-run",
-        ],
-    )
+    with patch("git.remote.Remote.push"):
+        result = runner.invoke(
+            sync_oscal_cd_to_cac_content_cmd,
+            [
+                "--product",
+                test_product,
+                "--oscal-profile",
+                test_profile_name,
+                "--cac-content-root",
+                tmp_content_dir,
+                "--repo-path",
+                str(trestle_repo_path.resolve()),
+                "--committer-email",
+                "test@email.com",
+                "--committer-name",
+                "test name",
+                "--branch",
+                "test",
+            ],
+        )
 
     # Check the CLI sync-cac-content is successful
     assert result.exit_code == SUCCESS_EXIT_CODE, result.output
@@ -203,26 +208,26 @@ def test_sync_oscal_cd_statements(
 
     yaml.dump(data, control_file)
     runner = CliRunner()
-    result = runner.invoke(
-        sync_oscal_cd_to_cac_content_cmd,
-        [
-            "--product",
-            test_product,
-            "--oscal-profile",
-            test_profile_name,
-            "--cac-content-root",
-            tmp_content_dir,
-            "--repo-path",
-            str(trestle_repo_path.resolve()),
-            "--committer-email",
-            "test@email.com",
-            "--committer-name",
-            "test name",
-            "--branch",
-            "test",
-            "--dry-run",
-        ],
-    )
+    with patch("git.remote.Remote.push"):
+        result = runner.invoke(
+            sync_oscal_cd_to_cac_content_cmd,
+            [
+                "--product",
+                test_product,
+                "--oscal-profile",
+                test_profile_name,
+                "--cac-content-root",
+                tmp_content_dir,
+                "--repo-path",
+                str(trestle_repo_path.resolve()),
+                "--committer-email",
+                "test@email.com",
+                "--committer-name",
+                "test name",
+                "--branch",
+                "test",
+            ],
+        )
 
     # Check the CLI sync-cac-content is successful
     assert result.exit_code == SUCCESS_EXIT_CODE, result.output
@@ -259,6 +264,65 @@ def test_sync_oscal_cd_statements(
             assert not control.get("notes")
 
 
+def test_sync_oscal_cd_to_cac_control_dry_run(
+    tmp_repo: Tuple[str, Repo], tmp_init_dir: str, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Tests that a dry run logs the CaC content diffs without writing them."""
+    repo_dir, _ = tmp_repo
+    trestle_repo_path = pathlib.Path(repo_dir)
+    setup_for_compdef(
+        trestle_repo_path,
+        test_product,
+        test_product,
+        model_name=os.path.join(test_product, test_profile_name),
+    )
+    os.rename(
+        os.path.join(trestle_repo_path, "profiles", test_profile_name),
+        os.path.join(trestle_repo_path, "profiles", f"{test_product}-{test_policy_id}"),
+    )
+    tmp_content_dir = tmp_init_dir
+    setup_for_cac_content_dir(tmp_content_dir, test_content_dir)
+    content_repo = Repo(tmp_content_dir)
+    head = content_repo.head.commit.hexsha
+
+    runner = CliRunner()
+    with caplog.at_level(logging.INFO), patch(
+        "complyscribe.cli.log.configure_logger", configure_test_logger
+    ):
+        result = runner.invoke(
+            sync_oscal_cd_to_cac_content_cmd,
+            [
+                "--product",
+                test_product,
+                "--oscal-profile",
+                test_profile_name,
+                "--cac-content-root",
+                tmp_content_dir,
+                "--repo-path",
+                str(trestle_repo_path.resolve()),
+                "--committer-email",
+                "test@email.com",
+                "--committer-name",
+                "test name",
+                "--branch",
+                "test",
+                "--dry-run",
+            ],
+        )
+
+    assert result.exit_code == SUCCESS_EXIT_CODE, result.output
+    control_file_path = pathlib.Path(
+        tmp_content_dir, "controls", f"{test_policy_id}.yml"
+    ).resolve()
+    assert f"Dry run, changes for {control_file_path}:" in caplog.text
+    # The removed rule is logged as a removed line of the diff
+    assert re.search(r"^-\s+- file_groupownership_sshd_private_key$", caplog.text, re.M)
+    # The CaC content is left untouched
+    assert not content_repo.is_dirty(untracked_files=True)
+    assert content_repo.head.commit.hexsha == head
+    content_repo.close()
+
+
 def test_sync_oscal_profile_levels_low_to_high(
     tmp_repo: Tuple[str, Repo], tmp_init_dir: str
 ) -> None:
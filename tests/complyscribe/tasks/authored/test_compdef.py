@@ -16,7 +16,9 @@ from complyscribe.tasks.authored.base_authored import AuthoredObjectException
 from complyscribe.tasks.authored.compdef import (
     AuthoredComponentDefinition,
     FilterByProfile,
+    RulesViewBuilder,
 )
+from complyscribe.transformers.trestle_rule import ComponentInfo
 from complyscribe.transformers.yaml_transformer import ToRulesYAMLTransformer
 from tests import testutils
 
@@ -76,6 +78,29 @@ BASELINE"
     assert rule.profile.include_controls[0].id == "ac-5"
 
 
+def test_rules_view_builder_skips_unchanged(tmp_trestle_dir: str) -> None:
+    """Test that only rule files with changed content are written"""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    _ = testutils.setup_for_profile(trestle_root, test_prof, "")
+    profile_path = trestle_root / "profiles" / test_prof / "profile.json"
+    compdef_dir = trestle_root / RULES_VIEW_DIR / test_comp
+
+    builder = RulesViewBuilder(trestle_root)
+    builder.add_rules_for_profile(
+        profile_path, ComponentInfo(name="test", type="service", description="desc")
+    )
+    result = builder.write_to_yaml(compdef_dir, jobs=4)
+    assert (result.written, result.skipped) == (12, 0)
+
+    rule_path = compdef_dir / "test" / f"rule-ac-5{YAML_EXTENSION}"
+    written = rule_path.read_text()
+    rule_path.write_text("edited")
+
+    result = builder.write_to_yaml(compdef_dir, jobs=4)
+    assert (result.written, result.skipped) == (1, 11)
+    assert rule_path.read_text() == written
+
+
 def test_create_new_default_with_filter(tmp_trestle_dir: str) -> None:
     """Test creating new default component definition with filter"""
 
@@ -7,6 +7,7 @@
 import os
 import pathlib
 import shutil
+from unittest.mock import patch
 
 import pytest
 from trestle.common import const
@@ -14,6 +15,7 @@ from trestle.common.load_validate import load_validate_model_name
 from trestle.common.model_utils import ModelUtils
 from trestle.core.commands.author.ssp import SSPGenerate
 from trestle.core.models.file_content_type import FileContentType
+from trestle.core.profile_resolver import ProfileResolver
 from trestle.oscal import ssp as ossp
 
 from complyscribe.tasks.authored.base_authored import AuthoredObjectException
@@ -121,6 +123,47 @@ def test_regenerate_no_ssp_entry(tmp_trestle_dir: str) -> None:
         authored_ssp.regenerate(model_path, md_path)
 
 
+def test_regenerate_session(tmp_trestle_dir: str) -> None:
+    """Test regenerating SSPs sharing a profile and compdef in a session"""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    _ = testutils.setup_for_ssp(trestle_root, test_prof, [test_comp], markdown_dir)
+
+    ssp_index_path = os.path.join(tmp_trestle_dir, "ssp-index.json")
+    ssp_index: SSPIndex = SSPIndex(ssp_index_path)
+    ssp_names = ["ssp-a", "ssp-b"]
+    for ssp_name in ssp_names:
+        ssp_index.add_new_ssp(ssp_name, test_prof, [test_comp])
+    ssp_index.write_out()
+
+    authored_ssp = AuthoredSSP(tmp_trestle_dir, ssp_index)
+    authored_ssp.regenerate("ssp-a", "md_plain")
+
+    resolve = ProfileResolver.get_resolved_profile_catalog
+    with patch.object(
+        ProfileResolver,
+        "get_resolved_profile_catalog",
+        autospec=True,
+        side_effect=resolve,
+    ) as mock_resolve:
+        with authored_ssp.regeneration_session():
+            for ssp_name in ssp_names:
+                authored_ssp.regenerate(ssp_name, markdown_dir)
+        mock_resolve.assert_called_once()
+
+    plain_dir = trestle_root / "md_plain" / "ssp-a"
+    for ssp_name in ssp_names:
+        session_dir = trestle_root / markdown_dir / ssp_name
+        plain_files = sorted(p.relative_to(plain_dir) for p in plain_dir.rglob("*.md"))
+        session_files = sorted(
+            p.relative_to(session_dir) for p in session_dir.rglob("*.md")
+        )
+        assert plain_files == session_files
+        for md_file in plain_files:
+            assert (plain_dir / md_file).read_text() == (
+                session_dir / md_file
+            ).read_text()
+
+
 # SSPIndex tests
 
 
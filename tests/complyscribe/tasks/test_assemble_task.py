@@ -30,6 +30,7 @@ from complyscribe.tasks.authored.compdef import AuthoredComponentDefinition
 from complyscribe.tasks.authored.profile import AuthoredProfile
 from complyscribe.tasks.authored.ssp import AuthoredSSP, SSPIndex
 from complyscribe.tasks.base_task import ModelFilter, TaskException
+from complyscribe.tasks.journal import WriteJournal
 from tests import testutils
 
 test_prof = "simplified_nist_profile"
@@ -67,6 +68,36 @@ def test_assemble_task_isolated(tmp_trestle_dir: str) -> None:
         )
 
 
+def test_assemble_task_records_writes(tmp_trestle_dir: str) -> None:
+    """Test the assemble task records the model directories in the journal"""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    md_path = os.path.join(cat_md_dir, test_cat)
+    args = testutils.setup_for_catalog(trestle_root, test_cat, md_path)
+    cat_generate = CatalogGenerate()
+    assert cat_generate._run(args) == 0
+
+    mock = Mock(spec=AuthoredObjectBase)
+    mock.get_trestle_root.return_value = tmp_trestle_dir
+    assemble_task = AssembleTask(mock, cat_md_dir, "1.0.0")
+    assemble_task.journal = WriteJournal()
+
+    with patch(
+        "complyscribe.tasks.authored.types.get_trestle_model_dir"
+    ) as mock_get_trestle_model_dir:
+        mock_get_trestle_model_dir.return_value = "catalogs"
+        assert assemble_task.execute() == 0
+
+    assert assemble_task.journal.is_complete
+    assert assemble_task.journal.paths == [
+        os.path.join(os.path.abspath(tmp_trestle_dir), "catalogs", test_cat)
+    ]
+
+    # Without a known model directory, the writes cannot be listed
+    assemble_task.journal = WriteJournal()
+    assert assemble_task.execute() == 0
+    assert not assemble_task.journal.is_complete
+
+
 def test_assemble_task_with_authored_object_failure(tmp_trestle_dir: str) -> None:
     """Test the assemble task with failing AuthoredObject implementation"""
     trestle_root = pathlib.Path(tmp_trestle_dir)
@@ -132,6 +163,59 @@ def test_assemble_task_with_skip(tmp_trestle_dir: str, skip_list: List[str]) ->
         mock.assemble.assert_not_called()
 
 
+def test_assemble_task_reports_all_failures(tmp_trestle_dir: str) -> None:
+    """Test that assemble failures of every model are reported together"""
+    for model in ["model_a", "model_b"]:
+        os.makedirs(os.path.join(tmp_trestle_dir, cat_md_dir, model))
+
+    mock = Mock(spec=AuthoredObjectBase)
+    mock.get_trestle_root.return_value = tmp_trestle_dir
+    mock.assemble.side_effect = AuthoredObjectException("Test exception")
+    assemble_task = AssembleTask(mock, cat_md_dir, "1.0.0")
+
+    with pytest.raises(TaskException) as exc_info:
+        assemble_task.execute()
+
+    assert mock.assemble.call_count == 2
+    assert f"{os.path.join(cat_md_dir, 'model_a')}: Test exception" in str(
+        exc_info.value
+    )
+    assert f"{os.path.join(cat_md_dir, 'model_b')}: Test exception" in str(
+        exc_info.value
+    )
+
+
+def test_catalog_assemble_task_with_jobs(tmp_trestle_dir: str) -> None:
+    """Test catalog assemble of several models in a process pool"""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    catalogs = [test_cat, "other_nist_catalog"]
+    orig_times = {}
+    for catalog_name in catalogs:
+        md_path = os.path.join(cat_md_dir, catalog_name)
+        args = testutils.setup_for_catalog(
+            trestle_root, test_cat, md_path, model_name=catalog_name
+        )
+        args.name = catalog_name
+        cat_generate = CatalogGenerate()
+        assert cat_generate._run(args) == 0
+
+        cat, _ = ModelUtils.load_model_for_class(
+            trestle_root, catalog_name, oscal_cat.Catalog, FileContentType.JSON
+        )
+        orig_times[catalog_name] = cat.metadata.last_modified
+
+    catalog = AuthoredCatalog(tmp_trestle_dir)
+    assemble_task = AssembleTask(catalog, cat_md_dir, jobs=2)
+
+    assert assemble_task.execute() == 0
+
+    for catalog_name in catalogs:
+        cat, _ = ModelUtils.load_model_for_class(
+            trestle_root, catalog_name, oscal_cat.Catalog, FileContentType.JSON
+        )
+        assert orig_times[catalog_name] != cat.metadata.last_modified
+
+
 def test_catalog_assemble_task(tmp_trestle_dir: str) -> None:
     """Test catalog assemble at the task level"""
     trestle_root = pathlib.Path(tmp_trestle_dir)
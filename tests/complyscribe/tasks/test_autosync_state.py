@@ -0,0 +1,155 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Test for autosync content-hash change detection"""
+
+import json
+import pathlib
+from typing import List
+
+from complyscribe.tasks.autosync_state import (
+    ASSEMBLE,
+    REGENERATE,
+    AutosyncState,
+    ChangedModelFilter,
+    RecordAutosyncStateTask,
+)
+from complyscribe.tasks.base_task import ModelFilter
+
+md_dir = "md_prof"
+
+
+def _write(path: pathlib.Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+def test_changed_model_filter(tmp_trestle_dir: str) -> None:
+    """Test that only models with changed inputs pass the filter"""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    for name in ["prof_a", "prof_b"]:
+        _write(trestle_root / md_dir / name / "ac-1.md", f"{name} markdown")
+        _write(trestle_root / "profiles" / name / "profile.json", f"{name} json")
+
+    state = AutosyncState(tmp_trestle_dir, "profile", md_dir)
+    assemble_filter = ChangedModelFilter(ModelFilter([], ["*"]), state, ASSEMBLE)
+    prof_a = trestle_root / md_dir / "prof_a"
+    prof_b = trestle_root / md_dir / "prof_b"
+
+    # Without a recorded state every model is processed
+    assert not assemble_filter.is_skipped(prof_a)
+    assert not assemble_filter.is_skipped(prof_b)
+
+    RecordAutosyncStateTask(
+        state,
+        {ASSEMBLE: trestle_root / md_dir, REGENERATE: trestle_root / "profiles"},
+        tmp_trestle_dir,
+    ).execute()
+    assert state.state_path.exists()
+
+    state = AutosyncState(tmp_trestle_dir, "profile", md_dir)
+    assemble_filter = ChangedModelFilter(ModelFilter([], ["*"]), state, ASSEMBLE)
+    assert assemble_filter.is_skipped(prof_a)
+    assert assemble_filter.is_skipped(prof_b)
+
+    _write(prof_a / "ac-1.md", "prof_a edited")
+    assert not assemble_filter.is_skipped(prof_a)
+    assert assemble_filter.is_skipped(prof_b)
+
+    # A change in a model the profiles depend on affects all profiles
+    _write(trestle_root / "catalogs" / "cat" / "catalog.json", "catalog")
+    state = AutosyncState(tmp_trestle_dir, "profile", md_dir)
+    regenerate_filter = ChangedModelFilter(ModelFilter([], ["*"]), state, REGENERATE)
+    assert not regenerate_filter.is_skipped(trestle_root / "profiles" / "prof_b")
+
+    # Skip patterns still apply
+    skip_filter = ChangedModelFilter(ModelFilter(["prof_a"], ["*"]), state, ASSEMBLE)
+    assert skip_filter.is_skipped(prof_a)
+    assert ModelFilter.is_skipped(skip_filter, prof_a)
+    assert not ModelFilter.is_skipped(skip_filter, prof_b)
+
+
+def test_autosync_state_scope_and_version(tmp_trestle_dir: str) -> None:
+    """Test that the state is scoped per model type and ignored on version mismatch"""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    model_path = trestle_root / md_dir / "prof_a"
+    _write(model_path / "ac-1.md", "markdown")
+
+    state = AutosyncState(tmp_trestle_dir, "profile", md_dir)
+    state.record(ASSEMBLE, [model_path])
+    state.write()
+
+    assert not AutosyncState(tmp_trestle_dir, "profile", md_dir).has_changed(
+        ASSEMBLE, model_path
+    )
+    assert AutosyncState(tmp_trestle_dir, "catalog", md_dir).has_changed(
+        ASSEMBLE, model_path
+    )
+
+    data = json.loads(state.state_path.read_text())
+    data["version"] = 0
+    state.state_path.write_text(json.dumps(data))
+    assert AutosyncState(tmp_trestle_dir, "profile", md_dir).has_changed(
+        ASSEMBLE, model_path
+    )
+
+
+def _write_profile(trestle_root: pathlib.Path, name: str, imports: List[str]) -> None:
+    profile = {
+        "profile": {
+            "metadata": {"title": name},
+            "imports": [{"href": f"trestle://{href}"} for href in imports],
+        }
+    }
+    _write(trestle_root / "profiles" / name / "profile.json", json.dumps(profile))
+
+
+def test_profile_upstream_is_its_imports(tmp_trestle_dir: str) -> None:
+    """Test that a profile only depends on the models it imports"""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    _write(trestle_root / "catalogs" / "cat_a" / "catalog.json", "catalog a")
+    _write(trestle_root / "catalogs" / "cat_b" / "catalog.json", "catalog b")
+    _write_profile(trestle_root, "base", ["catalogs/cat_a/catalog.json"])
+    _write_profile(trestle_root, "prof_a", ["profiles/base/profile.json"])
+    _write_profile(trestle_root, "prof_b", ["catalogs/cat_b/catalog.json"])
+    profiles = {
+        name: trestle_root / "profiles" / name for name in ["base", "prof_a", "prof_b"]
+    }
+
+    def changed() -> List[str]:
+        state = AutosyncState(tmp_trestle_dir, "profile", md_dir)
+        return [
+            name
+            for name, path in profiles.items()
+            if state.has_changed(REGENERATE, path)
+        ]
+
+    state = AutosyncState(tmp_trestle_dir, "profile", md_dir)
+    state.record(REGENERATE, list(profiles.values()))
+    state.write()
+    assert changed() == []
+
+    # Editing a profile does not affect unrelated profiles
+    _write_profile(trestle_root, "prof_b", ["catalogs/cat_b/catalog.json", "x"])
+    assert changed() == ["prof_b"]
+
+    # Imports are followed through imported profiles
+    state = AutosyncState(tmp_trestle_dir, "profile", md_dir)
+    state.record(REGENERATE, list(profiles.values()))
+    state.write()
+    _write(trestle_root / "catalogs" / "cat_a" / "catalog.json", "catalog a edited")
+    assert changed() == ["base", "prof_a"]
+
+
+def test_record_autosync_state_dry_run(tmp_trestle_dir: str) -> None:
+    """Test that a dry run does not write the state file"""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    _write(trestle_root / md_dir / "prof_a" / "ac-1.md", "markdown")
+    state = AutosyncState(tmp_trestle_dir, "profile", md_dir)
+
+    RecordAutosyncStateTask(
+        state, {ASSEMBLE: trestle_root / md_dir}, tmp_trestle_dir, dry_run=True
+    ).execute()
+
+    assert not state.state_path.exists()
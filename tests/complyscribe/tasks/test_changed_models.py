@@ -0,0 +1,118 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Test for selecting models changed since a git reference"""
+
+import json
+import pathlib
+from typing import Tuple
+
+import pytest
+from git import Repo
+from trestle.oscal.catalog import Catalog
+from trestle.oscal.component import ComponentDefinition
+from trestle.oscal.profile import Profile
+
+from complyscribe.tasks.authored.ssp import SSPIndex
+from complyscribe.tasks.base_task import ModelFilter, TaskException
+from complyscribe.tasks.changed_models import ChangedModels, get_changed_files
+from tests import testutils
+
+test_cat = "simplified_nist_catalog"
+test_prof = "simplified_nist_profile"
+test_comp = "test_comp"
+
+
+def test_get_changed_files(tmp_repo: Tuple[str, Repo]) -> None:
+    """Test listing committed, uncommitted and untracked changes"""
+    repo_path, repo = tmp_repo
+    base = repo.head.commit.hexsha
+
+    testutils.load_from_json(pathlib.Path(repo_path), test_cat, test_cat, Catalog)
+    repo.git.add(all=True)
+    repo.index.commit("Add catalog")
+    untracked = pathlib.Path(repo_path, "md_cat", test_cat, "ac-1.md")
+    untracked.parent.mkdir(parents=True)
+    untracked.write_text("control")
+
+    assert get_changed_files(repo_path, base) == [
+        f"catalogs/{test_cat}/catalog.json",
+        f"md_cat/{test_cat}/ac-1.md",
+    ]
+    assert get_changed_files(repo_path, "HEAD") == [f"md_cat/{test_cat}/ac-1.md"]
+
+    with pytest.raises(TaskException, match="Failed to list files changed since"):
+        get_changed_files(repo_path, "not-a-ref")
+
+
+def test_changed_models_dependents(tmp_trestle_dir: str) -> None:
+    """Test that models depending on a changed catalog are selected"""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    testutils.load_from_json(trestle_root, test_cat, test_cat, Catalog)
+    testutils.load_from_json(trestle_root, test_prof, test_prof, Profile)
+    testutils.load_from_json(trestle_root, test_comp, test_comp, ComponentDefinition)
+    other_comp = trestle_root / "component-definitions" / "other_comp"
+    other_comp.mkdir(parents=True)
+    other_comp.joinpath("component-definition.json").write_text(
+        json.dumps(
+            {
+                "component-definition": {
+                    "components": [
+                        {
+                            "control-implementations": [
+                                {"source": "trestle://profiles/other/profile.json"}
+                            ]
+                        }
+                    ]
+                }
+            }
+        )
+    )
+    ssp_index = SSPIndex(str(trestle_root / "ssp-index.json"))
+    ssp_index.add_new_ssp("my-ssp", test_prof, [test_comp])
+    ssp_index.add_new_ssp("other-ssp", "other_profile", ["other_comp"])
+    ssp_index.write_out()
+
+    changes = ChangedModels(
+        tmp_trestle_dir, [f"catalogs/{test_cat}/catalog.json", "README.md"]
+    )
+    changes.add_dependents("ssp-index.json")
+
+    assert changes.models("catalogs") == {test_cat}
+    assert changes.models("profiles") == {test_prof}
+    assert changes.models("component-definitions") == {test_comp}
+    assert changes.models("system-security-plans") == {"my-ssp"}
+
+    # A changed index selects all of its SSPs
+    changes = ChangedModels(tmp_trestle_dir, ["ssp-index.json"])
+    changes.add_dependents("ssp-index.json")
+    assert changes.models("system-security-plans") == {"my-ssp", "other-ssp"}
+
+
+def test_selected_model_filter(tmp_trestle_dir: str) -> None:
+    """Test that only selected models directly under the search paths pass"""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    rules_view = trestle_root / "rules"
+    for compdef in ["comp_a", "comp_b"]:
+        (rules_view / compdef / "component").mkdir(parents=True)
+
+    changes = ChangedModels(
+        tmp_trestle_dir, ["rules/comp_a/component/rule.yaml", "md_comp/comp_x/a.md"]
+    )
+    changes.add_from_dir("rules", "component-definitions")
+    changes.add_from_dir("md_comp", "component-definitions")
+    assert changes.models("component-definitions") == {"comp_a", "comp_x"}
+
+    model_filter = changes.select(
+        ModelFilter(["comp_x"], ["*"]), {rules_view: "component-definitions"}
+    )
+    assert not model_filter.is_skipped(rules_view / "comp_a")
+    assert model_filter.is_skipped(rules_view / "comp_b")
+    # nested paths are only filtered by the wrapped filter
+    assert not model_filter.is_skipped(rules_view / "comp_b" / "component")
+    assert model_filter.is_skipped(rules_view / "comp_x")
+    # the patterns of the wrapped filter are inherited
+    assert ModelFilter.is_skipped(model_filter, rules_view / "comp_x")
+    assert not ModelFilter.is_skipped(model_filter, rules_view / "comp_b")
+    assert ModelFilter.is_skipped(model_filter, rules_view / ".keep")
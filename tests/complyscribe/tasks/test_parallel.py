@@ -0,0 +1,59 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Test for running per-model work in a process pool"""
+
+import logging
+from typing import List
+
+import pytest
+
+from complyscribe.tasks.parallel import format_failures, run_for_models
+
+logger = logging.getLogger("complyscribe.tests.parallel")
+
+
+def _work(model: str) -> None:
+    """Log a few lines and fail for models starting with bad."""
+    for step in range(3):
+        logger.info(f"{model} step {step}")
+    if model.startswith("bad"):
+        raise ValueError(f"{model} failed")
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_run_for_models(jobs: int) -> None:
+    """Test results and logs are returned in model order"""
+    handler = _ListHandler()
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    models = ["model_a", "bad_model", "model_c"]
+
+    try:
+        results = run_for_models(_work, models, jobs, (ValueError,))
+    finally:
+        logger.removeHandler(handler)
+
+    assert [result.model for result in results] == models
+    assert [result.error for result in results] == [None, "bad_model failed", None]
+    assert format_failures(results) == "bad_model: bad_model failed"
+
+    assert handler.messages == [
+        f"{model} step {step}" for model in models for step in range(3)
+    ]
+
+
+def test_run_for_models_unhandled_error() -> None:
+    """Test that errors which are not handled are raised"""
+    with pytest.raises(ValueError, match="bad_model failed"):
+        run_for_models(_work, ["bad_model", "model_b"], 2, (KeyError,))
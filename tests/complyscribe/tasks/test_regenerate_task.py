@@ -8,10 +8,11 @@ import argparse
 import os
 import pathlib
 from typing import List
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 from trestle.core.commands.author.ssp import SSPAssemble, SSPGenerate
+from trestle.oscal.profile import Profile
 
 from complyscribe.tasks.authored.base_authored import (
     AuthoredObjectBase,
@@ -42,7 +43,7 @@ def test_regenerate_task_isolated(tmp_trestle_dir: str) -> None:
     md_path = os.path.join(cat_md_dir, test_cat)
     _ = testutils.setup_for_catalog(trestle_root, test_cat, md_path)
 
-    mock = Mock(spec=AuthoredObjectBase)
+    mock = MagicMock(spec=AuthoredObjectBase)
     mock.get_trestle_root.return_value = tmp_trestle_dir
     regenerate_task = RegenerateTask(mock, cat_md_dir)
 
@@ -64,7 +65,7 @@ def test_regenerate_task_with_authored_object_failure(tmp_trestle_dir: str) -> N
     md_path = os.path.join(cat_md_dir, test_cat)
     _ = testutils.setup_for_catalog(trestle_root, test_cat, md_path)
 
-    mock = Mock(spec=AuthoredObjectBase)
+    mock = MagicMock(spec=AuthoredObjectBase)
     mock.get_trestle_root.return_value = tmp_trestle_dir
     mock.regenerate.side_effect = AuthoredObjectException("Test exception")
     regenerate_task = RegenerateTask(mock, cat_md_dir)
@@ -77,6 +78,28 @@ def test_regenerate_task_with_authored_object_failure(tmp_trestle_dir: str) -> N
             regenerate_task.execute()
 
 
+def test_regenerate_task_reports_all_failures(tmp_trestle_dir: str) -> None:
+    """Test that regenerate failures of every model are reported together"""
+    for model in ["model_a", "model_b"]:
+        os.makedirs(os.path.join(tmp_trestle_dir, "catalogs", model))
+
+    mock = MagicMock(spec=AuthoredObjectBase)
+    mock.get_trestle_root.return_value = tmp_trestle_dir
+    mock.regenerate.side_effect = AuthoredObjectException("Test exception")
+    regenerate_task = RegenerateTask(mock, cat_md_dir)
+
+    with patch(
+        "complyscribe.tasks.authored.types.get_trestle_model_dir"
+    ) as mock_get_trestle_model_dir:
+        mock_get_trestle_model_dir.return_value = "catalogs"
+        with pytest.raises(TaskException) as exc_info:
+            regenerate_task.execute()
+
+    assert mock.regenerate.call_count == 2
+    assert "catalogs/model_a: Test exception" in str(exc_info.value)
+    assert "catalogs/model_b: Test exception" in str(exc_info.value)
+
+
 @pytest.mark.parametrize(
     "skip_list",
     [
@@ -92,7 +115,7 @@ def test_regenerate_task_with_skip(tmp_trestle_dir: str, skip_list: List[str]) -
     md_path = os.path.join(cat_md_dir, test_cat)
     _ = testutils.setup_for_catalog(trestle_root, test_cat, md_path)
 
-    mock = Mock(spec=AuthoredObjectBase)
+    mock = MagicMock(spec=AuthoredObjectBase)
     mock.get_trestle_root.return_value = tmp_trestle_dir
     model_filter = ModelFilter(skip_list, ["*"])
     regenerate_task = RegenerateTask(
@@ -135,6 +158,21 @@ def test_profile_regenerate_task(tmp_trestle_dir: str) -> None:
     assert os.path.exists(os.path.join(tmp_trestle_dir, md_path))
 
 
+def test_profile_regenerate_task_with_jobs(tmp_trestle_dir: str) -> None:
+    """Test regenerate of profiles sharing resolved catalogs in a process pool"""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    _ = testutils.setup_for_profile(trestle_root, test_prof, "")
+    other_prof = "other_nist_profile"
+    testutils.load_from_json(trestle_root, test_prof, other_prof, Profile)
+
+    profile = AuthoredProfile(tmp_trestle_dir)
+    regenerate_task = RegenerateTask(profile, prof_md_dir, jobs=2)
+
+    assert regenerate_task.execute() == 0
+    for prof_name in [test_prof, other_prof]:
+        assert os.path.exists(os.path.join(tmp_trestle_dir, prof_md_dir, prof_name))
+
+
 def test_compdef_regenerate_task(tmp_trestle_dir: str) -> None:
     """Test compdef regenerate at the task level"""
     trestle_root = pathlib.Path(tmp_trestle_dir)
@@ -0,0 +1,60 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Test for the resolved profile catalog cache"""
+
+import pathlib
+from typing import Any, Tuple
+from unittest.mock import patch
+
+from trestle.core.profile_resolver import ProfileResolver
+from trestle.oscal.profile import Profile
+
+from complyscribe.tasks.resolution_cache import ResolvedProfileCache
+from tests import testutils
+
+test_prof = "simplified_nist_profile"
+
+
+def test_resolved_profile_cache(tmp_trestle_dir: str, tmp_path: pathlib.Path) -> None:
+    """Test that a profile is resolved once and read back from the cache"""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    args = testutils.setup_for_profile(trestle_root, test_prof, "")
+    other_path = testutils.load_from_json(
+        trestle_root, test_prof, "other_nist_profile", Profile
+    )
+
+    resolve = ProfileResolver.get_resolved_profile_catalog_and_inherited_props
+    _, expected_props = resolve(trestle_root, str(args.profile_path))
+
+    with patch.object(
+        ProfileResolver,
+        "get_resolved_profile_catalog_and_inherited_props",
+        autospec=True,
+        side_effect=resolve,
+    ) as mock_resolve:
+        cache = ResolvedProfileCache(tmp_path / "cache")
+        with cache.activate():
+            results = [
+                ProfileResolver.get_resolved_profile_catalog_and_inherited_props(
+                    trestle_root, str(args.profile_path)
+                ),
+                ProfileResolver.get_resolved_profile_catalog(
+                    trestle_root, str(args.profile_path)
+                ),
+                ProfileResolver.get_resolved_profile_catalog_and_inherited_props(
+                    trestle_root, str(other_path)
+                ),
+            ]
+        assert mock_resolve.call_count == 2
+        # the uncached resolution is restored outside of the context
+        assert (
+            ProfileResolver.get_resolved_profile_catalog_and_inherited_props
+            is mock_resolve
+        )
+
+    first: Tuple[Any, Any] = results[0]  # type: ignore[assignment]
+    assert first[1] == expected_props
+    # the second resolution is read back from the cache
+    assert results[1].oscal_serialize_json() == first[0].oscal_serialize_json()
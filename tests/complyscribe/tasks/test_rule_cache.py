@@ -0,0 +1,113 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Test for the rules-transform rule cache"""
+
+import json
+import pathlib
+from unittest.mock import patch
+
+import complyscribe.tasks.rule_transform_task as rule_transform_task
+from complyscribe.tasks.rule_cache import RuleCache
+from complyscribe.tasks.rule_transform_task import RuleTransformTask
+from complyscribe.transformers.trestle_rule import (
+    Check,
+    Parameter,
+    TrestleRule,
+    get_default_rule,
+)
+from complyscribe.transformers.yaml_transformer import ToRulesYAMLTransformer
+from tests.testutils import setup_rules_view
+
+test_comp = "test_comp"
+test_rules_dir = "test_rules_dir"
+
+
+def _run(tmp_trestle_dir: str) -> int:
+    """Run the transform with the cache and return the number of validated files"""
+    with patch.object(
+        rule_transform_task, "_load_rule", wraps=rule_transform_task._load_rule
+    ) as load_rule:
+        RuleTransformTask(
+            tmp_trestle_dir,
+            test_rules_dir,
+            ToRulesYAMLTransformer(),
+            rule_cache=RuleCache(tmp_trestle_dir),
+        ).execute()
+    return load_rule.call_count
+
+
+def test_rule_cache(tmp_trestle_dir: str) -> None:
+    """Test that only changed rule files are validated and unchanged compdefs skipped"""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    setup_rules_view(trestle_root, test_comp, test_rules_dir)
+    compdef_path = trestle_root.joinpath(
+        "component-definitions", test_comp, "component-definition.json"
+    )
+
+    assert _run(tmp_trestle_dir) == 3
+    cache = RuleCache(tmp_trestle_dir)
+    assert cache.cache_path.exists()
+    assert cache.cache_path.parent.joinpath(".gitignore").read_text() == "*\n"
+    written = compdef_path.read_text()
+
+    # Nothing changed, the component definition is not written again
+    assert _run(tmp_trestle_dir) == 0
+    assert compdef_path.read_text() == written
+
+    # A changed output is rebuilt from the cached rules
+    compdef_path.write_text(written.replace("Component 1", "Edited"))
+    assert _run(tmp_trestle_dir) == 0
+    assert "Edited" not in compdef_path.read_text()
+
+    # Only the changed rule file is validated again
+    rule_path = next(
+        trestle_root.joinpath(test_rules_dir, test_comp, "test_comp").glob(
+            "*no_params*"
+        )
+    )
+    rule_path.write_text(
+        rule_path.read_text().replace(
+            "My rule description for example rule 2", "Changed description"
+        )
+    )
+    assert _run(tmp_trestle_dir) == 1
+    assert "Changed description" in compdef_path.read_text()
+
+
+def test_rule_cache_version(tmp_trestle_dir: str) -> None:
+    """Test that a cache written by another version is ignored"""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    setup_rules_view(trestle_root, test_comp, test_rules_dir)
+    assert _run(tmp_trestle_dir) == 3
+
+    cache_path = RuleCache(tmp_trestle_dir).cache_path
+    data = json.loads(cache_path.read_text())
+    data["complyscribe"] = "0.0.0"
+    cache_path.write_text(json.dumps(data))
+    assert _run(tmp_trestle_dir) == 3
+
+
+def test_rule_cache_hit_skips_validation(tmp_trestle_dir: str) -> None:
+    """Test that a cached rule is rebuilt without validating it again"""
+    rule_path = pathlib.Path(tmp_trestle_dir, "rule.yaml")
+    rule_path.touch()
+    rule = get_default_rule()
+    rule.check = Check(name="check", description="check description")
+    rule.parameter = Parameter(
+        name="param",
+        description="param description",
+        alternative_values={"default": "5", "high": "10"},
+        default_value="5",
+    )
+    cache = RuleCache(tmp_trestle_dir)
+    cache.put(rule_path, "hash", rule)
+    cache.write()
+
+    cache = RuleCache(tmp_trestle_dir)
+    with patch.object(TrestleRule, "__pydantic_validator__") as validator:
+        cached = cache.get(rule_path, "hash")
+        assert cache.get(rule_path, "other") is None
+    validator.validate_python.assert_not_called()
+    assert cached == rule
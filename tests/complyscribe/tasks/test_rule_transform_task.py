@@ -4,7 +4,10 @@
 
 """Test for Trestle Bot rule transform task."""
 
+import json
 import pathlib
+from typing import Any
+from unittest.mock import patch
 
 import pytest
 import trestle.oscal.component as osc_comp
@@ -72,6 +75,45 @@ def test_rule_transform_task(tmp_trestle_dir: str) -> None:
     assert "My check description" in prop_values
 
 
+def _without_generated_values(data: Any) -> Any:
+    """Drop the uuids and timestamps that differ between runs."""
+    if isinstance(data, dict):
+        return {
+            key: _without_generated_values(value)
+            for key, value in data.items()
+            if key not in ("uuid", "last-modified")
+        }
+    if isinstance(data, list):
+        return [_without_generated_values(value) for value in data]
+    return data
+
+
+def test_rule_transform_task_matches_csv_compatibility(tmp_trestle_dir: str) -> None:
+    """Test that the in-memory component definition matches the CSV based one."""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    setup_rules_view(trestle_root, test_comp, test_rules_dir)
+    transformer = ToRulesYAMLTransformer()
+    compdef_path = trestle_root.joinpath(
+        "component-definitions", test_comp, "component-definition.json"
+    )
+
+    # The process working directory is not changed
+    with patch("os.chdir", side_effect=AssertionError("chdir called")):
+        RuleTransformTask(
+            tmp_trestle_dir, test_rules_dir, transformer, csv_compatibility=True
+        ).execute()
+    assert trestle_root.joinpath(f"{test_comp}.csv").exists()
+    from_csv = json.loads(compdef_path.read_text())
+    compdef_path.unlink()
+    trestle_root.joinpath(f"{test_comp}.csv").unlink()
+
+    RuleTransformTask(tmp_trestle_dir, test_rules_dir, transformer).execute()
+    assert not trestle_root.joinpath(f"{test_comp}.csv").exists()
+    in_memory = json.loads(compdef_path.read_text())
+
+    assert _without_generated_values(in_memory) == _without_generated_values(from_csv)
+
+
 def test_rule_transform_task_with_no_rules(tmp_trestle_dir: str) -> None:
     """Test rule transform task with no rules."""
     trestle_root = pathlib.Path(tmp_trestle_dir)
@@ -100,6 +142,66 @@ def test_rule_transform_task_with_invalid_rule(tmp_trestle_dir: str) -> None:
         rule_transform_task.execute()
 
 
+def test_rule_transform_task_with_jobs(tmp_trestle_dir: str) -> None:
+    """Test that rules validated in workers give the same component definition."""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    setup_rules_view(trestle_root, test_comp, test_rules_dir)
+    transformer = ToRulesYAMLTransformer()
+    compdef_path = trestle_root.joinpath(
+        "component-definitions", test_comp, "component-definition.json"
+    )
+
+    RuleTransformTask(tmp_trestle_dir, test_rules_dir, transformer).execute()
+    sequential = json.loads(compdef_path.read_text())
+
+    RuleTransformTask(tmp_trestle_dir, test_rules_dir, transformer, jobs=2).execute()
+    parallel = json.loads(compdef_path.read_text())
+
+    assert _without_generated_values(parallel) == _without_generated_values(sequential)
+
+
+def test_rule_transform_task_reports_sorted_errors(tmp_trestle_dir: str) -> None:
+    """Test that all rule errors are reported in sorted order with jobs."""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    setup_rules_view(trestle_root, test_comp, test_rules_dir)
+    comp_dir = trestle_root.joinpath(test_rules_dir, test_comp, "test_comp")
+    for name in ["b_invalid", "a_invalid"]:
+        comp_dir.joinpath(f"{name}.yaml").write_text("x-trestle-rule-info: {}\n")
+    transformer = ToRulesYAMLTransformer()
+    rule_transform_task = RuleTransformTask(
+        tmp_trestle_dir, test_rules_dir, transformer, jobs=2
+    )
+
+    with pytest.raises(TaskException) as e:
+        rule_transform_task.execute()
+    message = str(e.value)
+    assert message.index("a_invalid.yaml") < message.index("b_invalid.yaml")
+
+
+def test_rule_transform_task_concurrent_compdefs(tmp_trestle_dir: str) -> None:
+    """Test transforming several component definitions concurrently."""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    for name in ["comp_a", "comp_b"]:
+        setup_rules_view(trestle_root, name, test_rules_dir)
+    setup_rules_view(trestle_root, "broken_a", test_rules_dir, incomplete_rule=True)
+    setup_rules_view(trestle_root, "broken_b", test_rules_dir, incomplete_rule=True)
+    transformer = ToRulesYAMLTransformer()
+    rule_transform_task = RuleTransformTask(
+        tmp_trestle_dir, test_rules_dir, transformer, jobs=4
+    )
+
+    with pytest.raises(TaskException) as e:
+        rule_transform_task.execute()
+    assert "broken_a: Failed to transform rules" in str(e.value)
+    assert "broken_b: Failed to transform rules" in str(e.value)
+
+    for name in ["comp_a", "comp_b"]:
+        compdef, _ = ModelUtils.load_model_for_class(
+            trestle_root, name, osc_comp.ComponentDefinition, FileContentType.JSON
+        )
+        assert compdef.metadata.title == f"Component definition for {name}"
+
+
 def test_rule_transform_task_with_skip(tmp_trestle_dir: str) -> None:
     """Test rule transform task with skip."""
     trestle_root = pathlib.Path(tmp_trestle_dir)
@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+"""Test for the sync OSCAL component definition task"""
+
+import os
+import pathlib
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
+from unittest.mock import patch
+
+from complyscribe.tasks.sync_oscal_content_cd_task import SyncOscalCdTask
+from tests.testutils import TEST_DATA_DIR, setup_for_cac_content_dir, setup_for_compdef
+
+test_product = "rhel8"
+test_content_dir = TEST_DATA_DIR / "content_dir"
+test_profile_name = "simplified_nist_profile"
+policy_ids = ["abcd-levels", "efgh-levels"]
+
+
+def _setup_content_dir(content_dir: pathlib.Path) -> None:
+    """Set up a CaC content dir with a product profile selecting two policies."""
+    setup_for_cac_content_dir(str(content_dir), test_content_dir)
+    controls_dir = content_dir / "controls"
+    control_file = controls_dir / f"{policy_ids[0]}.yml"
+    (controls_dir / f"{policy_ids[1]}.yml").write_text(
+        control_file.read_text().replace(
+            f"id: {policy_ids[0]}", f"id: {policy_ids[1]}", 1
+        )
+    )
+    profile_path = content_dir / "products" / test_product / "profiles"
+    profile_file = profile_path / "example.profile"
+    profile_file.write_text(
+        profile_file.read_text().replace(
+            f"    - {policy_ids[0]}:all:medium\n",
+            "".join(f"    - {policy_id}:all:medium\n" for policy_id in policy_ids),
+        )
+    )
+
+
+def _read_tree(content_dir: pathlib.Path) -> Dict[str, str]:
+    return {
+        path.relative_to(content_dir).as_posix(): path.read_text()
+        for path in content_dir.rglob("*")
+        if path.is_file() and ".git" not in path.relative_to(content_dir).parts
+    }
+
+
+def test_sync_policies_with_jobs(tmp_trestle_dir: str, tmp_path: pathlib.Path) -> None:
+    """Test that policies synced in worker processes match a sequential sync."""
+    trestle_root = pathlib.Path(tmp_trestle_dir)
+    setup_for_compdef(
+        trestle_root,
+        test_product,
+        test_product,
+        model_name=os.path.join(test_product, test_profile_name),
+    )
+    profiles_dir = trestle_root / "profiles"
+    os.rename(
+        profiles_dir / test_profile_name,
+        profiles_dir / f"{test_product}-{policy_ids[0]}",
+    )
+    shutil.copytree(
+        profiles_dir / f"{test_product}-{policy_ids[0]}",
+        profiles_dir / f"{test_product}-{policy_ids[1]}",
+    )
+
+    outputs = []
+    for jobs in [1, 2]:
+        content_dir = tmp_path / f"content-{jobs}"
+        content_dir.mkdir()
+        _setup_content_dir(content_dir)
+        original = _read_tree(content_dir)
+        task = SyncOscalCdTask(
+            cac_content_root=content_dir,
+            working_dir=tmp_trestle_dir,
+            product=test_product,
+            oscal_profile=test_profile_name,
+            jobs=jobs,
+        )
+        with patch(
+            "complyscribe.tasks.sync_oscal_content_cd_task.ProcessPoolExecutor",
+            wraps=ProcessPoolExecutor,
+        ) as mock_executor:
+            assert task.execute() == 0
+        assert mock_executor.called == (jobs > 1)
+
+        output = _read_tree(content_dir)
+        # Both control files are synced
+        for policy_id in policy_ids:
+            control_file = f"controls/{policy_id}.yml"
+            assert output[control_file] != original[control_file]
+        outputs.append(output)
+
+    assert outputs[0] == outputs[1]
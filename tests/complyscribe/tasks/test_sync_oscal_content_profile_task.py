@@ -0,0 +1,48 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+"""Test for the level membership matrix of the sync OSCAL profile task"""
+
+from complyscribe.tasks.sync_oscal_content_profile_task import LevelMembershipMatrix
+
+level_with_ancestors = {
+    "low": ["low"],
+    "medium": ["medium", "low"],
+    "high": ["high", "medium", "low"],
+    "other": ["other"],
+}
+
+
+def test_level_membership_diff() -> None:
+    """Test add and remove sets computed for a level."""
+    matrix = LevelMembershipMatrix(
+        level_with_ancestors,
+        {"low": {"ac-1"}, "medium": {"ac-1", "ac-2"}},
+    )
+
+    add, remove = matrix.diff("medium", {"ac-1", "ac-3"})
+    assert add == {"ac-3"}
+    assert remove == {"ac-2"}
+
+    add, remove = matrix.diff("high", {"ac-1"})
+    assert add == {"ac-1"}
+    assert remove == set()
+
+
+def test_level_membership_chain() -> None:
+    """Test inheritance chain lookups of a level."""
+    matrix = LevelMembershipMatrix(level_with_ancestors, {})
+
+    assert matrix.has_chain("medium")
+    assert matrix.higher_levels("medium") == {"high"}
+    assert matrix.lower_levels("medium") == {"low"}
+    assert matrix.next_higher_level("medium") == "high"
+
+    assert matrix.higher_levels("high") == set()
+    assert matrix.next_higher_level("high") is None
+    assert matrix.next_higher_level("low") == "medium"
+
+    assert not matrix.has_chain("other")
+    assert matrix.higher_levels("other") == set()
+    assert matrix.lower_levels("other") == set()
+    assert matrix.next_higher_level("other") is None
@@ -4,17 +4,26 @@
 
 """Test for complyscribe sync upstreams task"""
 
+import json
 import os
 import pathlib
 import shutil
+import subprocess
+import sys
 from typing import Tuple
+from unittest.mock import patch
 
 import pytest
+from git import GitCommandError
 from git.repo import Repo
 from trestle.common.const import TRESTLE_CONFIG_DIR
+from trestle.oscal.catalog import Catalog
 
+import complyscribe.tasks.sync_upstreams_task as sync_upstreams_task
 from complyscribe.tasks.base_task import ModelFilter, TaskException
+from complyscribe.tasks.mirror_cache import MirrorCache
 from complyscribe.tasks.sync_upstreams_task import SyncUpstreamsTask
+from complyscribe.tasks.upstream_manifest import UpstreamManifest
 from tests.testutils import setup_for_compdef
 
 
@@ -110,3 +119,298 @@ def test_sync_upstream_invalid_git(
         TaskException, match="Git error occurred while fetching content from .*"
     ):
         sync.execute()
+
+
+def test_sync_upstreams_task_with_cache(
+    tmp_trestle_dir: str, tmp_repo: Tuple[str, Repo], tmp_path: pathlib.Path
+) -> None:
+    """Test sync upstreams task with a mirror cache"""
+    tmp_repo_path, repo = tmp_repo
+    setup_for_compdef(pathlib.Path(tmp_repo_path), "test_comp", "test_comp")
+    repo.git.add(all=True)
+    repo.index.commit("Adds test_comp")
+
+    cache_dir = tmp_path / "cache"
+    sync = SyncUpstreamsTask(
+        tmp_trestle_dir, [f"{tmp_repo_path}@main"], cache_dir=str(cache_dir)
+    )
+    with patch.object(Repo, "clone_from", wraps=Repo.clone_from) as clone_from:
+        assert sync.execute() == 0
+        assert clone_from.call_count == 1
+
+        mirror_path = MirrorCache(str(cache_dir)).mirror_path(tmp_repo_path)
+        mirror = Repo(mirror_path)
+        assert mirror.bare
+        assert len(mirror.git.worktree("list").splitlines()) == 1
+        mirror.close()
+
+        # New upstream commits are fetched into the existing mirror
+        setup_for_compdef(
+            pathlib.Path(tmp_repo_path), "test_comp", "new_comp", "new_comp"
+        )
+        repo.git.add(all=True)
+        repo.index.commit("Adds new_comp")
+        assert sync.execute() == 0
+        assert clone_from.call_count == 1
+
+    dest_trestle_root = pathlib.Path(tmp_trestle_dir)
+    assert (dest_trestle_root / "component-definitions" / "new_comp").exists()
+    # The worktrees are removed from the workspace
+    assert not any(name.startswith("tmp") for name in os.listdir(tmp_trestle_dir))
+
+
+def test_sync_upstreams_task_with_cache_invalid_ref(
+    tmp_trestle_dir: str, tmp_repo: Tuple[str, Repo], tmp_path: pathlib.Path
+) -> None:
+    """Test sync upstreams task with a mirror cache and an unknown ref"""
+    tmp_repo_path, _ = tmp_repo
+    sync = SyncUpstreamsTask(
+        tmp_trestle_dir,
+        [f"{tmp_repo_path}@does-not-exist"],
+        cache_dir=str(tmp_path / "cache"),
+    )
+    with pytest.raises(
+        TaskException, match="Git error occurred while fetching content from .*"
+    ):
+        sync.execute()
+
+
+def test_mirror_cache_without_posix_locks(tmp_path: pathlib.Path) -> None:
+    """Test that the cache module imports without fcntl and is POSIX only"""
+    # fcntl is only imported when a lock is taken
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys; sys.modules['fcntl'] = None; "
+            "import complyscribe.tasks.mirror_cache",
+        ],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+
+    with patch("sys.platform", "win32"):
+        with pytest.raises(TaskException, match="only supported on POSIX platforms"):
+            MirrorCache(str(tmp_path / "cache"))
+
+
+def _bare_upstream(tmp_repo: Tuple[str, Repo], tmp_path: pathlib.Path) -> str:
+    """Create a bare upstream repo with a non-model file and return its file URL"""
+    tmp_repo_path, repo = tmp_repo
+    setup_for_compdef(pathlib.Path(tmp_repo_path), "test_comp", "test_comp")
+    docs_path = pathlib.Path(tmp_repo_path, "docs")
+    docs_path.mkdir()
+    docs_path.joinpath("README.md").write_text("Not a model")
+    repo.git.add(all=True)
+    repo.index.commit("Adds test_comp")
+    bare_path = tmp_path / "upstream.git"
+    Repo.clone_from(tmp_repo_path, bare_path, bare=True).close()
+    return bare_path.as_uri()
+
+
+def test_sync_upstreams_task_sparse_checkout(
+    tmp_trestle_dir: str, tmp_repo: Tuple[str, Repo], tmp_path: pathlib.Path
+) -> None:
+    """Test sync upstreams task only fetches the ref and the model directories"""
+    repo_url = _bare_upstream(tmp_repo, tmp_path)
+    sync = SyncUpstreamsTask(tmp_trestle_dir, [f"{repo_url}@main"])
+
+    checkout_path = tmp_path / "checkout"
+    checkout_path.mkdir()
+    with sync._checkout(repo_url, "main", checkout_path) as upstream:
+        upstream_repo = Repo(upstream)
+        assert upstream_repo.git.rev_parse("--is-shallow-repository") == "true"
+        upstream_repo.close()
+        assert (upstream / "component-definitions" / "test_comp").exists()
+        assert not (upstream / "docs").exists()
+
+    assert sync.execute() == 0
+    dest_trestle_root = pathlib.Path(tmp_trestle_dir)
+    assert (dest_trestle_root / "component-definitions" / "test_comp").exists()
+
+
+def test_sync_upstreams_task_full_clone_fallback(
+    tmp_trestle_dir: str, tmp_repo: Tuple[str, Repo], tmp_path: pathlib.Path
+) -> None:
+    """Test sync upstreams task clones the full repo when a shallow fetch fails"""
+    repo_url = _bare_upstream(tmp_repo, tmp_path)
+    sync = SyncUpstreamsTask(tmp_trestle_dir, [f"{repo_url}@main"])
+    with patch.object(
+        SyncUpstreamsTask,
+        "_sparse_checkout",
+        side_effect=GitCommandError("fetch", 128),
+    ):
+        assert sync.execute() == 0
+    dest_trestle_root = pathlib.Path(tmp_trestle_dir)
+    assert (dest_trestle_root / "component-definitions" / "test_comp").exists()
+
+
+def test_sync_upstreams_task_with_jobs(
+    tmp_trestle_dir: str, tmp_repo: Tuple[str, Repo], tmp_path: pathlib.Path
+) -> None:
+    """Test sync upstreams task fetches concurrently and copies in source order"""
+    tmp_repo_path, repo = tmp_repo
+    setup_for_compdef(pathlib.Path(tmp_repo_path), "test_comp", "test_comp")
+    repo.git.add(all=True)
+    repo.index.commit("Adds test_comp")
+    first = repo.head.commit.hexsha
+
+    # The second source changes the title of the component definition
+    compdef_path = pathlib.Path(
+        tmp_repo_path, "component-definitions", "test_comp", "component-definition.json"
+    )
+    compdef_path.write_text(
+        compdef_path.read_text().replace(
+            '"title": "comp def a"', '"title": "Updated test_comp"'
+        )
+    )
+    repo.git.add(all=True)
+    repo.index.commit("Updates test_comp")
+
+    sources = [f"{tmp_repo_path}@{first}", f"{tmp_repo_path}@main"]
+    sync = SyncUpstreamsTask(tmp_trestle_dir, sources, jobs=2)
+    assert sync.execute() == 0
+    assert sorted(sync.timings) == sorted(sources)
+    assert all(set(timings) == {"fetch", "copy"} for timings in sync.timings.values())
+    dest_path = pathlib.Path(
+        tmp_trestle_dir,
+        "component-definitions",
+        "test_comp",
+        "component-definition.json",
+    )
+    assert '"title": "Updated test_comp"' in dest_path.read_text()
+
+    # All failed sources are reported before anything is copied
+    sync = SyncUpstreamsTask(
+        tmp_trestle_dir, ["invalid_source", f"{tmp_repo_path}1@main"], jobs=2
+    )
+    with pytest.raises(TaskException, match="(?s)Invalid source .*Git error"):
+        sync.execute()
+
+
+def test_sync_upstream_invalid_models_with_jobs(
+    tmp_trestle_dir: str, tmp_repo: Tuple[str, Repo]
+) -> None:
+    """Test sync upstreams task reports all invalid models validated in parallel"""
+    tmp_repo_path, repo = tmp_repo
+    source_trestle_root = pathlib.Path(tmp_repo_path)
+    setup_for_compdef(source_trestle_root, "invalid_comp", "invalid_comp")
+    setup_for_compdef(
+        source_trestle_root, "invalid_comp", "other_invalid_comp", "other_invalid_comp"
+    )
+    setup_for_compdef(source_trestle_root, "test_comp", "test_comp")
+    repo.git.add(all=True)
+    repo.index.commit("Adds test_comp and invalid components")
+
+    sync = SyncUpstreamsTask(tmp_trestle_dir, [f"{tmp_repo_path}@main"], jobs=2)
+    with pytest.raises(TaskException) as exc_info:
+        sync.execute()
+    message = str(exc_info.value)
+    assert message.count("is not valid") == 2
+    assert "invalid_comp from" in message
+    assert "other_invalid_comp from" in message
+
+    # The valid models are still copied
+    dest_trestle_root = pathlib.Path(tmp_trestle_dir)
+    assert (dest_trestle_root / "component-definitions" / "test_comp").exists()
+    assert not (dest_trestle_root / "component-definitions" / "invalid_comp").exists()
+
+
+def _sync_counts(sync: SyncUpstreamsTask) -> Tuple[int, int]:
+    """Run the task and return the number of fetched sources and loaded models"""
+    with patch.object(
+        SyncUpstreamsTask, "_checkout_source", wraps=sync._checkout_source
+    ) as checkout_source, patch.object(
+        sync_upstreams_task, "_load_model", wraps=sync_upstreams_task._load_model
+    ) as load_model:
+        assert sync.execute() == 0
+    return checkout_source.call_count, load_model.call_count
+
+
+def test_sync_upstreams_task_manifest(
+    tmp_trestle_dir: str, tmp_repo: Tuple[str, Repo]
+) -> None:
+    """Test sync upstreams task skips unchanged sources and models"""
+    tmp_repo_path, repo = tmp_repo
+    setup_for_compdef(pathlib.Path(tmp_repo_path), "test_comp", "test_comp")
+    repo.git.add(all=True)
+    repo.index.commit("Adds test_comp")
+    source = f"{tmp_repo_path}@main"
+
+    sync = SyncUpstreamsTask(tmp_trestle_dir, [source])
+    assert _sync_counts(sync) == (1, 3)
+    manifest = json.loads(UpstreamManifest(tmp_trestle_dir).manifest_path.read_text())
+    assert manifest["sources"][source]["commit"] == repo.head.commit.hexsha
+    assert sorted(manifest["sources"][source]["models"]) == [
+        "catalogs/simplified_nist_catalog",
+        "component-definitions/test_comp",
+        "profiles/simplified_nist_profile",
+    ]
+
+    # The ref did not move, the source is not fetched
+    sync = SyncUpstreamsTask(tmp_trestle_dir, [source])
+    assert _sync_counts(sync) == (0, 0)
+
+    # A changed workspace copy is synced again
+    dest_path = pathlib.Path(
+        tmp_trestle_dir,
+        "component-definitions",
+        "test_comp",
+        "component-definition.json",
+    )
+    synced = dest_path.read_text()
+    dest_path.write_text(synced.replace("comp def a", "Edited"))
+    sync = SyncUpstreamsTask(tmp_trestle_dir, [source])
+    assert _sync_counts(sync) == (1, 1)
+    assert dest_path.read_text() == synced
+
+    # Only the changed upstream model is loaded
+    profile_path = pathlib.Path(
+        tmp_repo_path, "profiles", "simplified_nist_profile", "profile.json"
+    )
+    profile_path.write_text(profile_path.read_text().replace("\n", "\n  ", 1))
+    repo.git.add(all=True)
+    repo.index.commit("Updates the profile")
+    sync = SyncUpstreamsTask(tmp_trestle_dir, [source])
+    assert _sync_counts(sync) == (1, 1)
+
+    # Other settings sync all models again, without validation the JSON
+    # models are copied without loading them
+    sync = SyncUpstreamsTask(tmp_trestle_dir, [source], validate=False)
+    with patch.object(
+        SyncUpstreamsTask, "_copy_model_file", wraps=sync._copy_model_file
+    ) as copy_model_file:
+        assert _sync_counts(sync) == (1, 0)
+    assert copy_model_file.call_count == 3
+
+
+def test_sync_upstreams_task_copies_json_models(
+    tmp_trestle_dir: str, tmp_repo: Tuple[str, Repo]
+) -> None:
+    """Test sync upstreams task copies top-level JSON models as-is"""
+    tmp_repo_path, repo = tmp_repo
+    source_trestle_root = pathlib.Path(tmp_repo_path)
+    setup_for_compdef(source_trestle_root, "test_comp", "test_comp")
+    catalog_path = source_trestle_root.joinpath(
+        "catalogs", "simplified_nist_catalog", "catalog.json"
+    )
+    yaml_path = source_trestle_root.joinpath("catalogs", "yaml_catalog", "catalog.yaml")
+    yaml_path.parent.mkdir()
+    Catalog.oscal_read(catalog_path).oscal_write(yaml_path)
+    repo.git.add(all=True)
+    repo.index.commit("Adds test_comp and a YAML catalog")
+
+    sync = SyncUpstreamsTask(tmp_trestle_dir, [f"{tmp_repo_path}@main"], validate=False)
+    with patch.object(
+        sync_upstreams_task, "_load_model", wraps=sync_upstreams_task._load_model
+    ) as load_model:
+        assert sync.execute() == 0
+
+    # Only the YAML model is loaded and written as JSON
+    assert load_model.call_count == 1
+    dest_trestle_root = pathlib.Path(tmp_trestle_dir)
+    assert (
+        dest_trestle_root / "catalogs" / "simplified_nist_catalog" / "catalog.json"
+    ).read_bytes() == catalog_path.read_bytes()
+    assert (dest_trestle_root / "catalogs" / "yaml_catalog" / "catalog.json").exists()
@@ -14,6 +14,7 @@ from git.repo import Repo
 
 from complyscribe.bot import ComplyScribe, RepoException
 from complyscribe.provider import GitProvider, GitProviderException
+from complyscribe.reporter import FileChange
 from complyscribe.tasks.base_task import TaskBase, TaskException
 
 
@@ -160,6 +161,7 @@ def test_run(tmp_repo: Tuple[str, Repo]) -> None:
         assert not results.changes
         assert results.commit_sha != ""
         assert results.pr_number == 0
+        assert results.summary == [FileChange("test.txt", "added", 1, 0)]
 
         # Verify that the commit is made
         commit = next(repo.iter_commits())
@@ -172,9 +174,44 @@ def test_run(tmp_repo: Tuple[str, Repo]) -> None:
         assert os.path.basename(test_file_path) in commit.stats.files
 
 
+def test_get_committed_files(tmp_repo: Tuple[str, Repo]) -> None:
+    """Test the change summary of a commit"""
+    repo_path, repo = tmp_repo
+    os.makedirs(os.path.join(repo_path, "rules"))
+    with open(os.path.join(repo_path, "rules", "old.txt"), "w") as f:
+        f.write("".join(f"line {i}\n" for i in range(10)))
+    with open(os.path.join(repo_path, "modified.txt"), "w") as f:
+        f.write("first\nsecond\n")
+    with open(os.path.join(repo_path, "deleted.txt"), "w") as f:
+        f.write("deleted\n")
+    repo.git.add(all=True)
+    commit = repo.index.commit("Initial commit")
+    assert ComplyScribe._get_committed_files(repo, commit) == [
+        FileChange("deleted.txt", "added", 1, 0),
+        FileChange("modified.txt", "added", 2, 0),
+        FileChange("rules/old.txt", "added", 10, 0),
+    ]
+
+    os.rename(
+        os.path.join(repo_path, "rules", "old.txt"),
+        os.path.join(repo_path, "rules", "new.txt"),
+    )
+    with open(os.path.join(repo_path, "modified.txt"), "w") as f:
+        f.write("first\nchanged\n")
+    os.remove(os.path.join(repo_path, "deleted.txt"))
+    repo.git.add(all=True)
+    commit = repo.index.commit("Update")
+    assert ComplyScribe._get_committed_files(repo, commit) == [
+        FileChange("deleted.txt", "deleted", 0, 1),
+        FileChange("modified.txt", "modified", 1, 1),
+        FileChange("rules/new.txt", "renamed", 0, 0),
+    ]
+
+
 def test_run_dry_run(tmp_repo: Tuple[str, Repo]) -> None:
     """Test bot run with dry run"""
-    repo_path, _ = tmp_repo
+    repo_path, repo = tmp_repo
+    head = repo.head.commit.hexsha
 
     # Create a test file
     test_file_path = os.path.join(repo_path, "test.txt")
@@ -202,6 +239,42 @@ def test_run_dry_run(tmp_repo: Tuple[str, Repo]) -> None:
 
         mock_push.assert_not_called()
 
+    # Nothing is staged or committed
+    assert repo.untracked_files == ["test.txt"]
+    assert repo.head.commit.hexsha == head
+
+
+def test_run_dry_run_changes(tmp_repo: Tuple[str, Repo]) -> None:
+    """Test the changes reported by a dry run"""
+    repo_path, repo = tmp_repo
+    tracked = [path for path, _ in repo.index.entries.keys()]
+    modified, deleted = tracked[0], tracked[1]
+    with open(os.path.join(repo_path, modified), "a") as f:
+        f.write("\nchanged")
+    os.remove(os.path.join(repo_path, deleted))
+    os.makedirs(os.path.join(repo_path, "new_dir"))
+    with open(os.path.join(repo_path, "new_dir", "new.txt"), "w") as f:
+        f.write("new")
+
+    bot = ComplyScribe(
+        working_dir=repo_path,
+        branch="main",
+        commit_name="Test User",
+        commit_email="test@example.com",
+    )
+    results = bot.run(patterns=["."], dry_run=True)
+    assert results.changes == sorted(
+        [
+            f"{modified} [modified]",
+            f"{deleted} [deleted]",
+            "new_dir/new.txt [added]",
+        ]
+    )
+
+    results = bot.run(patterns=["new_dir"], dry_run=True)
+    assert results.changes == ["new_dir/new.txt [added]"]
+    assert not repo.index.diff("HEAD")
+
 
 def test_empty_commit(tmp_repo: Tuple[str, Repo]) -> None:
     """Test running bot with no file updates"""
@@ -295,6 +368,107 @@ def test_run_with_failed_pre_task(tmp_repo: Tuple[str, Repo]) -> None:
         )
 
 
+class _WriteTask(TaskBase):
+    """Task writing a file and recording it in the journal"""
+
+    def __init__(self, working_dir: str, path: str, records_writes: bool) -> None:
+        super().__init__(working_dir, None)
+        self._path = path
+        self.records_writes = records_writes
+
+    def execute(self) -> int:
+        with open(os.path.join(self.working_dir, self._path), "w") as f:
+            f.write("Task content")
+        self.record_write(self._path)
+        return 0
+
+
+def _write_unrelated_file(repo_path: str) -> None:
+    with open(os.path.join(repo_path, "unrelated.txt"), "w") as f:
+        f.write("Unrelated content")
+
+
+def test_run_stages_journaled_paths(tmp_repo: Tuple[str, Repo]) -> None:
+    """Test bot run only stages the paths written by the pre-tasks"""
+    repo_path, repo = tmp_repo
+    _write_unrelated_file(repo_path)
+
+    bot = ComplyScribe(
+        working_dir=repo_path,
+        branch="main",
+        commit_name="Test User",
+        commit_email="test@example.com",
+    )
+
+    with patch("complyscribe.bot.ComplyScribe._push_to_remote") as mock_push:
+        mock_push.return_value = "Mocked result"
+        results = bot.run(
+            commit_message="Test commit message",
+            patterns=["."],
+            pre_tasks=[_WriteTask(repo_path, "test.txt", records_writes=True)],
+        )
+
+    assert results.commit_sha != ""
+    commit = next(repo.iter_commits())
+    assert list(commit.stats.files.keys()) == ["test.txt"]
+    assert "unrelated.txt" in repo.untracked_files
+
+
+def test_run_dry_run_journaled_paths(tmp_repo: Tuple[str, Repo]) -> None:
+    """Test bot dry run reports the changes of the journaled paths"""
+    repo_path, repo = tmp_repo
+    _write_unrelated_file(repo_path)
+
+    bot = ComplyScribe(
+        working_dir=repo_path,
+        branch="main",
+        commit_name="Test User",
+        commit_email="test@example.com",
+    )
+    results = bot.run(
+        patterns=["."],
+        pre_tasks=[_WriteTask(repo_path, "test.txt", records_writes=True)],
+        dry_run=True,
+    )
+    assert results.changes == ["test.txt [added]"]
+
+    # An unchanged journaled path leaves nothing to commit
+    repo.index.add(["test.txt"])
+    repo.index.commit("Add test file")
+    results = bot.run(
+        patterns=["."],
+        pre_tasks=[_WriteTask(repo_path, "test.txt", records_writes=True)],
+    )
+    assert results.changes == []
+    assert results.commit_sha == ""
+
+
+def test_run_with_unrecorded_writes(tmp_repo: Tuple[str, Repo]) -> None:
+    """Test bot run stages the whole tree when a task does not record writes"""
+    repo_path, repo = tmp_repo
+    _write_unrelated_file(repo_path)
+
+    bot = ComplyScribe(
+        working_dir=repo_path,
+        branch="main",
+        commit_name="Test User",
+        commit_email="test@example.com",
+    )
+    results = bot.run(
+        patterns=["."],
+        pre_tasks=[
+            _WriteTask(repo_path, "test.txt", records_writes=True),
+            _WriteTask(repo_path, "other.txt", records_writes=False),
+        ],
+        dry_run=True,
+    )
+    assert results.changes == [
+        "other.txt [added]",
+        "test.txt [added]",
+        "unrelated.txt [added]",
+    ]
+
+
 def test_run_with_provider(tmp_repo: Tuple[str, Repo]) -> None:
     """Test bot run with mock git provider"""
     repo_path, repo = tmp_repo
@@ -305,7 +479,7 @@ def test_run_with_provider(tmp_repo: Tuple[str, Repo]) -> None:
         f.write("Test content")
 
     mock = Mock(spec=GitProvider)
-    mock.create_pull_request.return_value = 10
+    mock.upsert_pull_request.return_value = 10
     mock.parse_repository.return_value = ("ns", "repo")
 
     bot = ComplyScribe(
@@ -341,7 +515,7 @@ def test_run_with_provider(tmp_repo: Tuple[str, Repo]) -> None:
         assert os.path.basename(test_file_path) in commit.stats.files
 
         # Verify that the method was called with the expected arguments
-        mock.create_pull_request.assert_called_once_with(
+        mock.upsert_pull_request.assert_called_once_with(
             ns="ns",
             repo_name="repo",
             head_branch="test",
@@ -362,7 +536,7 @@ def test_run_with_provider_with_custom_pr_title(tmp_repo: Tuple[str, Repo]) -> N
         f.write("Test content")
 
     mock = Mock(spec=GitProvider)
-    mock.create_pull_request.return_value = 10
+    mock.upsert_pull_request.return_value = 10
     mock.parse_repository.return_value = ("ns", "repo")
 
     bot = ComplyScribe(
@@ -390,7 +564,7 @@ def test_run_with_provider_with_custom_pr_title(tmp_repo: Tuple[str, Repo]) -> N
         assert results.pr_number == 10
 
         # Verify that the method was called with the expected arguments
-        mock.create_pull_request.assert_called_once_with(
+        mock.upsert_pull_request.assert_called_once_with(
             ns="ns",
             repo_name="repo",
             head_branch="test",
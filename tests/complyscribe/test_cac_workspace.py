@@ -0,0 +1,92 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+"""Test for the in-memory CaC content workspace"""
+
+import pathlib
+
+from complyscribe.cac_workspace import CacWorkspace
+
+CONTROL_FILE_CONTENT = """---
+id: abcd
+controls:
+    -   id: AC-1
+        # keep this comment
+        rules:
+            -   rule_a
+"""
+
+
+def _write_control_file(tmp_path: pathlib.Path) -> pathlib.Path:
+    control_file = tmp_path / "controls" / "abcd.yml"
+    control_file.parent.mkdir()
+    control_file.write_text(CONTROL_FILE_CONTENT)
+    return control_file
+
+
+def test_load_returns_same_data(tmp_path: pathlib.Path) -> None:
+    """Test that a file is loaded only once."""
+    control_file = _write_control_file(tmp_path)
+    workspace = CacWorkspace(tmp_path)
+
+    data = workspace.load(control_file)
+    assert workspace.is_loaded(control_file)
+    # later changes on disk are not picked up once the file is loaded
+    control_file.write_text("---\nid: other\n")
+    assert workspace.load(control_file) is data
+    assert data["id"] == "abcd"
+
+
+def test_flush_writes_only_changed_files(tmp_path: pathlib.Path) -> None:
+    """Test that only modified files are written on flush."""
+    control_file = _write_control_file(tmp_path)
+    unchanged_file = tmp_path / "controls" / "unchanged.yml"
+    unchanged_file.write_text("---\nid: unchanged\n")
+    workspace = CacWorkspace(tmp_path)
+
+    workspace.load(unchanged_file)
+    data = workspace.load(control_file)
+    data["controls"][0]["rules"].append("rule_b")
+
+    written = workspace.flush()
+    assert written == [control_file.resolve()]
+    content = control_file.read_text()
+    assert "rule_b" in content
+    assert "# keep this comment" in content
+
+    # nothing left to write
+    assert workspace.flush() == []
+
+
+def test_dry_run_does_not_write(tmp_path: pathlib.Path) -> None:
+    """Test that dry run reports diffs without touching files."""
+    control_file = _write_control_file(tmp_path)
+    workspace = CacWorkspace(tmp_path, dry_run=True)
+
+    data = workspace.load(control_file)
+    data["controls"][0]["rules"].append("rule_b")
+
+    diffs = workspace.diff()
+    assert list(diffs.keys()) == [control_file.resolve()]
+    added_lines = [
+        line
+        for line in diffs[control_file.resolve()].splitlines()
+        if line.startswith("+") and not line.startswith("+++")
+    ]
+    assert any("rule_b" in line for line in added_lines)
+
+    assert workspace.flush() == [control_file.resolve()]
+    assert control_file.read_text() == CONTROL_FILE_CONTENT
+
+
+def test_replace_keeps_disk_baseline(tmp_path: pathlib.Path) -> None:
+    """Test replacing file data with content produced elsewhere."""
+    control_file = _write_control_file(tmp_path)
+    workspace = CacWorkspace(tmp_path)
+
+    workspace.replace(control_file, "---\nid: replaced\n")
+    assert workspace.load(control_file)["id"] == "replaced"
+    assert list(workspace.diff().keys()) == [control_file.resolve()]
+
+    workspace.flush()
+    assert control_file.read_text() == "---\nid: replaced\n"
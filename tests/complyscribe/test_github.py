@@ -11,7 +11,7 @@ from unittest.mock import patch
 
 import pytest
 from git.repo import Repo
-from responses import GET, POST, RequestsMock
+from responses import GET, PATCH, POST, RequestsMock, matchers
 
 from complyscribe.github import GitHub, GitHubActionsResultsReporter, set_output
 from complyscribe.provider import GitProviderException
@@ -97,6 +97,75 @@ def test_create_pull_request(resp_merge_requests: RequestsMock) -> None:
     assert pr_number == 123
 
 
+@pytest.mark.parametrize(
+    "title, body, updated",
+    [
+        ("My PR", "Has Changes", True),
+        ("Amazing new feature", "Please pull these awesome changes in!", False),
+    ],
+)
+def test_upsert_pull_request_existing(title: str, body: str, updated: bool) -> None:
+    """Test updating the open pull request of a branch"""
+    repo_content = json.load(
+        open(JSON_TEST_DATA_PATH / "github_example_repo_response.json")
+    )
+    pr_content = json.load(
+        open(JSON_TEST_DATA_PATH / "github_example_pull_response.json")
+    )
+    with RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        rsps.add(
+            method=GET,
+            url="https://api.github.com/repos/owner/repo",
+            json=repo_content,
+            status=200,
+        )
+        pulls = rsps.add(
+            method=GET,
+            url="https://api.github.com/repos/owner/repo/pulls",
+            json=[pr_content],
+            status=200,
+            match=[
+                matchers.query_param_matcher(
+                    {"state": "open", "head": "owner:test", "base": "main"},
+                    strict_match=False,
+                )
+            ],
+        )
+        update = rsps.add(
+            method=PATCH,
+            url="https://api.github.com/repos/owner/repo/pulls/123",
+            json={**pr_content, "title": title, "body": body},
+            status=200,
+            match=[matchers.json_params_matcher({"title": title, "body": body})],
+        )
+        create = rsps.add(
+            method=POST, url="https://api.github.com/repos/owner/repo/pulls", status=422
+        )
+
+        gh = GitHub("fake")
+        pr_number = gh.upsert_pull_request("owner", "repo", "main", "test", title, body)
+
+        assert pr_number == 123
+        assert pulls.call_count == 1
+        assert update.call_count == (1 if updated else 0)
+        assert create.call_count == 0
+
+
+def test_upsert_pull_request_new(resp_merge_requests: RequestsMock) -> None:
+    """Test creating a pull request when the branch has no open pull request"""
+    resp_merge_requests.add(
+        method=GET,
+        url="https://api.github.com/repos/owner/repo/pulls",
+        json=[],
+        status=200,
+    )
+    gh = GitHub("fake")
+    pr_number = gh.upsert_pull_request(
+        "owner", "repo", "main", "test", "My PR", "Has Changes"
+    )
+    assert pr_number == 123
+
+
 def test_create_pull_request_invalid_repo() -> None:
     """Test triggering an error during pull request creation"""
     gh = GitHub("fake")
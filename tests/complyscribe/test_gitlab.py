@@ -10,7 +10,7 @@ from unittest.mock import patch
 import pytest
 from git.repo import Repo
 from gitlab.exceptions import GitlabAuthenticationError, GitlabCreateError
-from responses import GET, POST, RequestsMock
+from responses import GET, POST, PUT, RequestsMock, matchers
 
 from complyscribe.gitlab import GitLab, GitLabCIResultsReporter
 from complyscribe.provider import GitProviderException
@@ -139,6 +139,80 @@ def test_create_pull_request(resp_merge_requests: RequestsMock) -> None:
     assert pr_number == 123
 
 
+@pytest.mark.parametrize(
+    "title, body, updated",
+    [
+        ("My PR", "Has Changes", True),
+        (
+            "Example Merge Request",
+            "This is an example merge request description.",
+            False,
+        ),
+    ],
+)
+def test_upsert_pull_request_existing(title: str, body: str, updated: bool) -> None:
+    """Test updating the open merge request of a branch"""
+    with RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        rsps.add(
+            method=GET,
+            url="http://localhost/api/v4/projects/owner%2Frepo",
+            json={"name": "name", "id": 1},
+            status=200,
+        )
+        merge_requests = rsps.add(
+            method=GET,
+            url="http://localhost/api/v4/projects/1/merge_requests",
+            json=[{**mr_content, "iid": 5}],
+            status=200,
+            match=[
+                matchers.query_param_matcher(
+                    {
+                        "state": "opened",
+                        "source_branch": "feature-branch",
+                        "target_branch": "main",
+                    },
+                    strict_match=False,
+                )
+            ],
+        )
+        update = rsps.add(
+            method=PUT,
+            url="http://localhost/api/v4/projects/1/merge_requests/5",
+            json={**mr_content, "iid": 5, "title": title, "description": body},
+            status=200,
+        )
+        create = rsps.add(
+            method=POST,
+            url="http://localhost/api/v4/projects/1/merge_requests",
+            status=409,
+        )
+
+        gl = GitLab("fake", "http://localhost")
+        pr_number = gl.upsert_pull_request(
+            "owner", "repo", "main", "feature-branch", title, body
+        )
+
+        assert pr_number == 123
+        assert merge_requests.call_count == 1
+        assert update.call_count == (1 if updated else 0)
+        assert create.call_count == 0
+
+
+def test_upsert_pull_request_new(resp_merge_requests: RequestsMock) -> None:
+    """Test creating a merge request when the branch has no open merge request"""
+    resp_merge_requests.add(
+        method=GET,
+        url="http://localhost/api/v4/projects/1/merge_requests",
+        json=[],
+        status=200,
+    )
+    gl = GitLab("fake", "http://localhost")
+    pr_number = gl.upsert_pull_request(
+        "owner", "repo", "main", "test", "My PR", "Has Changes"
+    )
+    assert pr_number == 123
+
+
 def create_side_effect(name: str) -> None:
     raise GitlabCreateError("example")
 
@@ -0,0 +1,27 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Test for the shared content hashes"""
+
+import pathlib
+
+from complyscribe.hashing import hash_tree
+
+
+def test_hash_tree(tmp_path: pathlib.Path) -> None:
+    """Test that the tree hash covers file names and content"""
+    tree = tmp_path / "a"
+    tree.mkdir()
+    (tree / "one.md").write_text("one")
+    first = hash_tree(tree)
+    assert hash_tree(tree) == first
+
+    (tree / "one.md").write_text("changed")
+    assert hash_tree(tree) != first
+
+    (tree / "one.md").write_text("one")
+    (tree / "one.md").rename(tree / "two.md")
+    assert hash_tree(tree) != first
+
+    assert hash_tree(tree / "two.md") != hash_tree(tree)
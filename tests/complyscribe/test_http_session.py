@@ -0,0 +1,218 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+
+"""Test for the shared HTTP session layer of the Git providers"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Generator, List, Optional, Tuple
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from complyscribe.gitlab import GitLab
+from complyscribe.http_session import RetryingHTTPAdapter, mount_retries
+
+Reply = Tuple[int, Dict[str, str], Dict[str, Any]]
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Local HTTP server replying with scripted responses"""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.replies: Dict[Tuple[str, str], List[Reply]] = {}
+        # Method, path and client port of each request
+        self.requests: List[Tuple[str, str, int]] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def add(
+        self,
+        method: str,
+        path: str,
+        status: int,
+        body: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.replies.setdefault((method, path), []).append(
+            (status, headers or {}, body or {})
+        )
+
+    def calls(self, method: str, path: str) -> int:
+        return len([r for r in self.requests if r[:2] == (method, path)])
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StandInServer
+
+    def _reply(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.server.requests.append((self.command, self.path, self.client_address[1]))
+        replies = self.server.replies.get((self.command, self.path), [])
+        status, headers, body = replies.pop(0) if replies else (404, {}, {})
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = _reply
+    do_POST = _reply
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Generator[StandInServer, None, None]:
+    server = StandInServer()
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def mock_sleep() -> Generator[MagicMock, None, None]:
+    with patch("complyscribe.http_session.time.sleep") as mock_sleep:
+        yield mock_sleep
+
+
+def test_retry_transient_error(server: StandInServer, mock_sleep: MagicMock) -> None:
+    """Test retrying an idempotent request with exponential backoff"""
+    server.add("GET", "/resource", 503)
+    server.add("GET", "/resource", 502)
+    server.add("GET", "/resource", 200, {"name": "resource"})
+    session = mount_retries(requests.Session(), backoff_factor=0.1)
+
+    response = session.get(f"{server.url}/resource")
+
+    assert response.status_code == 200
+    assert response.json() == {"name": "resource"}
+    assert server.calls("GET", "/resource") == 3
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [0.1, 0.2]
+    # All requests were sent on the pooled connection
+    assert len({port for _, _, port in server.requests}) == 1
+
+
+def test_retry_rate_limited_post(server: StandInServer, mock_sleep: MagicMock) -> None:
+    """Test retrying a rate limited request after the requested delay"""
+    server.add("POST", "/resource", 429, headers={"Retry-After": "3"})
+    server.add("POST", "/resource", 201, {"id": 1})
+    session = mount_retries(requests.Session())
+
+    response = session.post(f"{server.url}/resource", json={"name": "resource"})
+
+    assert response.status_code == 201
+    assert server.calls("POST", "/resource") == 2
+    mock_sleep.assert_called_once_with(3.0)
+
+
+def test_retry_rate_limit_reset(server: StandInServer, mock_sleep: MagicMock) -> None:
+    """Test retrying a GitHub rate limited request until the limit is reset"""
+    reset = str(int(time.time()) + 10)
+    server.add(
+        "GET",
+        "/resource",
+        403,
+        headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset},
+    )
+    server.add("GET", "/resource", 200)
+    session = mount_retries(requests.Session())
+
+    response = session.get(f"{server.url}/resource")
+
+    assert response.status_code == 200
+    mock_sleep.assert_called_once()
+    assert 0 < mock_sleep.call_args.args[0] <= 10
+
+
+@pytest.mark.parametrize(
+    "method, status, headers",
+    [
+        ("POST", 502, {}),
+        ("GET", 403, {}),
+        ("GET", 404, {}),
+        ("GET", 429, {"Retry-After": "3600"}),
+        (
+            "GET",
+            403,
+            {
+                "X-RateLimit-Remaining": "0",
+                "X-RateLimit-Reset": str(int(time.time()) + 3600),
+            },
+        ),
+    ],
+)
+def test_no_retry(
+    server: StandInServer,
+    mock_sleep: MagicMock,
+    method: str,
+    status: int,
+    headers: Dict[str, str],
+) -> None:
+    """Test not retrying failed requests that are not safe or worth retrying"""
+    server.add(method, "/resource", status, headers=headers)
+    session = mount_retries(requests.Session())
+
+    response = session.request(method, f"{server.url}/resource")
+
+    assert response.status_code == status
+    assert server.calls(method, "/resource") == 1
+    mock_sleep.assert_not_called()
+
+
+def test_retry_limit(server: StandInServer, mock_sleep: MagicMock) -> None:
+    """Test returning the last failed response when retries are exhausted"""
+    for _ in range(3):
+        server.add("GET", "/resource", 503)
+    session = requests.Session()
+    session.mount("http://", RetryingHTTPAdapter(retries=2))
+
+    response = session.get(f"{server.url}/resource")
+
+    assert response.status_code == 503
+    assert server.calls("GET", "/resource") == 3
+    assert mock_sleep.call_count == 2
+
+
+def test_gitlab_create_pull_request(
+    server: StandInServer, mock_sleep: MagicMock
+) -> None:
+    """Test GitLab retrying transient errors and caching the project lookup"""
+    project_path = "/api/v4/projects/owner%2Frepo"
+    mr_path = "/api/v4/projects/1/merge_requests"
+    server.add("GET", project_path, 502)
+    server.add("GET", project_path, 200, {"name": "repo", "id": 1})
+    server.add("POST", mr_path, 201, {"iid": 5, "id": 123})
+    server.add("POST", mr_path, 201, {"iid": 6, "id": 124})
+    gl = GitLab("fake", server.url)
+
+    assert (
+        gl.create_pull_request("owner", "repo", "main", "test", "My PR", "Changes")
+        == 123
+    )
+    assert (
+        gl.create_pull_request("owner", "repo", "main", "test2", "My PR", "Changes")
+        == 124
+    )
+
+    assert server.calls("GET", project_path) == 2
+    assert server.calls("POST", mr_path) == 2
+    mock_sleep.assert_called_once()
+    assert len({port for _, _, port in server.requests}) == 1
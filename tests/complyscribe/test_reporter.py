@@ -5,7 +5,12 @@
 
 from unittest.mock import patch
 
-from complyscribe.reporter import BotResults, ResultsReporter
+from complyscribe.reporter import (
+    BotResults,
+    ChangeRollup,
+    FileChange,
+    ResultsReporter,
+)
 
 
 def test_results_reporter_with_commit() -> None:
@@ -35,3 +40,23 @@ def test_results_reporter_with_changes() -> None:
     with patch("builtins.print") as mock_print:
         ResultsReporter().report_results(results)
         mock_print.assert_called_once_with("\nChanges:\nfile1")
+
+
+def test_results_reporter_directory_rollup() -> None:
+    """Test rolling up the commit summary by directory"""
+    summary = [
+        FileChange("controls/ac/ac-1.md", "modified", 3, 1),
+        FileChange("controls/ac/ac-2.md", "added", 10, 0),
+        FileChange("rules/comp/rule.yaml", "deleted", 0, 5),
+        FileChange("README.md", "modified", 1, 1),
+    ]
+    assert ResultsReporter.get_directory_rollup(summary) == {
+        ".": ChangeRollup(1, 1, 1),
+        "controls": ChangeRollup(2, 13, 1),
+        "rules": ChangeRollup(1, 0, 5),
+    }
+    assert list(ResultsReporter.get_directory_rollup(summary, depth=2)) == [
+        ".",
+        "controls/ac",
+        "rules/comp",
+    ]
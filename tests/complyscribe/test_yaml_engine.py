@@ -0,0 +1,108 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright (c) 2024 Red Hat, Inc.
+
+"""Test for the shared YAML engines"""
+
+import io
+import pathlib
+import threading
+from typing import Any, Dict, List
+
+import pytest
+from ruamel.yaml import YAML
+from yaml.constructor import ConstructorError
+
+from complyscribe.yaml_engine import (
+    cac_round_trip_dumper,
+    round_trip_loader,
+    safe_dump,
+    safe_dump_file,
+    safe_load,
+)
+from tests.testutils import YAML_TEST_DATA_PATH
+
+
+@pytest.mark.parametrize(
+    "scalar",
+    [
+        "010",
+        "0o17",
+        "0x1F",
+        "0b101",
+        "1_000",
+        "-07",
+        "1:20",
+        "yes",
+        "off",
+        "True",
+        "1e3",
+        "+.5",
+        "-.inf",
+        "~",
+        "",
+        "2024-01-01",
+        "'quoted'",
+    ],
+)
+def test_safe_load_matches_ruamel(scalar: str) -> None:
+    """Test that plain scalars are resolved like the ruamel.yaml safe loader."""
+    document = f"key: {scalar}\n"
+    expected = YAML(typ="safe").load(document)
+    assert repr(safe_load(document)) == repr(expected)
+
+
+def test_safe_load_duplicate_key() -> None:
+    """Test that duplicate mapping keys are rejected like by ruamel.yaml."""
+    with pytest.raises(ConstructorError, match="found duplicate key 'a'"):
+        safe_load("a: 1\na: 2\n")
+    with pytest.raises(ConstructorError, match="found duplicate key 'description'"):
+        safe_load("rule:\n  description: one\n  description: two\n")
+    # Keys of a merged mapping may still be overridden
+    assert safe_load("base: &base\n  a: 1\nother:\n  <<: *base\n  a: 2\n") == {
+        "base": {"a": 1},
+        "other": {"a": 2},
+    }
+
+
+def test_safe_load_rule_files() -> None:
+    """Test that rule files load to the same data as with ruamel.yaml."""
+    for rule_file in YAML_TEST_DATA_PATH.glob("test_*.yaml"):
+        content = rule_file.read_text()
+        assert safe_load(content) == YAML(typ="safe").load(content)
+
+
+def test_safe_dump_matches_ruamel(tmp_path: pathlib.Path) -> None:
+    """Test that dumped text is the same as with the ruamel.yaml safe dumper."""
+    data: Dict[str, Any] = {
+        "b": {"description": "A long description with unicode é " * 4},
+        "a": [{"control-id": "ac-1"}, {"control-id": "ac-2"}],
+        # YAML 1.1 keywords are plain strings in YAML 1.2
+        "c": ["yes", "no", "on", "off", "y", "n", "Yes", "ON", "010", "1_000"],
+        "d": {
+            "multi-line": "line1\nline2",
+            "trailing": "line1\nline2\n",
+            "indented": "line1\n  line2",
+        },
+    }
+    yaml_obj = YAML(typ="safe")
+    yaml_obj.default_flow_style = False
+    stream = io.StringIO()
+    yaml_obj.dump(data, stream)
+
+    assert safe_dump(data) == stream.getvalue()
+
+    file_path = tmp_path / "data.yaml"
+    safe_dump_file(data, file_path)
+    assert file_path.read_text(encoding="utf-8") == stream.getvalue()
+
+
+def test_round_trip_instances_per_thread() -> None:
+    """Test that round-trip instances are reused within and not across threads."""
+    assert round_trip_loader() is round_trip_loader()
+    assert cac_round_trip_dumper() is cac_round_trip_dumper()
+
+    other: List[YAML] = []
+    thread = threading.Thread(target=lambda: other.append(round_trip_loader()))
+    thread.start()
+    thread.join()
+    assert other[0] is not round_trip_loader()